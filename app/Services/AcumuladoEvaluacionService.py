@@ -0,0 +1,374 @@
+# services/acumulado_evaluacion_service.py
+from sqlalchemy import func, text, tuple_
+from app import db
+from ..models.AcumuladoEvaluacion_Model import AcumuladoEvaluacion
+from ..models.Evaluacion_Model import Evaluacion
+from .CatalogoEvaluacionService import CatalogoEvaluacionService
+from .NotaIntegralService import NotaIntegralService, DIMENSIONES
+from .UpsertNotasService import UpsertNotasService
+
+# Espacio (primer argumento) de los advisory locks de PostgreSQL que toman las reconstrucciones
+ESPACIO_BLOQUEO = 4004
+
+
+class AcumuladoEvaluacionService:
+    """
+    Mantiene sumas y cantidades de notas por (estudiante, materia, gestión, tipo de evaluación)
+    para recalcular la nota final en O(1) al crear, modificar o eliminar una evaluación.
+
+    Todas las operaciones trabajan dentro de la transacción actual y no hacen commit.
+    El cambio en `evaluacion` debe estar aplicado (flush) antes de registrarlo: si la clave
+    aún no tiene acumulados se reconstruyen desde la tabla evaluacion y ya lo incluyen.
+
+    Una clave sin filas no tiene nada que bloquear con FOR UPDATE: antes de reconstruirla se
+    toma un advisory lock de transacción por clave (PostgreSQL) y se vuelve a buscar, así dos
+    primeras escrituras simultáneas no insertan las mismas filas (uq_acumulado_evaluacion_clave).
+
+    Quien escriba en evaluacion sin pasar por este servicio (seeders, generación de gestiones)
+    debe llamar a invalidar() para sus claves: sin filas, el próximo cargar las reconstruye.
+    `flask api rebuild-acumulados` revisa o reconstruye la tabla (p. ej. tras SQL manual).
+    """
+    TAMANO_BLOQUE = 1000
+
+    @staticmethod
+    def cargar(estudiante_ci, materia_id, gestion_id):
+        """
+        Retorna (acumulados, reconstruido): dict {tipo_evaluacion_id: AcumuladoEvaluacion}
+        y si hubo que reconstruirlos desde las evaluaciones.
+        Las filas se bloquean (FOR UPDATE) hasta el fin de la transacción.
+        """
+        clave = (estudiante_ci, materia_id, gestion_id)
+        acumulados_por_clave, reconstruidas = AcumuladoEvaluacionService.cargar_varias([clave])
+        return acumulados_por_clave[clave], clave in reconstruidas
+
+    @staticmethod
+    def reconstruir(estudiante_ci, materia_id, gestion_id):
+        """Crea los acumulados de una clave a partir de sus evaluaciones (un GROUP BY por tipo)"""
+        clave = (estudiante_ci, materia_id, gestion_id)
+        return AcumuladoEvaluacionService._reconstruir_varias([clave])[clave]
+
+    @staticmethod
+    def _reconstruir_varias(claves):
+        """Reconstruye los acumulados de varias claves con un solo GROUP BY; retorna {clave: acumulados}"""
+        claves = list(dict.fromkeys(claves))
+        resultado = {clave: {} for clave in claves}
+        if not claves:
+            return resultado
+
+        columnas_clave = tuple_(
+            AcumuladoEvaluacion.estudiante_ci, AcumuladoEvaluacion.materia_id, AcumuladoEvaluacion.gestion_id
+        )
+        AcumuladoEvaluacion.query.filter(columnas_clave.in_(claves)).delete(synchronize_session=False)
+
+        totales = db.session.query(
+            Evaluacion.estudiante_ci,
+            Evaluacion.materia_id,
+            Evaluacion.gestion_id,
+            Evaluacion.tipo_evaluacion_id,
+            func.sum(Evaluacion.nota),
+            func.count(Evaluacion.nota)
+        ).filter(
+            tuple_(Evaluacion.estudiante_ci, Evaluacion.materia_id, Evaluacion.gestion_id).in_(claves),
+            Evaluacion.tipo_evaluacion_id.isnot(None)
+        ).group_by(
+            Evaluacion.estudiante_ci,
+            Evaluacion.materia_id,
+            Evaluacion.gestion_id,
+            Evaluacion.tipo_evaluacion_id
+        ).all()
+
+        for estudiante_ci, materia_id, gestion_id, tipo_id, suma, cantidad in totales:
+            acumulado = AcumuladoEvaluacion(
+                estudiante_ci=estudiante_ci,
+                materia_id=materia_id,
+                gestion_id=gestion_id,
+                tipo_evaluacion_id=tipo_id,
+                suma=suma or 0.0,
+                cantidad=cantidad
+            )
+            db.session.add(acumulado)
+            resultado[(estudiante_ci, materia_id, gestion_id)][tipo_id] = acumulado
+
+        return resultado
+
+    @staticmethod
+    def invalidar(gestion_ids=None, claves=None):
+        """Borra (sin commit) los acumulados de las gestiones o claves indicadas (o todos); retorna cuántos"""
+        consulta = AcumuladoEvaluacion.query
+        if gestion_ids is not None:
+            consulta = consulta.filter(AcumuladoEvaluacion.gestion_id.in_(list(gestion_ids)))
+        if claves is not None:
+            consulta = consulta.filter(tuple_(
+                AcumuladoEvaluacion.estudiante_ci, AcumuladoEvaluacion.materia_id, AcumuladoEvaluacion.gestion_id
+            ).in_(list(claves)))
+        return consulta.delete(synchronize_session=False)
+
+    @staticmethod
+    def reconstruir_todo(gestion_ids=None, tamano_bloque=None):
+        """
+        Reconstruye (sin commit) los acumulados de todas las claves con evaluaciones, por bloques
+        de claves; las claves que ya no tienen evaluaciones quedan sin filas. Retorna cuántas claves.
+        """
+        tamano_bloque = tamano_bloque or AcumuladoEvaluacionService.TAMANO_BLOQUE
+        AcumuladoEvaluacionService.invalidar(gestion_ids)
+
+        claves = [tuple(fila) for fila in AcumuladoEvaluacionService._filtrar_gestiones(db.session.query(
+            Evaluacion.estudiante_ci, Evaluacion.materia_id, Evaluacion.gestion_id
+        ).filter(
+            Evaluacion.estudiante_ci.isnot(None),
+            Evaluacion.materia_id.isnot(None),
+            Evaluacion.gestion_id.isnot(None),
+            Evaluacion.tipo_evaluacion_id.isnot(None)
+        ).distinct(), gestion_ids)]
+
+        for inicio in range(0, len(claves), tamano_bloque):
+            AcumuladoEvaluacionService._reconstruir_varias(claves[inicio:inicio + tamano_bloque])
+            db.session.flush()
+        return len(claves)
+
+    @staticmethod
+    def diferencias(gestion_ids=None):
+        """
+        Compara los acumulados con un GROUP BY sobre evaluacion.
+        Retorna la lista ordenada de claves (estudiante_ci, materia_id, gestion_id) que no coinciden.
+        """
+        esperados = {
+            (fila[0], fila[1], fila[2], fila[3]): (fila[4] or 0.0, fila[5])
+            for fila in AcumuladoEvaluacionService._filtrar_gestiones(db.session.query(
+                Evaluacion.estudiante_ci,
+                Evaluacion.materia_id,
+                Evaluacion.gestion_id,
+                Evaluacion.tipo_evaluacion_id,
+                func.sum(Evaluacion.nota),
+                func.count(Evaluacion.nota)
+            ).filter(
+                Evaluacion.tipo_evaluacion_id.isnot(None)
+            ).group_by(
+                Evaluacion.estudiante_ci,
+                Evaluacion.materia_id,
+                Evaluacion.gestion_id,
+                Evaluacion.tipo_evaluacion_id
+            ), gestion_ids, Evaluacion)
+        }
+        guardados = {
+            (fila[0], fila[1], fila[2], fila[3]): (fila[4], fila[5])
+            for fila in AcumuladoEvaluacionService._filtrar_gestiones(db.session.query(
+                AcumuladoEvaluacion.estudiante_ci,
+                AcumuladoEvaluacion.materia_id,
+                AcumuladoEvaluacion.gestion_id,
+                AcumuladoEvaluacion.tipo_evaluacion_id,
+                AcumuladoEvaluacion.suma,
+                AcumuladoEvaluacion.cantidad
+            ), gestion_ids, AcumuladoEvaluacion)
+        }
+
+        # Las claves sin acumulados se reconstruyen al cargarlas: no son diferencias
+        con_filas = {clave[:3] for clave in guardados}
+        distintas = set()
+        for clave in esperados.keys() | guardados.keys():
+            if clave[:3] not in con_filas:
+                continue
+            suma, cantidad = esperados.get(clave, (0.0, 0))
+            guardado = guardados.get(clave, (0.0, 0))
+            if guardado[1] != cantidad or abs(guardado[0] - suma) > 1e-6:
+                distintas.add(clave[:3])
+        return sorted(distintas)
+
+    @staticmethod
+    def _filtrar_gestiones(consulta, gestion_ids, modelo=Evaluacion):
+        if gestion_ids is None:
+            return consulta
+        return consulta.filter(modelo.gestion_id.in_(list(gestion_ids)))
+
+    @staticmethod
+    def cargar_varias(claves):
+        """
+        Versión por lotes de `cargar`: una consulta (FOR UPDATE) para todas las claves y un
+        GROUP BY para reconstruir las que no tienen acumulados.
+
+        Returns:
+            (acumulados_por_clave, reconstruidas): dict {clave: acumulados} y set de claves reconstruidas
+        """
+        claves = list(dict.fromkeys(claves))
+        resultado = {clave: {} for clave in claves}
+        if not claves:
+            return resultado, set()
+
+        for fila in AcumuladoEvaluacionService._filas_bloqueadas(claves):
+            resultado[(fila.estudiante_ci, fila.materia_id, fila.gestion_id)][fila.tipo_evaluacion_id] = fila
+
+        faltantes = [clave for clave, acumulados in resultado.items() if not acumulados]
+        if faltantes and AcumuladoEvaluacionService._bloquear_claves(faltantes):
+            # Otra transacción pudo crearlos mientras se esperaba el bloqueo
+            for fila in AcumuladoEvaluacionService._filas_bloqueadas(faltantes):
+                resultado[(fila.estudiante_ci, fila.materia_id, fila.gestion_id)][fila.tipo_evaluacion_id] = fila
+            faltantes = [clave for clave in faltantes if not resultado[clave]]
+
+        reconstruidas = set(faltantes)
+        resultado.update(AcumuladoEvaluacionService._reconstruir_varias(reconstruidas))
+        return resultado, reconstruidas
+
+    @staticmethod
+    def _filas_bloqueadas(claves):
+        """Acumulados de las claves, bloqueados (FOR UPDATE) hasta el fin de la transacción"""
+        return AcumuladoEvaluacion.query.filter(
+            tuple_(
+                AcumuladoEvaluacion.estudiante_ci, AcumuladoEvaluacion.materia_id, AcumuladoEvaluacion.gestion_id
+            ).in_(claves)
+        ).with_for_update().all()
+
+    @staticmethod
+    def _bloquear_claves(claves):
+        """
+        Toma un advisory lock de transacción por clave, en orden (sin interbloqueos entre lotes).
+        Retorna False sin bloquear en motores sin advisory locks (SQLite serializa las escrituras).
+        """
+        if db.session.get_bind().dialect.name != 'postgresql':
+            return False
+
+        db.session.execute(text(
+            "SELECT pg_advisory_xact_lock(:espacio, hashtext(clave)) "
+            "FROM (SELECT unnest(CAST(:claves AS text[])) AS clave ORDER BY 1) AS claves"
+        ), {
+            'espacio': ESPACIO_BLOQUEO,
+            'claves': sorted(f"{estudiante_ci}:{materia_id}:{gestion_id}"
+                             for estudiante_ci, materia_id, gestion_id in claves)
+        })
+        return True
+
+    @staticmethod
+    def sumar(acumulados, clave, tipo_id, nota, signo):
+        """Aplica +nota (signo=1) o -nota (signo=-1) al acumulado del tipo"""
+        if tipo_id is None or nota is None:
+            return
+
+        acumulado = acumulados.get(tipo_id)
+        if not acumulado:
+            estudiante_ci, materia_id, gestion_id = clave
+            acumulado = AcumuladoEvaluacion(
+                estudiante_ci=estudiante_ci,
+                materia_id=materia_id,
+                gestion_id=gestion_id,
+                tipo_evaluacion_id=tipo_id,
+                suma=0.0,
+                cantidad=0
+            )
+            db.session.add(acumulado)
+            acumulados[tipo_id] = acumulado
+
+        acumulado.cantidad += signo
+        # Sin notas, la suma vuelve a 0 exacto (evita arrastrar error de redondeo)
+        acumulado.suma = acumulado.suma + signo * nota if acumulado.cantidad > 0 else 0.0
+
+    @staticmethod
+    def _registrar(clave, tipo_id, nota, signo):
+        acumulados, reconstruido = AcumuladoEvaluacionService.cargar(*clave)
+        if not reconstruido:
+            AcumuladoEvaluacionService.sumar(acumulados, clave, tipo_id, nota, signo)
+        return acumulados
+
+    @staticmethod
+    def registrar_alta(evaluacion):
+        """Suma una evaluación recién creada; retorna los acumulados de su clave"""
+        clave = (evaluacion.estudiante_ci, evaluacion.materia_id, evaluacion.gestion_id)
+        return AcumuladoEvaluacionService._registrar(clave, evaluacion.tipo_evaluacion_id, evaluacion.nota, 1)
+
+    @staticmethod
+    def registrar_altas(evaluaciones):
+        """
+        Suma varias evaluaciones recién creadas (ya con flush) cargando los acumulados
+        de todas sus claves de una vez. Retorna {clave: acumulados}.
+        """
+        por_clave = {}
+        for evaluacion in evaluaciones:
+            clave = (evaluacion.estudiante_ci, evaluacion.materia_id, evaluacion.gestion_id)
+            por_clave.setdefault(clave, []).append(evaluacion)
+
+        acumulados_por_clave, reconstruidas = AcumuladoEvaluacionService.cargar_varias(por_clave)
+        for clave, lista in por_clave.items():
+            if clave in reconstruidas:
+                continue
+            for evaluacion in lista:
+                AcumuladoEvaluacionService.sumar(
+                    acumulados_por_clave[clave], clave, evaluacion.tipo_evaluacion_id, evaluacion.nota, 1
+                )
+        return acumulados_por_clave
+
+    @staticmethod
+    def registrar_baja(evaluacion):
+        """Resta una evaluación eliminada; retorna los acumulados de su clave"""
+        clave = (evaluacion.estudiante_ci, evaluacion.materia_id, evaluacion.gestion_id)
+        return AcumuladoEvaluacionService._registrar(clave, evaluacion.tipo_evaluacion_id, evaluacion.nota, -1)
+
+    @staticmethod
+    def registrar_cambio(anterior, evaluacion):
+        """
+        Aplica la modificación de una evaluación.
+
+        Args:
+            anterior: dict con estudiante_ci, materia_id, gestion_id, tipo_evaluacion_id y nota previos
+            evaluacion: Evaluacion ya modificada
+
+        Returns:
+            Dict {clave: acumulados} de las claves afectadas (una o dos si cambió la clave)
+        """
+        clave_anterior = (anterior['estudiante_ci'], anterior['materia_id'], anterior['gestion_id'])
+        clave = (evaluacion.estudiante_ci, evaluacion.materia_id, evaluacion.gestion_id)
+
+        if clave_anterior != clave:
+            return {
+                clave_anterior: AcumuladoEvaluacionService._registrar(
+                    clave_anterior, anterior['tipo_evaluacion_id'], anterior['nota'], -1
+                ),
+                clave: AcumuladoEvaluacionService.registrar_alta(evaluacion),
+            }
+
+        acumulados, reconstruido = AcumuladoEvaluacionService.cargar(*clave)
+        if not reconstruido:
+            AcumuladoEvaluacionService.sumar(acumulados, clave, anterior['tipo_evaluacion_id'], anterior['nota'], -1)
+            AcumuladoEvaluacionService.sumar(acumulados, clave, evaluacion.tipo_evaluacion_id, evaluacion.nota, 1)
+        return {clave: acumulados}
+
+    @staticmethod
+    def promedio_tipo(acumulados, tipo_id):
+        """Promedio de las notas de un tipo de evaluación, o None si no hay notas"""
+        acumulado = acumulados.get(tipo_id)
+        if not acumulado or not acumulado.cantidad:
+            return None
+        return acumulado.suma / acumulado.cantidad
+
+    @staticmethod
+    def promedios_por_dimension(acumulados):
+        """Promedio por dimensión combinando los acumulados de los tipos de cada una (0 si no hay notas)"""
+        promedios = {}
+        for dimension in DIMENSIONES:
+            suma = 0.0
+            cantidad = 0
+            for tipo_id in CatalogoEvaluacionService.tipos_de_dimension(dimension):
+                acumulado = acumulados.get(tipo_id)
+                if acumulado:
+                    suma += acumulado.suma
+                    cantidad += acumulado.cantidad
+            promedios[dimension] = suma / cantidad if cantidad else 0
+        return promedios
+
+    @staticmethod
+    def actualizar_nota_final(estudiante_ci, materia_id, gestion_id, acumulados):
+        """Guarda (upsert) la NotaFinal de la clave con la nota integral de los acumulados (sin commit)"""
+        clave = (estudiante_ci, materia_id, gestion_id)
+        return AcumuladoEvaluacionService.actualizar_notas_finales({clave: acumulados})[clave]
+
+    @staticmethod
+    def actualizar_notas_finales(acumulados_por_clave):
+        """Versión por lotes de `actualizar_nota_final`: un solo upsert para todas las claves (sin commit)"""
+        filas = []
+        for (estudiante_ci, materia_id, gestion_id), acumulados in acumulados_por_clave.items():
+            promedios = AcumuladoEvaluacionService.promedios_por_dimension(acumulados)
+            filas.append({
+                'estudiante_ci': estudiante_ci,
+                'materia_id': materia_id,
+                'gestion_id': gestion_id,
+                'valor': NotaIntegralService.nota_integral(promedios)
+            })
+
+        return UpsertNotasService.upsert_notas_finales(filas)
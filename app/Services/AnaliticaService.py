@@ -0,0 +1,328 @@
+# services/analitica_service.py
+import logging
+import time
+from flask import current_app
+from sqlalchemy import case, delete, func, insert, or_, select, tuple_
+from app import db
+from ..models.Evaluacion_Model import Evaluacion
+from ..models.Gestion_Model import Gestion
+from ..models.NotaFinal_Model import NotaFinal
+from ..models.ResumenMateria_Model import ResumenMateria
+from ..models.ResumenNotaFinal_Model import ResumenNotaFinal
+from ..models.ResumenAsistencia_Model import ResumenAsistencia
+from ..models.ResumenPendiente_Model import ResumenPendiente
+from ..models.ResumenVersion_Model import ResumenVersion
+from .EstadisticaAsistenciaService import CATEGORIAS, EstadisticaAsistenciaService
+
+logger = logging.getLogger(__name__)
+
+# Nota final mínima de aprobación
+NOTA_APROBACION = 51
+
+COLUMNAS_MATERIA = ('gestion_id', 'materia_id', 'tipo_evaluacion_id', 'cantidad', 'suma', 'minimo', 'maximo',
+                    'estudiantes') + CATEGORIAS
+COLUMNAS_NOTA_FINAL = ('gestion_id', 'materia_id', 'cantidad', 'suma', 'minimo', 'maximo', 'aprobados', 'reprobados')
+COLUMNAS_ASISTENCIA = ('gestion_id', 'cantidad', 'suma', 'estudiantes') + CATEGORIAS
+
+
+class AnaliticaService:
+    """
+    Resúmenes materializados para los dashboards: por (gestión, materia, tipo de evaluación),
+    por (gestión, materia) de notas finales y de asistencia final por gestión. Los dashboards
+    leen pocas filas de estas tablas en vez de recorrer evaluacion y nota_final.
+
+    Al cambiar notas, marcar() registra la (gestión, materia) en resumen_pendiente dentro de
+    la misma transacción (una fila por clave); sincronizar() recalcula solo lo pendiente antes
+    de leer, y el comando `flask api refresh-analytics` lo hace de forma programada. Cada
+    recálculo cambia la versión de la gestión en resumen_version, con la que las cachés de
+    todos los workers (EstadisticaAsistenciaService) saben que deben volver a leer.
+
+    Docente y curso no forman parte de la clave: se resuelven al leer con DocenteMateria y
+    MateriaCurso, así reasignar un docente no obliga a recalcular nada.
+    """
+
+    @staticmethod
+    def marcar(pares):
+        """
+        Registra (sin commit) pares (gestion_id, materia_id) a recalcular; materia_id None = toda la gestión.
+        Upsert sobre uq_resumen_pendiente_clave / uq_resumen_pendiente_gestion: una marca por clave.
+        """
+        # Import local: UpsertNotasService marca los resúmenes con este servicio
+        from .UpsertNotasService import INSERTS_CON_CONFLICTO, UpsertNotasService
+
+        pares = {(gestion_id, materia_id) for gestion_id, materia_id in pares if gestion_id is not None}
+        if not pares:
+            return
+
+        insert_con_conflicto = INSERTS_CON_CONFLICTO.get(db.session.get_bind().dialect.name)
+        if insert_con_conflicto is None or not UpsertNotasService.tiene_clave_unica(
+                ResumenPendiente, ('gestion_id', 'materia_id')):
+            # Sin la migración a9c4e2f7d3b5: se insertan solo las marcas que aún no existen
+            existentes = set(db.session.execute(select(ResumenPendiente.gestion_id, ResumenPendiente.materia_id).where(
+                ResumenPendiente.gestion_id.in_({gestion_id for gestion_id, _ in pares})
+            )).all())
+            nuevas = pares - existentes
+            if nuevas:
+                db.session.execute(insert(ResumenPendiente), [
+                    {'gestion_id': gestion_id, 'materia_id': materia_id} for gestion_id, materia_id in nuevas
+                ])
+            return
+
+        por_materia = [{'gestion_id': g, 'materia_id': m} for g, m in pares if m is not None]
+        completas = [{'gestion_id': g, 'materia_id': None} for g, m in pares if m is None]
+        for filas, clave, condicion in (
+            (por_materia, ['gestion_id', 'materia_id'], None),
+            (completas, ['gestion_id'], ResumenPendiente.materia_id.is_(None)),
+        ):
+            if not filas:
+                continue
+            sentencia = insert_con_conflicto(ResumenPendiente).values(filas)
+            # DO UPDATE (no DO NOTHING) bloquea la marca existente hasta el commit: un refresco en
+            # curso la salta (SKIP LOCKED) en vez de borrarla sin haber visto esta escritura
+            db.session.execute(sentencia.on_conflict_do_update(
+                index_elements=clave,
+                index_where=condicion,
+                set_={'gestion_id': sentencia.excluded.gestion_id}
+            ))
+
+    @staticmethod
+    def marcar_gestion(gestion_id):
+        """Registra (sin commit) la gestión completa para recalcular"""
+        AnaliticaService.marcar([(gestion_id, None)])
+
+    @staticmethod
+    def sincronizar(gestion_ids=None):
+        """
+        Recalcula y confirma lo pendiente de las gestiones indicadas (o de todas) antes de leerlas.
+
+        Corre en un contexto de aplicación propio (otra sesión y otra transacción): el GET que
+        lo llama no confirma nada de la suya. Si falla, o si otro proceso está recalculando lo
+        mismo, se registra y se leen los resúmenes tal como están; las marcas quedan para el
+        próximo intento o para `flask api refresh-analytics`.
+        """
+        with current_app.app_context():
+            try:
+                if AnaliticaService.refrescar_pendientes(gestion_ids):
+                    db.session.commit()
+            except Exception:
+                db.session.rollback()
+                logger.exception("Error al recalcular los resúmenes de las gestiones %s", gestion_ids)
+
+    @staticmethod
+    def refrescar_pendientes(gestion_ids=None):
+        """Recalcula (sin commit) lo pendiente y borra las marcas procesadas; retorna cuántas había"""
+        consulta = select(ResumenPendiente.id, ResumenPendiente.gestion_id, ResumenPendiente.materia_id)
+        if gestion_ids is not None:
+            consulta = consulta.where(ResumenPendiente.gestion_id.in_(list(gestion_ids)))
+        # En PostgreSQL, las marcas que está procesando otra transacción se saltan
+        marcas = db.session.execute(consulta.with_for_update(skip_locked=True)).all()
+        if not marcas:
+            return 0
+
+        AnaliticaService.refrescar({(marca.gestion_id, marca.materia_id) for marca in marcas})
+        db.session.execute(delete(ResumenPendiente).where(ResumenPendiente.id.in_([marca.id for marca in marcas])))
+        return len(marcas)
+
+    @staticmethod
+    def refrescar(pares):
+        """Recalcula (sin commit) los resúmenes de los pares (gestion_id, materia_id); materia_id None = gestión"""
+        gestiones = {gestion_id for gestion_id, materia_id in pares if materia_id is None}
+        pares = [(gestion_id, materia_id) for gestion_id, materia_id in pares
+                 if materia_id is not None and gestion_id not in gestiones]
+        if not gestiones and not pares:
+            return
+
+        def condicion(modelo):
+            condiciones = []
+            if gestiones:
+                condiciones.append(modelo.gestion_id.in_(gestiones))
+            if pares:
+                condiciones.append(tuple_(modelo.gestion_id, modelo.materia_id).in_(pares))
+            return or_(*condiciones)
+
+        AnaliticaService._recalcular(condicion)
+        # La asistencia de la gestión mezcla todas sus materias: se recalcula completa
+        afectadas = gestiones | {gestion_id for gestion_id, _ in pares}
+        AnaliticaService._recalcular_asistencia(
+            ResumenAsistencia.gestion_id.in_(afectadas), Evaluacion.gestion_id.in_(afectadas)
+        )
+        AnaliticaService._nueva_version(afectadas)
+
+    @staticmethod
+    def reconstruir():
+        """Recalcula todos los resúmenes (sin commit); retorna la cantidad de filas de resumen_materia"""
+        db.session.execute(delete(ResumenPendiente))
+        AnaliticaService._recalcular(lambda modelo: None)
+        AnaliticaService._recalcular_asistencia(None, None)
+        AnaliticaService._nueva_version(None)
+        return db.session.query(func.count(ResumenMateria.id)).scalar()
+
+    @staticmethod
+    def _nueva_version(gestion_ids):
+        """Cambia (sin commit) la versión de los resúmenes de las gestiones indicadas (o de todas)"""
+        borrar = delete(ResumenVersion)
+        if gestion_ids is None:
+            gestion_ids = db.session.execute(select(Gestion.id)).scalars().all()
+        else:
+            borrar = borrar.where(ResumenVersion.gestion_id.in_(list(gestion_ids)))
+        db.session.execute(borrar)
+        if gestion_ids:
+            version = time.time_ns()
+            db.session.execute(insert(ResumenVersion), [
+                {'gestion_id': gestion_id, 'version': version} for gestion_id in gestion_ids
+            ])
+
+    @staticmethod
+    def version(gestion_id):
+        """Versión actual de los resúmenes de la gestión (None si nunca se calcularon)"""
+        return db.session.execute(
+            select(ResumenVersion.version).where(ResumenVersion.gestion_id == gestion_id)
+        ).scalar()
+
+    @staticmethod
+    def _recalcular(condicion):
+        """DELETE + INSERT ... SELECT de resumen_materia y resumen_nota_final; condicion(modelo) filtra las filas"""
+        for resumen, origen, columnas, consulta in (
+            (ResumenMateria, Evaluacion, COLUMNAS_MATERIA, AnaliticaService._consulta_materia),
+            (ResumenNotaFinal, NotaFinal, COLUMNAS_NOTA_FINAL, AnaliticaService._consulta_nota_final),
+        ):
+            filtro_resumen = condicion(resumen)
+            borrar = delete(resumen)
+            if filtro_resumen is not None:
+                borrar = borrar.where(filtro_resumen)
+            db.session.execute(borrar)
+            db.session.execute(insert(resumen).from_select(columnas, consulta(condicion(origen))))
+
+    @staticmethod
+    def _recalcular_asistencia(filtro_resumen, filtro_origen):
+        borrar = delete(ResumenAsistencia)
+        if filtro_resumen is not None:
+            borrar = borrar.where(filtro_resumen)
+        db.session.execute(borrar)
+        db.session.execute(insert(ResumenAsistencia).from_select(
+            COLUMNAS_ASISTENCIA, AnaliticaService._consulta_asistencia(filtro_origen)
+        ))
+
+    @staticmethod
+    def _consulta_materia(filtro):
+        """Por gestión, materia y tipo; las categorías salen del promedio de cada estudiante"""
+        condiciones = [
+            Evaluacion.gestion_id.isnot(None),
+            Evaluacion.materia_id.isnot(None),
+            Evaluacion.tipo_evaluacion_id.isnot(None)
+        ]
+        if filtro is not None:
+            condiciones.append(filtro)
+        return EstadisticaAsistenciaService.consulta(
+            [Evaluacion.gestion_id, Evaluacion.materia_id, Evaluacion.tipo_evaluacion_id], *condiciones
+        )
+
+    @staticmethod
+    def _consulta_nota_final(filtro):
+        consulta = select(
+            NotaFinal.gestion_id,
+            NotaFinal.materia_id,
+            func.count(NotaFinal.id),
+            func.coalesce(func.sum(NotaFinal.valor), 0.0),
+            func.min(NotaFinal.valor),
+            func.max(NotaFinal.valor),
+            func.sum(case((NotaFinal.valor >= NOTA_APROBACION, 1), else_=0)),
+            func.sum(case((NotaFinal.valor < NOTA_APROBACION, 1), else_=0))
+        ).where(
+            NotaFinal.gestion_id.isnot(None),
+            NotaFinal.materia_id.isnot(None)
+        ).group_by(NotaFinal.gestion_id, NotaFinal.materia_id)
+        if filtro is not None:
+            consulta = consulta.where(filtro)
+        return consulta
+
+    @staticmethod
+    def _consulta_asistencia(filtro):
+        """Asistencia final de toda la gestión: promedio por estudiante (todas sus materias) y categorías"""
+        condiciones = [Evaluacion.gestion_id.isnot(None)]
+        if filtro is not None:
+            condiciones.append(filtro)
+        estadisticas = EstadisticaAsistenciaService.consulta_asistencia_final(
+            [Evaluacion.gestion_id], *condiciones
+        ).subquery()
+        return select(*(estadisticas.c[columna] for columna in COLUMNAS_ASISTENCIA))
+
+    # ========== Lecturas para los dashboards ==========
+
+    @staticmethod
+    def notas_finales_por_materia(gestion_ids, materia_ids):
+        """
+        Dict {materia_id: dict} con cantidad, suma, minimo, maximo, aprobados y reprobados
+        de las notas finales, combinando las gestiones indicadas
+        """
+        if not gestion_ids or not materia_ids:
+            return {}
+        filas = db.session.execute(select(
+            ResumenNotaFinal.materia_id,
+            func.sum(ResumenNotaFinal.cantidad).label('cantidad'),
+            func.sum(ResumenNotaFinal.suma).label('suma'),
+            func.min(ResumenNotaFinal.minimo).label('minimo'),
+            func.max(ResumenNotaFinal.maximo).label('maximo'),
+            func.sum(ResumenNotaFinal.aprobados).label('aprobados'),
+            func.sum(ResumenNotaFinal.reprobados).label('reprobados')
+        ).where(
+            ResumenNotaFinal.gestion_id.in_(list(gestion_ids)),
+            ResumenNotaFinal.materia_id.in_(list(materia_ids))
+        ).group_by(ResumenNotaFinal.materia_id))
+        return {fila.materia_id: fila._asdict() for fila in filas if fila.cantidad}
+
+    @staticmethod
+    def conteos_evaluaciones(gestion_ids=None):
+        """
+        Conteo de evaluaciones por gestión y tipo con un solo GROUP BY gestion_id, tipo_evaluacion_id
+        (índice ix_evaluacion_gestion_tipo). Los estudiantes y materias distintos por (año, período)
+        y los totales generales salen de subconsultas COUNT(DISTINCT) en la misma sentencia.
+
+        Returns:
+            (filas, totales): filas con gestion_id, anio, periodo, tipo_evaluacion_id, cantidad,
+            primera (menor id, para conservar el orden de aparición), estudiantes y materias de
+            su (año, período); totales con evaluaciones, estudiantes y materias de todo el filtro
+            (incluidas las evaluaciones sin gestión)
+        """
+        def filtrar(consulta):
+            return consulta if gestion_ids is None else consulta.where(Evaluacion.gestion_id.in_(list(gestion_ids)))
+
+        # Estudiantes y materias distintos por (año, período): así agrupa el dashboard
+        por_periodo = filtrar(select(
+            Gestion.anio,
+            Gestion.periodo,
+            func.count(Evaluacion.estudiante_ci.distinct()).label('estudiantes'),
+            func.count(Evaluacion.materia_id.distinct()).label('materias')
+        ).join(Gestion, Gestion.id == Evaluacion.gestion_id).group_by(Gestion.anio, Gestion.periodo)).subquery()
+
+        totales = filtrar(select(
+            func.count(Evaluacion.id).label('evaluaciones'),
+            func.count(Evaluacion.estudiante_ci.distinct()).label('estudiantes'),
+            func.count(Evaluacion.materia_id.distinct()).label('materias')
+        )).subquery()
+
+        filas = db.session.execute(filtrar(select(
+            Evaluacion.gestion_id,
+            Gestion.anio,
+            Gestion.periodo,
+            Evaluacion.tipo_evaluacion_id,
+            func.count(Evaluacion.id).label('cantidad'),
+            func.min(Evaluacion.id).label('primera'),
+            por_periodo.c.estudiantes,
+            por_periodo.c.materias
+        ).join(
+            Gestion, Gestion.id == Evaluacion.gestion_id
+        ).join(
+            por_periodo,
+            por_periodo.c.anio.is_not_distinct_from(Gestion.anio)
+            & por_periodo.c.periodo.is_not_distinct_from(Gestion.periodo)
+        ).group_by(
+            Evaluacion.gestion_id,
+            Evaluacion.tipo_evaluacion_id,
+            Gestion.anio,
+            Gestion.periodo,
+            por_periodo.c.estudiantes,
+            por_periodo.c.materias
+        ).order_by('primera'))).all()
+
+        return filas, db.session.execute(select(totales)).one()
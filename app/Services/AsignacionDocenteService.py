@@ -0,0 +1,77 @@
+# services/asignacion_docente_service.py
+from collections import namedtuple
+from flask import g
+from sqlalchemy import exists
+from app import db
+from ..models.Docente_Model import Docente
+from ..models.Materia_Model import Materia
+from ..models.Curso_Model import Curso
+from ..models.DocenteMateria_Model import DocenteMateria
+from ..models.MateriaCurso_Model import MateriaCurso
+
+Asignacion = namedtuple('Asignacion', ['docente', 'materia', 'curso'])
+
+
+class AsignacionDocenteService:
+    """
+    Valida la cadena docente -> materia -> curso que usan los reportes del docente:
+    el docente, la materia y el curso existen, el docente enseña la materia y la materia
+    pertenece al curso.
+
+    resolver() lo hace con una sola consulta con joins y memoriza el resultado durante la
+    solicitud (flask.g). No hay caché entre solicitudes: una asignación eliminada o cambiada
+    (en cualquier worker) deja de valer en la siguiente solicitud.
+
+    Si la cadena no es válida se lanza ValueError con el mismo mensaje que usaban las rutas.
+    """
+
+    @staticmethod
+    def resolver(docente_ci, materia_id, curso_id):
+        """Retorna Asignacion(docente, materia, curso) o lanza ValueError"""
+        clave = (docente_ci, materia_id, curso_id)
+        memo = g.setdefault('asignaciones_docente', {})
+        if clave not in memo:
+            memo[clave] = AsignacionDocenteService._consultar(docente_ci, materia_id, curso_id)
+
+        asignacion, error = memo[clave]
+        if error:
+            raise ValueError(error)
+        return asignacion
+
+    @staticmethod
+    def _consultar(docente_ci, materia_id, curso_id):
+        """Retorna (Asignacion, None) o (None, mensaje de error)"""
+        docente_materia = exists().where(
+            DocenteMateria.docente_ci == Docente.ci,
+            DocenteMateria.materia_id == Materia.id
+        )
+        materia_curso = exists().where(
+            MateriaCurso.materia_id == Materia.id,
+            MateriaCurso.curso_id == Curso.id
+        )
+
+        fila = db.session.query(
+            Docente, Materia, Curso, docente_materia, materia_curso
+        ).select_from(Docente).join(
+            Materia, Materia.id == materia_id
+        ).join(
+            Curso, Curso.id == curso_id
+        ).filter(
+            Docente.ci == docente_ci
+        ).first()
+
+        if fila is None:
+            # Alguna entidad no existe: determinar cuál (solo en el camino de error)
+            if not Docente.query.filter_by(ci=docente_ci).first():
+                return None, 'Docente no encontrado'
+            if not Materia.query.get(materia_id):
+                return None, 'Materia no encontrada'
+            return None, 'Curso no encontrado'
+
+        docente, materia, curso, ensena, pertenece = fila
+        if not ensena:
+            return None, 'El docente no enseña esa materia'
+        if not pertenece:
+            return None, 'La materia no pertenece a ese curso'
+
+        return Asignacion(docente, materia, curso), None
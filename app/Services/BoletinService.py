@@ -0,0 +1,65 @@
+# services/boletin_service.py
+from ..models.NotaFinal_Model import NotaFinal
+from ..models.NotaEstimada_Model import NotaEstimada
+
+
+class BoletinService:
+    @staticmethod
+    def notas_por_estudiante_y_gestion(modelo, estudiante_cis, materia_id, gestion_ids):
+        """
+        Carga con una sola consulta las notas (NotaFinal o NotaEstimada) de varios estudiantes
+        en una materia para varias gestiones.
+
+        Returns:
+            Dict {(estudiante_ci, gestion_id): nota}. Si hubiera filas repetidas se conserva
+            la de menor id, como hacía el .first() por estudiante y gestión.
+        """
+        estudiante_cis = list(estudiante_cis)
+        gestion_ids = list(gestion_ids)
+        if not estudiante_cis or not gestion_ids:
+            return {}
+
+        filas = modelo.query.filter(
+            modelo.estudiante_ci.in_(estudiante_cis),
+            modelo.materia_id == materia_id,
+            modelo.gestion_id.in_(gestion_ids)
+        ).order_by(modelo.id).all()
+
+        notas = {}
+        for fila in filas:
+            notas.setdefault((fila.estudiante_ci, fila.gestion_id), fila)
+        return notas
+
+    @staticmethod
+    def notas_finales(estudiante_cis, materia_id, gestion_ids):
+        return BoletinService.notas_por_estudiante_y_gestion(NotaFinal, estudiante_cis, materia_id, gestion_ids)
+
+    @staticmethod
+    def notas_estimadas(estudiante_cis, materia_id, gestion_ids):
+        return BoletinService.notas_por_estudiante_y_gestion(NotaEstimada, estudiante_cis, materia_id, gestion_ids)
+
+
+    @staticmethod
+    def notas_de_estudiante(modelo, estudiante_ci, materia_ids, gestion_ids):
+        """
+        Carga con una sola consulta las notas (NotaFinal o NotaEstimada) de un estudiante
+        en varias materias y gestiones.
+
+        Returns:
+            Dict {(materia_id, gestion_id): nota}, con la fila de menor id si hubiera repetidas.
+        """
+        materia_ids = list(materia_ids)
+        gestion_ids = list(gestion_ids)
+        if not materia_ids or not gestion_ids:
+            return {}
+
+        filas = modelo.query.filter(
+            modelo.estudiante_ci == estudiante_ci,
+            modelo.materia_id.in_(materia_ids),
+            modelo.gestion_id.in_(gestion_ids)
+        ).order_by(modelo.id).all()
+
+        notas = {}
+        for fila in filas:
+            notas.setdefault((fila.materia_id, fila.gestion_id), fila)
+        return notas
@@ -0,0 +1,224 @@
+# services/busqueda_nombre_service.py
+import threading
+import time
+import unicodedata
+import heapq
+from collections import Counter
+from sqlalchemy import case, func, literal, or_, text
+from app import db
+
+# Umbral de similitud por trigramas para aceptar coincidencias con errores de tipeo
+UMBRAL_SIMILITUD = 0.4
+
+
+def normalizar(texto):
+    """Minúsculas y sin tildes ni diéresis (José Peña -> jose pena)"""
+    sin_marcas = unicodedata.normalize('NFD', texto or '').encode('ascii', 'ignore').decode('ascii')
+    return ' '.join(sin_marcas.lower().split())
+
+
+def trigramas(palabra):
+    """Trigramas de una palabra con relleno, como pg_trgm ('  jo', ' jos', 'jos', ...)"""
+    relleno = f'  {palabra} '
+    return {relleno[i:i + 3] for i in range(len(relleno) - 2)}
+
+
+def similitud(ta, tb):
+    """Similitud de Jaccard entre dos conjuntos de trigramas"""
+    if not ta or not tb:
+        return 0.0
+    return len(ta & tb) / len(ta | tb)
+
+
+class IndiceNombres:
+    """
+    Índice en memoria de los nombres de una tabla, a nivel de palabra: cada palabra distinta
+    (el vocabulario, mucho menor que la cantidad de personas) apunta a las claves que la usan,
+    y un índice invertido de trigramas apunta a las palabras para las coincidencias aproximadas.
+
+    Todas las palabras del término deben coincidir con alguna palabra del nombre (exacta,
+    por prefijo, contenida o parecida); la última puede estar a medio escribir.
+    """
+
+    def __init__(self, filas):
+        self.nombres = {}
+        self.claves_por_palabra = {}
+        self.trigramas_de = {}
+        self.palabras_por_trigrama = {}
+        for clave, nombre in filas:
+            normalizado = normalizar(nombre)
+            self.nombres[clave] = normalizado
+            for palabra in normalizado.split():
+                claves = self.claves_por_palabra.get(palabra)
+                if claves is None:
+                    claves = self.claves_por_palabra[palabra] = set()
+                    self.trigramas_de[palabra] = trigramas(palabra)
+                    for trigrama in self.trigramas_de[palabra]:
+                        self.palabras_por_trigrama.setdefault(trigrama, set()).add(palabra)
+                claves.add(clave)
+
+    def palabras_parecidas(self, palabra_termino):
+        """Dict {palabra del vocabulario: puntaje} de las palabras que coinciden con `palabra_termino`"""
+        puntajes = {}
+        for palabra in self.claves_por_palabra:
+            if palabra_termino in palabra:
+                puntajes[palabra] = 1.0 if palabra == palabra_termino else (
+                    0.9 if palabra.startswith(palabra_termino) else 0.7
+                )
+
+        propios = trigramas(palabra_termino)
+        compartidos = Counter()
+        for trigrama in propios:
+            compartidos.update(self.palabras_por_trigrama.get(trigrama, ()))
+        for palabra, cantidad in compartidos.items():
+            if palabra in puntajes or cantidad < len(propios) * UMBRAL_SIMILITUD / 2:
+                continue
+            parecido = similitud(propios, self.trigramas_de[palabra])
+            if parecido >= UMBRAL_SIMILITUD:
+                puntajes[palabra] = 0.6 * parecido
+        return puntajes
+
+    def buscar(self, termino, limite=None):
+        """Lista de claves ordenadas por relevancia (todas si `limite` es None)"""
+        palabras_termino = termino.split()
+        if not palabras_termino:
+            return []
+
+        coincidencias = [self.palabras_parecidas(palabra) for palabra in palabras_termino]
+        candidatas = None
+        for puntajes in sorted(coincidencias, key=len):
+            claves = set().union(*(self.claves_por_palabra[palabra] for palabra in puntajes))
+            candidatas = claves if candidatas is None else candidatas & claves
+            if not candidatas:
+                return []
+
+        resultados = []
+        for clave in candidatas:
+            nombre = self.nombres[clave]
+            palabras = nombre.split()
+            puntaje = sum(
+                max(puntajes.get(palabra, 0.0) for palabra in palabras) for puntajes in coincidencias
+            )
+            resultados.append((_rango(nombre, termino), -puntaje, nombre, clave))
+
+        ordenados = sorted(resultados) if limite is None else heapq.nsmallest(limite, resultados)
+        return [clave for *_, clave in ordenados]
+
+
+def _rango(nombre, termino):
+    """0: el nombre empieza con el término, 1: una palabra empieza con él, 2: lo contiene, 3: aproximado"""
+    if nombre.startswith(termino):
+        return 0
+    if f' {termino}' in f' {nombre}':
+        return 1
+    if termino in nombre:
+        return 2
+    return 3
+
+
+class BusquedaNombreService:
+    """
+    Búsqueda de personas (estudiantes, docentes) por nombre para autocompletado: por prefijo,
+    sin distinguir tildes ni mayúsculas y tolerante a errores de tipeo, ordenada por relevancia.
+
+    En PostgreSQL usa el índice GIN de trigramas (pg_trgm) sobre f_unaccent(lower(nombre))
+    creado por la migración; en otros motores (SQLite) o si la extensión no está disponible,
+    un índice en memoria por tabla que se reconstruye tras invalidar() o cada TTL_SEGUNDOS.
+    """
+    TTL_SEGUNDOS = 300
+    LIMITE_MAXIMO = 100
+
+    _lock = threading.Lock()
+    _indices = {}
+    _trigramas_en_base = None
+
+    @classmethod
+    def buscar(cls, modelo, columna, termino, limite=None):
+        """
+        Args:
+            modelo: Estudiante o Docente
+            columna: atributo de nombre (p. ej. Estudiante.nombreCompleto)
+            termino: texto buscado
+            limite: cantidad máxima de resultados (hasta LIMITE_MAXIMO); sin límite devuelve
+                    todas las coincidencias, como la búsqueda original
+
+        Returns:
+            Lista de instancias de `modelo` ordenadas por relevancia
+        """
+        limite = max(1, min(limite, cls.LIMITE_MAXIMO)) if limite else None
+        normalizado = normalizar(termino)
+        if not normalizado:
+            return []
+
+        if cls._usar_trigramas_en_base():
+            return cls._buscar_en_base(modelo, columna, normalizado, limite)
+
+        claves = cls._indice(modelo, columna).buscar(normalizado, limite)
+        if not claves:
+            return []
+        clave_primaria = modelo.__mapper__.primary_key[0]
+        por_clave = {
+            getattr(objeto, clave_primaria.key): objeto
+            for objeto in modelo.query.filter(clave_primaria.in_(claves)).all()
+        }
+        return [por_clave[clave] for clave in claves if clave in por_clave]
+
+    @classmethod
+    def invalidar(cls, modelo=None):
+        """Descarta el índice en memoria de `modelo` (o de todos)"""
+        with cls._lock:
+            if modelo is None:
+                cls._indices = {}
+            else:
+                cls._indices.pop(modelo.__tablename__, None)
+
+    @staticmethod
+    def _buscar_en_base(modelo, columna, termino, limite):
+        nombre = func.f_unaccent(func.lower(columna))
+        parecido = func.word_similarity(termino, nombre)
+        contiene = nombre.contains(termino, autoescape=True)
+        rango = case(
+            (nombre.startswith(termino, autoescape=True), 0),
+            (nombre.contains(' ' + termino, autoescape=True), 1),
+            (contiene, 2),
+            else_=3
+        )
+        # LIKE '%término%' y el operador <% (word_similarity) usan el índice GIN de trigramas
+        consulta = modelo.query.filter(
+            or_(contiene, literal(termino).op('<%')(nombre))
+        ).order_by(
+            rango, parecido.desc(), nombre
+        )
+        if limite is not None:
+            consulta = consulta.limit(limite)
+        return consulta.all()
+
+    @classmethod
+    def _usar_trigramas_en_base(cls):
+        """PostgreSQL con pg_trgm y f_unaccent (se comprueba una vez por proceso)"""
+        if cls._trigramas_en_base is None:
+            disponible = False
+            if db.session.get_bind().dialect.name == 'postgresql':
+                try:
+                    disponible = bool(db.session.execute(text(
+                        "SELECT EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm') "
+                        "AND EXISTS (SELECT 1 FROM pg_proc WHERE proname = 'f_unaccent')"
+                    )).scalar())
+                except Exception:
+                    db.session.rollback()
+            cls._trigramas_en_base = disponible
+        return cls._trigramas_en_base
+
+    @classmethod
+    def _indice(cls, modelo, columna):
+        tabla = modelo.__tablename__
+        entrada = cls._indices.get(tabla)
+        if entrada and entrada[1] > time.monotonic():
+            return entrada[0]
+
+        clave_primaria = modelo.__mapper__.primary_key[0]
+        filas = db.session.query(clave_primaria, columna).all()
+        indice = IndiceNombres(filas)
+        with cls._lock:
+            cls._indices[tabla] = (indice, time.monotonic() + cls.TTL_SEGUNDOS)
+        return indice
@@ -0,0 +1,106 @@
+# services/catalogo_evaluacion_service.py
+import threading
+import time
+from ..models.TipoEvaluacion_Model import TipoEvaluacion
+from ..models.EvaluacionIntegral_Model import EvaluacionIntegral
+
+ASISTENCIA_DIARIA = 'Asistencia-Diaria'
+ASISTENCIA_FINAL = 'Asistencia-Final'
+
+# IDs con los que el seeder crea los tipos de asistencia; se usan si el catálogo no los tiene
+TIPOS_POR_DEFECTO = {
+    ASISTENCIA_DIARIA: 1,
+    ASISTENCIA_FINAL: 2,
+}
+
+
+class CatalogoEvaluacionService:
+    """
+    Caché en memoria (por proceso) de los catálogos EvaluacionIntegral y TipoEvaluacion.
+    Se carga en create_app y se invalida en cada escritura de TipoEvaluacion_Routes y
+    EvaluacionIntegral_Routes. El TTL cubre los cambios hechos desde otro worker.
+    """
+    TTL_SEGUNDOS = 300
+
+    _lock = threading.Lock()
+    _catalogo = None
+    _cargado_en = 0.0
+
+    @classmethod
+    def cargar(cls):
+        """Lee ambas tablas y reemplaza el catálogo en memoria"""
+        integrales = EvaluacionIntegral.query.order_by(EvaluacionIntegral.id).all()
+        tipos = TipoEvaluacion.query.order_by(TipoEvaluacion.id).all()
+
+        # nombre en minúsculas -> id (la primera por id si hay nombres repetidos)
+        integral_ids = {}
+        for integral in integrales:
+            integral_ids.setdefault(integral.nombre.lower(), integral.id)
+
+        dimension_por_integral = {id_: nombre for nombre, id_ in integral_ids.items()}
+        tipos_por_dimension = {nombre: [] for nombre in integral_ids}
+        dimension_por_tipo = {}
+        for tipo in tipos:
+            dimension = dimension_por_integral.get(tipo.evaluacion_integral_id)
+            if dimension:
+                tipos_por_dimension[dimension].append(tipo.id)
+                dimension_por_tipo[tipo.id] = dimension
+
+        catalogo = {
+            'integral_ids': integral_ids,
+            'tipo_ids': {tipo.nombre: tipo.id for tipo in reversed(tipos)},
+            'tipos_por_dimension': tipos_por_dimension,
+            'dimension_por_tipo': dimension_por_tipo,
+        }
+        with cls._lock:
+            cls._catalogo = catalogo
+            cls._cargado_en = time.monotonic()
+        return catalogo
+
+    @classmethod
+    def invalidar(cls):
+        """Descarta el catálogo; se vuelve a leer en el próximo acceso"""
+        with cls._lock:
+            cls._catalogo = None
+
+    @classmethod
+    def _obtener(cls):
+        catalogo = cls._catalogo
+        # Un catálogo vacío (tablas aún sin seeders) no se conserva: se reintenta en el próximo acceso
+        if (catalogo is None or not catalogo['integral_ids']
+                or time.monotonic() - cls._cargado_en > cls.TTL_SEGUNDOS):
+            catalogo = cls.cargar()
+        return catalogo
+
+    @classmethod
+    def integral_id(cls, nombre):
+        """ID de la EvaluacionIntegral por nombre (sin distinguir mayúsculas) o None"""
+        return cls._obtener()['integral_ids'].get(nombre.lower())
+
+    @classmethod
+    def tipo_id(cls, nombre):
+        """ID del TipoEvaluacion por nombre exacto; para los tipos de asistencia usa el ID del seeder si no existe"""
+        return cls._obtener()['tipo_ids'].get(nombre, TIPOS_POR_DEFECTO.get(nombre))
+
+    @classmethod
+    def tipo_ids(cls):
+        """IDs de todos los TipoEvaluacion registrados"""
+        return list(cls._obtener()['tipo_ids'].values())
+
+    @classmethod
+    def asistencia_diaria_id(cls):
+        return cls.tipo_id(ASISTENCIA_DIARIA)
+
+    @classmethod
+    def asistencia_final_id(cls):
+        return cls.tipo_id(ASISTENCIA_FINAL)
+
+    @classmethod
+    def tipos_de_dimension(cls, dimension):
+        """IDs de TipoEvaluacion que pertenecen a una dimensión (ser, hacer, saber, decidir)"""
+        return list(cls._obtener()['tipos_por_dimension'].get(dimension.lower(), []))
+
+    @classmethod
+    def dimension_por_tipo(cls):
+        """Dict {tipo_evaluacion_id: dimensión} para los tipos asociados a una evaluación integral"""
+        return dict(cls._obtener()['dimension_por_tipo'])
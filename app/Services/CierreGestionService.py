@@ -0,0 +1,123 @@
+# services/cierre_gestion_service.py
+import time
+import numpy as np
+import pandas as pd
+from sqlalchemy import func, select
+from app import db
+from ..models.Evaluacion_Model import Evaluacion
+from .NotaIntegralService import NotaIntegralService, DIMENSIONES
+from .UpsertNotasService import UpsertNotasService
+
+COLUMNAS = ['estudiante_ci', 'materia_id', 'dimension', 'promedio', 'evaluaciones']
+
+
+class CierreGestionService:
+    """
+    Cierre de gestión: calcula la NotaFinal integral (ser + hacer + saber + decidir) de todos
+    los (estudiante, materia) con evaluaciones en una gestión.
+
+    Los promedios por dimensión se leen en bloques desde la base (un solo GROUP BY, leído con
+    yield_per), la nota integral se calcula vectorizada con pandas/NumPy y se guarda con un
+    upsert por bloque. Los valores son los mismos que NotaIntegralService.nota_final_de.
+    """
+    TAMANO_BLOQUE = 5000
+
+    @staticmethod
+    def cerrar_gestion(gestion_id, tamano_bloque=None, al_procesar_bloque=None):
+        """
+        Calcula y guarda (sin commit) las notas finales de la gestión.
+
+        Args:
+            tamano_bloque: filas de agregados leídas por bloque
+            al_procesar_bloque: función opcional que recibe el resumen acumulado tras cada bloque
+
+        Returns:
+            Dict con notas guardadas, evaluaciones procesadas, bloques y segundos
+        """
+        tamano_bloque = tamano_bloque or CierreGestionService.TAMANO_BLOQUE
+        inicio = time.perf_counter()
+        resumen = {'notas': 0, 'evaluaciones': 0, 'bloques': 0, 'segundos': 0.0}
+
+        def procesar(filas):
+            if not filas:
+                return
+            notas = CierreGestionService.notas_integrales(filas, gestion_id)
+            UpsertNotasService.upsert_notas_finales(notas)
+            resumen['notas'] += len(notas)
+            resumen['evaluaciones'] += sum(fila[4] for fila in filas)
+            resumen['bloques'] += 1
+            resumen['segundos'] = time.perf_counter() - inicio
+            if al_procesar_bloque:
+                al_procesar_bloque(dict(resumen))
+
+        # Las filas vienen ordenadas por clave; las de la última clave de un bloque se guardan
+        # para el siguiente, porque sus dimensiones pueden continuar allí
+        pendientes = []
+        resultado = db.session.execute(
+            CierreGestionService._consulta_agregados(gestion_id).execution_options(yield_per=tamano_bloque)
+        )
+        for particion in resultado.partitions():
+            filas = pendientes + [tuple(fila) for fila in particion]
+            ultima_clave = filas[-1][:2]
+            corte = len(filas)
+            while corte > 0 and filas[corte - 1][:2] == ultima_clave:
+                corte -= 1
+            pendientes = filas[corte:]
+            procesar(filas[:corte])
+        procesar(pendientes)
+
+        resumen['segundos'] = time.perf_counter() - inicio
+        return resumen
+
+    @staticmethod
+    def _consulta_agregados(gestion_id):
+        """Promedio y cantidad de evaluaciones por (estudiante, materia, dimensión) de la gestión"""
+        dimension, _ = NotaIntegralService.expresion_dimension()
+        return select(
+            Evaluacion.estudiante_ci,
+            Evaluacion.materia_id,
+            dimension,
+            func.avg(Evaluacion.nota),
+            func.count(Evaluacion.id)
+        ).where(
+            Evaluacion.gestion_id == gestion_id,
+            Evaluacion.estudiante_ci.isnot(None),
+            Evaluacion.materia_id.isnot(None)
+        ).group_by(
+            Evaluacion.estudiante_ci,
+            Evaluacion.materia_id,
+            dimension
+        ).order_by(
+            Evaluacion.estudiante_ci,
+            Evaluacion.materia_id
+        )
+
+    @staticmethod
+    def notas_integrales(filas, gestion_id):
+        """
+        Convierte filas (estudiante_ci, materia_id, dimensión, promedio, cantidad) en filas de NotaFinal.
+        Las claves cuyas evaluaciones no tienen dimensión (p. ej. solo asistencia diaria) valen 0.
+        """
+        df = pd.DataFrame(filas, columns=COLUMNAS)
+        claves = pd.MultiIndex.from_frame(df[['estudiante_ci', 'materia_id']].drop_duplicates())
+
+        con_dimension = df[df['dimension'].isin(DIMENSIONES)]
+        promedios = con_dimension.pivot(
+            index=['estudiante_ci', 'materia_id'], columns='dimension', values='promedio'
+        ).reindex(index=claves, columns=list(DIMENSIONES)).astype(float).fillna(0.0)
+
+        # Mismo orden de suma que NotaIntegralService.nota_integral: ((ser + hacer) + saber) + decidir
+        total = np.zeros(len(promedios))
+        for dimension in DIMENSIONES:
+            total = total + promedios[dimension].to_numpy()
+
+        # round() de Python (no np.round) para redondear exactamente igual que nota_integral
+        return [
+            {
+                'estudiante_ci': int(estudiante_ci),
+                'materia_id': int(materia_id),
+                'gestion_id': gestion_id,
+                'valor': round(valor, 2)
+            }
+            for (estudiante_ci, materia_id), valor in zip(promedios.index, total.tolist())
+        ]
@@ -0,0 +1,335 @@
+# services/dashboard_docente_service.py
+from sqlalchemy import func
+from app import db
+from ..models.Curso_Model import Curso
+from ..models.DocenteMateria_Model import DocenteMateria
+from ..models.Gestion_Model import Gestion
+from ..models.Inscripcion_Model import Inscripcion
+from ..models.Materia_Model import Materia
+from ..models.MateriaCurso_Model import MateriaCurso
+from .AnaliticaService import AnaliticaService
+from .EstadisticaAsistenciaService import EstadisticaAsistenciaService, NOTA_MAXIMA_ASISTENCIA
+from .RankingEstudiantesService import RankingEstudiantesService
+
+
+def categoria_nota(promedio):
+    """Categoría de un promedio de notas finales"""
+    if promedio >= 61:
+        return "Excelente"
+    if promedio >= 51:
+        return "Bueno"
+    if promedio >= 36:
+        return "Regular"
+    return "Deficiente"
+
+
+class DashboardDocenteService:
+    """
+    Bloques del dashboard del docente (estudiantes por curso, asistencia promedio, notas
+    promedio y mejores/peores estudiantes). Cada endpoint arma el suyo y el snapshot los
+    cuatro, sobre el mismo alcance: las materias del docente se resuelven una vez (alcance())
+    y cada bloque hace consultas por lotes para todas sus materias y cursos.
+    """
+
+    @staticmethod
+    def alcance(docente):
+        """Dict con el docente, sus DocenteMateria (en orden) y {materia_id: Materia} en dos consultas"""
+        docente_materias = DocenteMateria.query.filter_by(docente_ci=docente.ci).all()
+        materia_ids = {dm.materia_id for dm in docente_materias}
+        materias = {
+            materia.id: materia
+            for materia in Materia.query.filter(Materia.id.in_(materia_ids))
+        } if materia_ids else {}
+        return {
+            'docente': docente,
+            'docente_materias': docente_materias,
+            'materias': materias,
+        }
+
+    @staticmethod
+    def docente_info(docente):
+        return {
+            'ci': docente.ci,
+            'nombre_completo': docente.nombreCompleto
+        }
+
+    @staticmethod
+    def gestion_info(gestion):
+        return {
+            'id': gestion.id,
+            'anio': gestion.anio,
+            'periodo': gestion.periodo
+        }
+
+    @staticmethod
+    def _materias_del_alcance(alcance):
+        """(DocenteMateria, Materia) en el orden de asignación, omitiendo materias inexistentes"""
+        return [
+            (dm, alcance['materias'][dm.materia_id])
+            for dm in alcance['docente_materias'] if dm.materia_id in alcance['materias']
+        ]
+
+    @staticmethod
+    def estudiantes_por_curso(alcance, year):
+        """Cursos donde se dictan las materias del docente con sus inscritos del año (una consulta de conteo)"""
+        docente = alcance['docente']
+        docente_materias = alcance['docente_materias']
+        if not docente_materias:
+            return {
+                'mensaje': 'El docente no tiene materias asignadas',
+                'docente': DashboardDocenteService.docente_info(docente),
+                'year_filtrado': year,
+                'cursos': [],
+                'total_estudiantes': 0
+            }
+
+        # Cursos de todas las materias del docente
+        cursos_por_materia = {}
+        for materia_curso, curso in db.session.query(MateriaCurso, Curso).join(
+            Curso, Curso.id == MateriaCurso.curso_id
+        ).filter(
+            MateriaCurso.materia_id.in_(list(alcance['materias']))
+        ).order_by(MateriaCurso.id):
+            cursos_por_materia.setdefault(materia_curso.materia_id, []).append(curso)
+
+        # Inscritos del año en cada curso, con un solo GROUP BY
+        curso_ids = {curso.id for cursos in cursos_por_materia.values() for curso in cursos}
+        inscritos = dict(db.session.query(
+            Inscripcion.curso_id, func.count(Inscripcion.id)
+        ).filter(
+            Inscripcion.curso_id.in_(curso_ids),
+            db.extract('year', Inscripcion.fecha) == year
+        ).group_by(Inscripcion.curso_id).all()) if curso_ids else {}
+
+        cursos_estudiantes = {}
+        for dm, materia in DashboardDocenteService._materias_del_alcance(alcance):
+            for curso in cursos_por_materia.get(materia.id, []):
+                curso_key = f"{curso.id}_{curso.nombre}"
+                if curso_key not in cursos_estudiantes:
+                    cursos_estudiantes[curso_key] = {
+                        'curso_info': {
+                            'id': curso.id,
+                            'nombre': curso.nombre,
+                            'paralelo': curso.Paralelo,
+                            'nivel': curso.Nivel
+                        },
+                        'total_estudiantes': inscritos.get(curso.id, 0),
+                        'materias_docente': []
+                    }
+
+                materia_info = {
+                    'id': materia.id,
+                    'nombre': materia.nombre
+                }
+                if materia_info not in cursos_estudiantes[curso_key]['materias_docente']:
+                    cursos_estudiantes[curso_key]['materias_docente'].append(materia_info)
+
+        # Total general sin contar dos veces un curso
+        cursos_unicos = {data['curso_info']['id'] for data in cursos_estudiantes.values()}
+        total_estudiantes_general = sum(inscritos.get(curso_id, 0) for curso_id in cursos_unicos)
+
+        return {
+            'docente': DashboardDocenteService.docente_info(docente),
+            'year_filtrado': year,
+            'cursos': list(cursos_estudiantes.values()),
+            'resumen': {
+                'total_cursos': len(cursos_estudiantes),
+                'total_estudiantes': total_estudiantes_general,
+                'total_materias_asignadas': len(docente_materias)
+            },
+            'mensaje': f'Información de estudiantes por curso para el docente {docente.nombreCompleto} - Año {year}'
+        }
+
+    @staticmethod
+    def asistencia_promedio(alcance, gestion):
+        """Promedio de asistencia final por materia del docente en la gestión (None: no hay gestiones)"""
+        docente = alcance['docente']
+        if gestion is None:
+            return {
+                'mensaje': 'No se encontraron gestiones registradas',
+                'asistencia_promedio': {},
+                'promedio_general': 0
+            }
+        if not alcance['docente_materias']:
+            return {
+                'mensaje': 'El docente no tiene materias asignadas',
+                'docente': DashboardDocenteService.docente_info(docente),
+                'asistencia_promedio': {},
+                'promedio_general': 0
+            }
+
+        estadisticas = EstadisticaAsistenciaService.por_materia(gestion.id, alcance['materias'])
+        asistencia_por_materia = {}
+        suma_promedios = 0
+        materias_con_datos = 0
+
+        for dm, materia in DashboardDocenteService._materias_del_alcance(alcance):
+            estadisticas_materia = estadisticas.get(materia.id)
+            if not estadisticas_materia:
+                continue
+
+            promedio_materia = estadisticas_materia['promedio']
+            # Convertir a porcentaje (escala de 15 a 100%)
+            porcentaje_asistencia = round((promedio_materia / NOTA_MAXIMA_ASISTENCIA) * 100, 2)
+
+            asistencia_por_materia[f"materia_{materia.id}"] = {
+                'materia_info': {
+                    'id': materia.id,
+                    'nombre': materia.nombre
+                },
+                'promedio_asistencia_nota': round(promedio_materia, 2),
+                'porcentaje_asistencia': porcentaje_asistencia,
+                'total_evaluaciones': estadisticas_materia['total_evaluaciones'],
+                'total_estudiantes_evaluados': estadisticas_materia['total_estudiantes']
+            }
+            suma_promedios += porcentaje_asistencia
+            materias_con_datos += 1
+
+        promedio_general = round(suma_promedios / materias_con_datos, 2) if materias_con_datos > 0 else 0
+        return {
+            'docente': DashboardDocenteService.docente_info(docente),
+            'gestion': DashboardDocenteService.gestion_info(gestion),
+            'asistencia_por_materia': asistencia_por_materia,
+            'resumen': {
+                'promedio_general_asistencia': promedio_general,
+                'total_materias_con_datos': materias_con_datos,
+                'total_materias_asignadas': len(alcance['docente_materias'])
+            },
+            'mensaje': f'Promedio de asistencia calculado para {materias_con_datos} materias del docente'
+        }
+
+    @staticmethod
+    def notas_promedio(alcance, gestion):
+        """Promedio de notas finales por materia del docente en la gestión (None: no hay gestiones)"""
+        docente = alcance['docente']
+        if gestion is None:
+            return {
+                'mensaje': 'No se encontraron gestiones registradas',
+                'notas_promedio': {},
+                'promedio_general': 0
+            }
+        if not alcance['docente_materias']:
+            return {
+                'mensaje': 'El docente no tiene materias asignadas',
+                'docente': DashboardDocenteService.docente_info(docente),
+                'notas_promedio': {},
+                'promedio_general': 0
+            }
+
+        AnaliticaService.sincronizar([gestion.id])
+        resumenes = AnaliticaService.notas_finales_por_materia([gestion.id], alcance['materias'])
+        notas_por_materia = {}
+        suma_promedios = 0
+        materias_con_datos = 0
+
+        for dm, materia in DashboardDocenteService._materias_del_alcance(alcance):
+            resumen = resumenes.get(materia.id)
+            if not resumen:
+                continue
+
+            promedio_materia = resumen['suma'] / resumen['cantidad']
+            notas_por_materia[f"materia_{materia.id}"] = {
+                'materia_info': {
+                    'id': materia.id,
+                    'nombre': materia.nombre
+                },
+                'promedio_notas': round(promedio_materia, 2),
+                'categoria': categoria_nota(promedio_materia),
+                'total_estudiantes': resumen['cantidad'],
+                'distribucion_notas': {
+                    'aprobados': resumen['aprobados'],
+                    'reprobados': resumen['reprobados'],
+                    'nota_maxima': resumen['maximo'],
+                    'nota_minima': resumen['minimo']
+                }
+            }
+            suma_promedios += promedio_materia
+            materias_con_datos += 1
+
+        promedio_general = round(suma_promedios / materias_con_datos, 2) if materias_con_datos > 0 else 0
+        return {
+            'docente': DashboardDocenteService.docente_info(docente),
+            'gestion': DashboardDocenteService.gestion_info(gestion),
+            'notas_por_materia': notas_por_materia,
+            'resumen': {
+                'promedio_general': promedio_general,
+                'categoria_general': categoria_nota(promedio_general),
+                'total_materias_con_datos': materias_con_datos,
+                'total_materias_asignadas': len(alcance['docente_materias'])
+            },
+            'mensaje': f'Promedio de notas calculado para {materias_con_datos} materias del docente'
+        }
+
+    @staticmethod
+    def mejores_peores(alcance, year, k=None):
+        """Los k mejores y peores estudiantes de cada materia del docente en las gestiones del año"""
+        docente = alcance['docente']
+        if not alcance['docente_materias']:
+            return {
+                'mensaje': 'El docente no tiene materias asignadas',
+                'docente': DashboardDocenteService.docente_info(docente),
+                'year': year,
+                'materias_con_estudiantes': {}
+            }
+
+        gestion_ids = [gestion_id for gestion_id, in db.session.query(Gestion.id).filter_by(anio=year)]
+        if not gestion_ids:
+            return {
+                'mensaje': f'No se encontraron gestiones para el año {year}',
+                'docente': DashboardDocenteService.docente_info(docente),
+                'year': year,
+                'materias_con_estudiantes': {}
+            }
+
+        k = k or RankingEstudiantesService.K_POR_DEFECTO
+        ranking = RankingEstudiantesService.por_materia(gestion_ids, alcance['materias'], k)
+        materias_resultados = {
+            f"materia_{materia.id}": DashboardDocenteService.ranking_de_materia(materia, ranking.get(materia.id))
+            for dm, materia in DashboardDocenteService._materias_del_alcance(alcance)
+        }
+        return {
+            'docente': DashboardDocenteService.docente_info(docente),
+            'year': year,
+            'k': k,
+            'materias_con_estudiantes': materias_resultados,
+            'resumen': {
+                'total_materias_evaluadas': len([m for m in materias_resultados.values() if m.get('estadisticas')]),
+                'total_materias_asignadas': len(alcance['docente_materias'])
+            },
+            'mensaje': f'Ranking de estudiantes obtenido para {len(materias_resultados)} materias del docente'
+        }
+
+    @staticmethod
+    def ranking_de_materia(materia, ranking):
+        """Bloque de una materia con sus mejores/peores estudiantes y estadísticas (o sin notas)"""
+        materia_info = {
+            'id': materia.id,
+            'nombre': materia.nombre
+        }
+        if not ranking:
+            return {
+                'materia_info': materia_info,
+                'mensaje': 'No hay notas registradas para esta materia',
+                'mejores_estudiantes': [],
+                'peores_estudiantes': [],
+                'total_estudiantes': 0
+            }
+        return {
+            'materia_info': materia_info,
+            'mejores_estudiantes': ranking['mejores'],
+            'peores_estudiantes': ranking['peores'],
+            'estadisticas': ranking['estadisticas']
+        }
+
+    @staticmethod
+    def snapshot(alcance, year, gestion, k=None):
+        """Los cuatro bloques del dashboard del docente sobre un mismo alcance"""
+        return {
+            'docente': DashboardDocenteService.docente_info(alcance['docente']),
+            'year': year,
+            'gestion': DashboardDocenteService.gestion_info(gestion) if gestion else None,
+            'estudiantes_por_curso': DashboardDocenteService.estudiantes_por_curso(alcance, year),
+            'asistencia_promedio': DashboardDocenteService.asistencia_promedio(alcance, gestion),
+            'notas_promedio': DashboardDocenteService.notas_promedio(alcance, gestion),
+            'mejores_peores_estudiantes': DashboardDocenteService.mejores_peores(alcance, year, k)
+        }
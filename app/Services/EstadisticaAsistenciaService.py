@@ -0,0 +1,141 @@
+# services/estadistica_asistencia_service.py
+import threading
+from sqlalchemy import case, func, select
+from ..models.Evaluacion_Model import Evaluacion
+from ..models.ResumenAsistencia_Model import ResumenAsistencia
+from ..models.ResumenMateria_Model import ResumenMateria
+from .CatalogoEvaluacionService import CatalogoEvaluacionService
+
+# Nota máxima de asistencia final
+NOTA_MAXIMA_ASISTENCIA = 15
+
+# Categorías por promedio del estudiante: 90%, 70% y 50% de 15; por debajo, deficiente
+UMBRALES = (('excelente', 13.5), ('buena', 10.5), ('regular', 7.5))
+CATEGORIAS = tuple(nombre for nombre, _ in UMBRALES) + ('deficiente',)
+
+
+def nivel(promedio):
+    """CASE que clasifica la expresión `promedio` en una de CATEGORIAS (sin promedio: deficiente)"""
+    return case(*((promedio >= umbral, nombre) for nombre, umbral in UMBRALES), else_='deficiente')
+
+
+def histograma(promedio):
+    """Columnas SUM(CASE ...) con la cantidad de filas de cada categoría"""
+    categoria = nivel(promedio)
+    return [func.sum(case((categoria == nombre, 1), else_=0)).label(nombre) for nombre in CATEGORIAS]
+
+
+class EstadisticaAsistenciaService:
+    """
+    Estadísticas de asistencia: totales, promedio por estudiante e histograma de categorías
+    (excelente, buena, regular, deficiente en la escala de 15) calculados con un solo agregado.
+
+    La consulta la usa AnaliticaService para llenar resumen_asistencia y resumen_materia; los
+    dashboards leen esos resúmenes por gestión, con una caché en memoria (por proceso) que
+    guarda la versión de resumen_version con que se leyó: cualquier worker que recalcule la
+    gestión cambia esa versión y las demás cachés la vuelven a leer.
+    """
+    _lock = threading.Lock()
+    _cache = {}
+
+    @staticmethod
+    def consulta(agrupar_por, *condiciones):
+        """
+        Select con, por cada grupo de `agrupar_por` (columnas de Evaluacion): cantidad, suma,
+        minimo, maximo, estudiantes y una columna por categoría según el promedio de cada
+        estudiante dentro del grupo.
+        """
+        por_estudiante = select(
+            *agrupar_por,
+            func.count(Evaluacion.id).label('cantidad'),
+            func.sum(Evaluacion.nota).label('suma'),
+            func.min(Evaluacion.nota).label('minimo'),
+            func.max(Evaluacion.nota).label('maximo'),
+            func.avg(Evaluacion.nota).label('promedio')
+        ).where(*condiciones).group_by(*agrupar_por, Evaluacion.estudiante_ci).subquery()
+
+        grupo = [por_estudiante.c[columna.key] for columna in agrupar_por]
+        return select(
+            *grupo,
+            func.sum(por_estudiante.c.cantidad).label('cantidad'),
+            func.coalesce(func.sum(por_estudiante.c.suma), 0.0).label('suma'),
+            func.min(por_estudiante.c.minimo).label('minimo'),
+            func.max(por_estudiante.c.maximo).label('maximo'),
+            func.count().label('estudiantes'),
+            *histograma(por_estudiante.c.promedio)
+        ).group_by(*grupo)
+
+    @staticmethod
+    def consulta_asistencia_final(agrupar_por, *condiciones):
+        """`consulta` restringida a las evaluaciones de asistencia final"""
+        return EstadisticaAsistenciaService.consulta(
+            agrupar_por,
+            Evaluacion.tipo_evaluacion_id == CatalogoEvaluacionService.asistencia_final_id(),
+            *condiciones
+        )
+
+    @classmethod
+    def de_gestion(cls, gestion_id, usar_cache=True):
+        """
+        Returns:
+            Dict {'global': estadisticas o None, 'materias': {materia_id: estadisticas}} de la
+            asistencia final de la gestión (ver `_estadisticas`)
+        """
+        # Import local: AnaliticaService usa las consultas de este servicio
+        from .AnaliticaService import AnaliticaService
+        AnaliticaService.sincronizar([gestion_id])
+
+        version = AnaliticaService.version(gestion_id)
+        entrada = cls._cache.get(gestion_id)
+        if usar_cache and entrada and entrada[0] == version:
+            return entrada[1]
+
+        resumen_global = ResumenAsistencia.query.filter_by(gestion_id=gestion_id).first()
+        resumenes_materia = ResumenMateria.query.filter_by(
+            gestion_id=gestion_id,
+            tipo_evaluacion_id=CatalogoEvaluacionService.asistencia_final_id()
+        ).all()
+        resultado = {
+            'global': cls._estadisticas(resumen_global),
+            'materias': {
+                resumen.materia_id: cls._estadisticas(resumen)
+                for resumen in resumenes_materia if resumen.cantidad
+            }
+        }
+
+        with cls._lock:
+            cls._cache[gestion_id] = (version, resultado)
+        return resultado
+
+    @classmethod
+    def global_gestion(cls, gestion_id, usar_cache=True):
+        """Estadísticas de asistencia final de toda la gestión, o None si no hay registros"""
+        return cls.de_gestion(gestion_id, usar_cache)['global']
+
+    @classmethod
+    def por_materia(cls, gestion_id, materia_ids, usar_cache=True):
+        """Dict {materia_id: estadisticas} de las materias con asistencia final en la gestión"""
+        materias = cls.de_gestion(gestion_id, usar_cache)['materias']
+        return {materia_id: materias[materia_id] for materia_id in materia_ids if materia_id in materias}
+
+    @classmethod
+    def invalidar(cls, gestion_ids=None):
+        """Descarta de la caché las gestiones indicadas (o todas)"""
+        with cls._lock:
+            if gestion_ids is None:
+                cls._cache = {}
+            else:
+                for gestion_id in gestion_ids:
+                    cls._cache.pop(gestion_id, None)
+
+    @staticmethod
+    def _estadisticas(resumen):
+        if not resumen or not resumen.cantidad:
+            return None
+        return {
+            'total_evaluaciones': resumen.cantidad,
+            'suma': resumen.suma,
+            'promedio': resumen.suma / resumen.cantidad,
+            'total_estudiantes': resumen.estudiantes,
+            'distribucion': {categoria: getattr(resumen, categoria) for categoria in CATEGORIAS}
+        }
@@ -0,0 +1,244 @@
+# services/evaluacion_masiva_service.py
+from marshmallow import ValidationError
+from sqlalchemy import tuple_
+from app import db
+from ..models.Evaluacion_Model import Evaluacion
+from ..models.Estudiante_Model import Estudiante
+from ..models.Materia_Model import Materia
+from ..models.Gestion_Model import Gestion
+from ..models.Inscripcion_Model import Inscripcion
+from ..models.TipoEvaluacion_Model import TipoEvaluacion
+from ..schemas.Evaluacion_schema import EvaluacionSchema
+from .AcumuladoEvaluacionService import AcumuladoEvaluacionService
+from .CatalogoEvaluacionService import CatalogoEvaluacionService
+
+evaluacion_schema = EvaluacionSchema()
+
+PRESENTE = 'Presente'
+FALTA = 'Falta'
+
+# Sistema de 15 puntos para la asistencia diaria (el mismo que usan los seeders)
+PUNTOS_ASISTENCIA = {
+    PRESENTE: 15,
+    'Licencia': 10,
+    'Tarde': 5,
+    FALTA: 0,
+}
+
+
+class EvaluacionMasivaService:
+    """
+    Registro de muchas evaluaciones en una sola transacción: un INSERT por lotes y
+    un recálculo de NotaFinal por cada (estudiante, materia, gestión) distinto.
+    """
+    MAX_EVALUACIONES = 1000
+
+    @staticmethod
+    def registrar(filas):
+        """
+        Valida y guarda una lista de evaluaciones (dicts con el formato de POST /Evaluacion/).
+
+        Las filas inválidas no se guardan y se reportan con su índice; las válidas se
+        confirman juntas. Si hay asistencias diarias, se actualiza la Asistencia-Final de su clave.
+
+        Returns:
+            (evaluaciones creadas, lista de errores {'indice': i, 'errores': ...},
+             dict {clave: NotaFinal} de las claves recalculadas)
+        """
+        errores = []
+        validas = []
+        for indice, datos in enumerate(filas):
+            if not isinstance(datos, dict):
+                errores.append({'indice': indice, 'errores': 'Se esperaba un objeto de evaluación'})
+                continue
+            try:
+                validas.append((indice, evaluacion_schema.load(datos)))
+            except ValidationError as e:
+                errores.append({'indice': indice, 'errores': e.messages})
+
+        validas = EvaluacionMasivaService._filtrar_referencias(validas, errores)
+        errores.sort(key=lambda error: error['indice'])
+
+        evaluaciones = [evaluacion for _, evaluacion in validas]
+        return evaluaciones, errores, EvaluacionMasivaService.guardar(evaluaciones)
+
+    @staticmethod
+    def guardar(evaluaciones):
+        """
+        Inserta evaluaciones ya validadas, actualiza acumulados, Asistencia-Final y NotaFinal
+        de sus claves (sin commit). Retorna dict {clave: NotaFinal}.
+        """
+        if not evaluaciones:
+            return {}
+
+        # Un solo flush: SQLAlchemy agrupa los INSERT en lotes
+        db.session.add_all(evaluaciones)
+        db.session.flush()
+
+        acumulados_por_clave = AcumuladoEvaluacionService.registrar_altas(evaluaciones)
+
+        asistencia_diaria_id = CatalogoEvaluacionService.asistencia_diaria_id()
+        claves_asistencia = {
+            (e.estudiante_ci, e.materia_id, e.gestion_id)
+            for e in evaluaciones if e.tipo_evaluacion_id == asistencia_diaria_id
+        }
+        EvaluacionMasivaService.sincronizar_asistencia_final(
+            {clave: acumulados_por_clave[clave] for clave in claves_asistencia}
+        )
+
+        return AcumuladoEvaluacionService.actualizar_notas_finales(acumulados_por_clave)
+
+    @staticmethod
+    def registrar_asistencia_curso(curso_id, materia_id, gestion_id, fecha, asistencias):
+        """
+        Registra la asistencia de un día para todo un curso en una materia y gestión.
+
+        Args:
+            asistencias: lista de {'estudiante_ci', 'estado'} (Presente, Tarde, Licencia, Falta),
+                         {'estudiante_ci', 'presente': bool} o {'estudiante_ci', 'nota'}
+
+        Returns:
+            (evaluaciones creadas, lista de errores por índice, dict {clave: NotaFinal})
+        """
+        asistencia_diaria_id = CatalogoEvaluacionService.asistencia_diaria_id()
+        inscritos = {
+            fila[0] for fila in db.session.query(Inscripcion.estudiante_ci).filter(
+                Inscripcion.curso_id == curso_id
+            ).all()
+        }
+
+        errores = []
+        evaluaciones = []
+        registrados = set()
+        for indice, item in enumerate(asistencias):
+            if not isinstance(item, dict):
+                errores.append({'indice': indice, 'errores': 'Se esperaba un objeto de asistencia'})
+                continue
+
+            estudiante_ci = item.get('estudiante_ci')
+            if estudiante_ci not in inscritos:
+                errores.append({'indice': indice, 'errores': f"El estudiante {estudiante_ci} no está inscrito en el curso"})
+                continue
+            if estudiante_ci in registrados:
+                errores.append({'indice': indice, 'errores': f"Asistencia repetida para el estudiante {estudiante_ci}"})
+                continue
+
+            nota, descripcion = EvaluacionMasivaService._puntaje_asistencia(item)
+            if nota is None:
+                errores.append({'indice': indice, 'errores': descripcion})
+                continue
+
+            registrados.add(estudiante_ci)
+            evaluaciones.append(Evaluacion(
+                descripcion=item.get('descripcion') or descripcion,
+                fecha=fecha,
+                nota=nota,
+                tipo_evaluacion_id=asistencia_diaria_id,
+                estudiante_ci=estudiante_ci,
+                materia_id=materia_id,
+                gestion_id=gestion_id
+            ))
+
+        return evaluaciones, errores, EvaluacionMasivaService.guardar(evaluaciones)
+
+    @staticmethod
+    def _puntaje_asistencia(item):
+        """Retorna (nota, descripción) de un registro de asistencia, o (None, mensaje de error)"""
+        if item.get('nota') is not None:
+            try:
+                nota = float(item['nota'])
+            except (TypeError, ValueError):
+                return None, "La nota debe ser numérica"
+            if not 0 <= nota <= PUNTOS_ASISTENCIA[PRESENTE]:
+                return None, f"La nota debe estar entre 0 y {PUNTOS_ASISTENCIA[PRESENTE]}"
+            return nota, item.get('estado') or 'Asistencia'
+
+        if 'presente' in item:
+            estado = PRESENTE if item['presente'] else FALTA
+        else:
+            estado = item.get('estado')
+
+        if estado not in PUNTOS_ASISTENCIA:
+            return None, f"Estado de asistencia inválido; valores permitidos: {', '.join(PUNTOS_ASISTENCIA)}"
+        return PUNTOS_ASISTENCIA[estado], estado
+
+    @staticmethod
+    def _filtrar_referencias(validas, errores):
+        """Descarta (y reporta) las filas cuyo estudiante, materia, gestión o tipo no existen"""
+        if not validas:
+            return validas
+
+        def existentes(columna, valores):
+            valores = {valor for valor in valores if valor is not None}
+            if not valores:
+                return set()
+            return {fila[0] for fila in db.session.query(columna).filter(columna.in_(valores)).all()}
+
+        evaluaciones = [evaluacion for _, evaluacion in validas]
+        referencias = {
+            'estudiante_ci': existentes(Estudiante.ci, (e.estudiante_ci for e in evaluaciones)),
+            'materia_id': existentes(Materia.id, (e.materia_id for e in evaluaciones)),
+            'gestion_id': existentes(Gestion.id, (e.gestion_id for e in evaluaciones)),
+            'tipo_evaluacion_id': existentes(TipoEvaluacion.id, (e.tipo_evaluacion_id for e in evaluaciones)),
+        }
+
+        resultado = []
+        for indice, evaluacion in validas:
+            faltantes = {
+                campo: [f"No existe {campo}={getattr(evaluacion, campo)}"]
+                for campo, ids in referencias.items()
+                if getattr(evaluacion, campo) not in ids
+            }
+            if faltantes:
+                errores.append({'indice': indice, 'errores': faltantes})
+            else:
+                resultado.append((indice, evaluacion))
+        return resultado
+
+    @staticmethod
+    def sincronizar_asistencia_final(acumulados_por_clave):
+        """
+        Deja la evaluación Asistencia-Final de cada clave igual al promedio de sus asistencias
+        diarias, creándola si no existe, y ajusta los acumulados en memoria (sin commit).
+        """
+        if not acumulados_por_clave:
+            return
+
+        asistencia_diaria_id = CatalogoEvaluacionService.asistencia_diaria_id()
+        asistencia_final_id = CatalogoEvaluacionService.asistencia_final_id()
+
+        existentes = {}
+        for evaluacion in Evaluacion.query.filter(
+            Evaluacion.tipo_evaluacion_id == asistencia_final_id,
+            tuple_(Evaluacion.estudiante_ci, Evaluacion.materia_id, Evaluacion.gestion_id).in_(
+                list(acumulados_por_clave)
+            )
+        ).order_by(Evaluacion.id).all():
+            # Igual que .first(): se actualiza la primera si hubiera varias
+            existentes.setdefault((evaluacion.estudiante_ci, evaluacion.materia_id, evaluacion.gestion_id), evaluacion)
+
+        cambios = []
+        for clave, acumulados in acumulados_por_clave.items():
+            nota = AcumuladoEvaluacionService.promedio_tipo(acumulados, asistencia_diaria_id) or 0
+            evaluacion = existentes.get(clave)
+            if not evaluacion:
+                estudiante_ci, materia_id, gestion_id = clave
+                db.session.add(Evaluacion(
+                    estudiante_ci=estudiante_ci,
+                    materia_id=materia_id,
+                    gestion_id=gestion_id,
+                    tipo_evaluacion_id=asistencia_final_id,
+                    nota=nota
+                ))
+                cambios.append((clave, None, nota))
+            elif evaluacion.nota != nota:
+                cambios.append((clave, evaluacion.nota, nota))
+                evaluacion.nota = nota
+
+        db.session.flush()
+
+        for clave, nota_anterior, nota in cambios:
+            acumulados = acumulados_por_clave[clave]
+            if nota_anterior is not None:
+                AcumuladoEvaluacionService.sumar(acumulados, clave, asistencia_final_id, nota_anterior, -1)
+            AcumuladoEvaluacionService.sumar(acumulados, clave, asistencia_final_id, nota, 1)
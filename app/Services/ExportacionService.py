@@ -0,0 +1,109 @@
+# services/exportacion_service.py
+import csv
+import io
+from flask import Response, stream_with_context
+from sqlalchemy import select
+from app import db
+from ..models.Inscripcion_Model import Inscripcion
+from ..models.MateriaCurso_Model import MateriaCurso
+from .SerializacionService import SerializacionService
+
+FORMATOS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+
+class ExportacionService:
+    """
+    Exportación por streaming de tablas grandes (evaluaciones, notas finales y estimadas).
+
+    Las filas se leen con un cursor del lado del servidor (stream_results + yield_per) y se
+    escriben a la respuesta a medida que llegan, en NDJSON (un objeto JSON por línea) o CSV,
+    así que la memoria usada no depende de la cantidad de filas.
+    """
+    TAMANO_BLOQUE = 2000
+
+    @staticmethod
+    def consulta(modelo, gestion_id=None, curso_id=None, materia_id=None, estudiante_ci=None):
+        """
+        Select de las columnas de `modelo` (con estudiante_ci, materia_id y gestion_id) filtrado.
+        El filtro por curso deja los estudiantes inscritos en el curso y las materias del curso.
+        """
+        tabla = modelo.__table__
+        consulta = select(*tabla.c)
+
+        if gestion_id is not None:
+            consulta = consulta.where(tabla.c.gestion_id == gestion_id)
+        if materia_id is not None:
+            consulta = consulta.where(tabla.c.materia_id == materia_id)
+        if estudiante_ci is not None:
+            consulta = consulta.where(tabla.c.estudiante_ci == estudiante_ci)
+        if curso_id is not None:
+            consulta = consulta.where(
+                select(Inscripcion.id).where(
+                    Inscripcion.curso_id == curso_id,
+                    Inscripcion.estudiante_ci == tabla.c.estudiante_ci
+                ).exists(),
+                select(MateriaCurso.id).where(
+                    MateriaCurso.curso_id == curso_id,
+                    MateriaCurso.materia_id == tabla.c.materia_id
+                ).exists()
+            )
+
+        return consulta.order_by(*tabla.primary_key.columns)
+
+    @staticmethod
+    def respuesta(consulta, formato, nombre):
+        """Response de Flask que envía las filas de `consulta` en `formato` a medida que se leen"""
+        if formato not in FORMATOS:
+            raise ValueError(f"Formato no soportado: {formato}. Use {', '.join(FORMATOS)}")
+
+        generador = ExportacionService.ndjson if formato == 'ndjson' else ExportacionService.csv
+        return Response(
+            stream_with_context(generador(consulta)),
+            mimetype=FORMATOS[formato],
+            headers={'Content-Disposition': f'attachment; filename="{nombre}.{formato}"'}
+        )
+
+    @staticmethod
+    def filas(consulta):
+        """Itera (columnas, bloque de filas) leyendo con cursor del lado del servidor"""
+        resultado = db.session.execute(
+            consulta.execution_options(stream_results=True, yield_per=ExportacionService.TAMANO_BLOQUE)
+        )
+        columnas = list(resultado.keys())
+        try:
+            for bloque in resultado.partitions():
+                yield columnas, bloque
+        finally:
+            resultado.close()
+
+    @staticmethod
+    def ndjson(consulta):
+        for columnas, bloque in ExportacionService.filas(consulta):
+            yield b''.join(
+                SerializacionService.dumps(dict(zip(columnas, fila))) + b'\n'
+                for fila in bloque
+            )
+
+    @staticmethod
+    def csv(consulta):
+        buffer = io.StringIO()
+        escritor = csv.writer(buffer)
+        encabezado_enviado = False
+
+        for columnas, bloque in ExportacionService.filas(consulta):
+            if not encabezado_enviado:
+                escritor.writerow(columnas)
+                encabezado_enviado = True
+            escritor.writerows(bloque)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+
+        if not encabezado_enviado:
+            # Sin filas: solo el encabezado
+            escritor.writerow(consulta.selected_columns.keys())
+            yield buffer.getvalue()
+
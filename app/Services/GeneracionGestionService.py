@@ -0,0 +1,201 @@
+# services/generacion_gestion_service.py
+import threading
+from datetime import date, datetime, timedelta
+from flask import current_app
+from sqlalchemy import func, insert, select, update
+from app import db
+from ..models.Curso_Model import Curso
+from ..models.Estudiante_Model import Estudiante
+from ..models.Evaluacion_Model import Evaluacion
+from ..models.Inscripcion_Model import Inscripcion
+from ..models.Materia_Model import Materia
+from ..models.MateriaCurso_Model import MateriaCurso
+from ..models.NotaEstimada_Model import NotaEstimada
+from ..models.NotaFinal_Model import NotaFinal
+from ..models.Trabajo_Model import Trabajo
+from .AcumuladoEvaluacionService import AcumuladoEvaluacionService
+from .AnaliticaService import AnaliticaService
+from .CatalogoEvaluacionService import CatalogoEvaluacionService
+
+TIPO_TRABAJO = 'gestion_con_notas'
+
+
+class GeneracionGestionService:
+    """
+    Genera la estructura de notas de una gestión nueva: para cada estudiante y cada materia
+    de su curso actual (el de su inscripción más reciente) crea NotaFinal = 0,
+    NotaEstimada = 0 y la evaluación de Asistencia-Final = 0.
+
+    Los pares (estudiante, materia) salen de una sola consulta y las filas se insertan por
+    lotes (executemany) en una sola transacción: nadie lee una gestión a medio generar y,
+    si algo falla, el rollback no deja filas del trabajo (ni toca las notas que otros hayan
+    guardado mientras tanto). En PostgreSQL el avance de cada lote se guarda en una conexión
+    aparte para que /trabajos/<id> lo vea antes del commit.
+
+    El hilo muere con el worker que lo lanzó (reinicio de gunicorn, despliegue): el avance de
+    cada lote actualiza `trabajo.actualizado`, y marcar_abandonados() pasa a 'error' los
+    trabajos sin avance en MINUTOS_SIN_AVANCE. Se llama al iniciar la app, antes de crear un
+    trabajo nuevo y desde `flask grades expire-jobs`; `flask grades run-job` lo vuelve a ejecutar.
+    """
+    TAMANO_LOTE = 1000
+    MINUTOS_SIN_AVANCE = 15
+
+    @staticmethod
+    def pares_estudiante_materia():
+        """Lista ordenada de (estudiante_ci, materia_id) según el curso actual de cada estudiante"""
+        # Inscripción más reciente de cada estudiante (como order_by(fecha desc).first())
+        orden = func.row_number().over(
+            partition_by=Inscripcion.estudiante_ci,
+            order_by=(Inscripcion.fecha.desc(), Inscripcion.id)
+        )
+        ultimas = select(
+            Inscripcion.estudiante_ci,
+            Inscripcion.curso_id,
+            orden.label('orden')
+        ).subquery()
+
+        consulta = select(
+            ultimas.c.estudiante_ci,
+            MateriaCurso.materia_id
+        ).join(
+            Estudiante, Estudiante.ci == ultimas.c.estudiante_ci
+        ).join(
+            Curso, Curso.id == ultimas.c.curso_id
+        ).join(
+            MateriaCurso, MateriaCurso.curso_id == Curso.id
+        ).join(
+            Materia, Materia.id == MateriaCurso.materia_id
+        ).where(
+            ultimas.c.orden == 1
+        ).distinct().order_by(
+            ultimas.c.estudiante_ci,
+            MateriaCurso.materia_id
+        )
+
+        return [tuple(fila) for fila in db.session.execute(consulta)]
+
+    @staticmethod
+    def crear_trabajo(gestion_id):
+        """Registra el trabajo de generación (sin commit)"""
+        trabajo = Trabajo(tipo=TIPO_TRABAJO, estado='pendiente', gestion_id=gestion_id)
+        db.session.add(trabajo)
+        return trabajo
+
+    @staticmethod
+    def marcar_abandonados(minutos=None):
+        """Marca con error (sin commit) los trabajos pendientes o en proceso sin avance reciente; retorna cuántos"""
+        minutos = GeneracionGestionService.MINUTOS_SIN_AVANCE if minutos is None else minutos
+        limite = datetime.utcnow() - timedelta(minutes=minutos)
+        resultado = db.session.execute(update(Trabajo).where(
+            Trabajo.tipo == TIPO_TRABAJO,
+            Trabajo.estado.in_(('pendiente', 'en_proceso')),
+            func.coalesce(Trabajo.actualizado, Trabajo.creado) < limite
+        ).values(
+            estado='error',
+            mensaje=f'Trabajo interrumpido: sin avance en {minutos} minutos (el proceso que lo ejecutaba terminó)',
+            actualizado=datetime.utcnow()
+        ).execution_options(synchronize_session=False))
+        return resultado.rowcount
+
+    @staticmethod
+    def iniciar_en_segundo_plano(trabajo_id):
+        """Ejecuta la generación en un hilo con su propio contexto de aplicación"""
+        app = current_app._get_current_object()
+
+        def ejecutar():
+            with app.app_context():
+                GeneracionGestionService.ejecutar(trabajo_id)
+
+        hilo = threading.Thread(target=ejecutar, name=f'trabajo-{trabajo_id}', daemon=True)
+        hilo.start()
+        return hilo
+
+    @staticmethod
+    def ejecutar(trabajo_id, tamano_lote=None):
+        """Genera las filas de la gestión del trabajo, actualizando su avance; retorna el Trabajo"""
+        tamano_lote = tamano_lote or GeneracionGestionService.TAMANO_LOTE
+        trabajo = db.session.get(Trabajo, trabajo_id)
+        gestion_id = trabajo.gestion_id
+
+        try:
+            pares = GeneracionGestionService.pares_estudiante_materia()
+            trabajo.estado = 'en_proceso'
+            trabajo.total = len(pares)
+            trabajo.procesados = 0
+            trabajo.mensaje = None
+            db.session.commit()
+
+            asistencia_final_id = CatalogoEvaluacionService.asistencia_final_id()
+            hoy = date.today()
+
+            for inicio in range(0, len(pares), tamano_lote):
+                lote = pares[inicio:inicio + tamano_lote]
+
+                db.session.execute(insert(NotaFinal), [
+                    {'valor': 0.0, 'estudiante_ci': ci, 'gestion_id': gestion_id, 'materia_id': materia_id}
+                    for ci, materia_id in lote
+                ])
+                db.session.execute(insert(NotaEstimada), [
+                    {
+                        'valor_estimado': 0.0,
+                        'razon_estimacion': "Generada automáticamente con la gestión",
+                        'estudiante_ci': ci,
+                        'gestion_id': gestion_id,
+                        'materia_id': materia_id
+                    }
+                    for ci, materia_id in lote
+                ])
+                db.session.execute(insert(Evaluacion), [
+                    {
+                        'descripcion': "nota de asistencia final",
+                        'fecha': hoy,
+                        'nota': 0.0,
+                        'tipo_evaluacion_id': asistencia_final_id,
+                        'estudiante_ci': ci,
+                        'materia_id': materia_id,
+                        'gestion_id': gestion_id
+                    }
+                    for ci, materia_id in lote
+                ])
+
+                GeneracionGestionService._guardar_avance(trabajo_id, inicio + len(lote))
+
+            # Las asistencias finales se insertaron sin AcumuladoEvaluacionService
+            AcumuladoEvaluacionService.invalidar(gestion_ids=[gestion_id])
+            trabajo.estado = 'completado'
+            trabajo.procesados = len(pares)
+            trabajo.mensaje = f'Notas generadas para {trabajo.procesados} materias de estudiantes'
+            AnaliticaService.marcar_gestion(gestion_id)
+            db.session.commit()
+
+        except Exception as e:
+            db.session.rollback()
+            GeneracionGestionService._registrar_error(trabajo_id, e)
+
+        return db.session.get(Trabajo, trabajo_id)
+
+    @staticmethod
+    def _guardar_avance(trabajo_id, procesados):
+        """
+        Confirma el avance en una conexión propia, fuera de la transacción de las filas.
+        En SQLite (un solo escritor) esa conexión esperaría al commit: el avance se ve al final.
+        """
+        if db.engine.dialect.name != 'postgresql':
+            return
+        with db.engine.begin() as conexion:
+            conexion.execute(update(Trabajo).where(Trabajo.id == trabajo_id).values(
+                procesados=procesados, actualizado=datetime.utcnow()
+            ))
+
+    @staticmethod
+    def _registrar_error(trabajo_id, error):
+        """Marca el trabajo con error; las filas generadas ya se descartaron con el rollback"""
+        try:
+            trabajo = db.session.get(Trabajo, trabajo_id)
+            trabajo.estado = 'error'
+            trabajo.procesados = 0
+            trabajo.mensaje = f"Error al generar las notas de la gestión: {str(error)}"
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            print(f"Error al registrar el fallo del trabajo {trabajo_id}: {str(e)}")
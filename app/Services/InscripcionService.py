@@ -0,0 +1,46 @@
+# services/inscripcion_service.py
+from sqlalchemy import func
+from sqlalchemy.orm import joinedload
+from ..models.Inscripcion_Model import Inscripcion
+
+
+class InscripcionService:
+    """
+    Consultas de inscripciones con carga explícita de Inscripcion.estudiante e Inscripcion.curso,
+    para no hacer un SELECT por cada acceso a la relación (N+1).
+    """
+
+    @staticmethod
+    def inscripciones_de_curso(curso_id, year=None):
+        """Inscripciones de un curso (opcionalmente de un año) con su estudiante cargado en la misma consulta"""
+        consulta = Inscripcion.query.options(
+            joinedload(Inscripcion.estudiante)
+        ).filter(Inscripcion.curso_id == curso_id)
+
+        if year is not None:
+            consulta = consulta.filter(func.extract('year', Inscripcion.fecha) == year)
+
+        return consulta.all()
+
+    @staticmethod
+    def estudiantes_de_curso(curso_id, year=None):
+        """Estudiantes únicos inscritos en un curso, en el orden de sus inscripciones (una consulta)"""
+        inscripciones = InscripcionService.inscripciones_de_curso(curso_id, year)
+        return list({ins.estudiante.ci: ins.estudiante for ins in inscripciones if ins.estudiante}.values())
+
+    @staticmethod
+    def ultima_inscripcion_por_estudiante():
+        """
+        Dict {estudiante_ci: inscripción más reciente} con el curso ya cargado, en una sola consulta.
+        Reemplaza el Inscripcion.query.filter_by(estudiante_ci=...).order_by(fecha desc).first() por estudiante.
+        """
+        inscripciones = Inscripcion.query.options(
+            joinedload(Inscripcion.curso)
+        ).order_by(
+            Inscripcion.estudiante_ci, Inscripcion.fecha.desc(), Inscripcion.id
+        ).all()
+
+        ultimas = {}
+        for inscripcion in inscripciones:
+            ultimas.setdefault(inscripcion.estudiante_ci, inscripcion)
+        return ultimas
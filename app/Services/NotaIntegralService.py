@@ -0,0 +1,124 @@
+# services/nota_integral_service.py
+from sqlalchemy import case, false, func, literal, tuple_
+from app import db
+from ..models.Evaluacion_Model import Evaluacion
+from ..models.Inscripcion_Model import Inscripcion
+from .CatalogoEvaluacionService import CatalogoEvaluacionService
+
+# Dimensiones de la evaluación integral, en el orden en que se suman para la nota final
+DIMENSIONES = ('ser', 'hacer', 'saber', 'decidir')
+
+
+class NotaIntegralService:
+    @staticmethod
+    def promedios_por_dimension(claves):
+        """
+        Calcula el promedio de cada dimensión (ser, hacer, saber, decidir) para
+        una o varias claves (estudiante_ci, materia_id, gestion_id) con un solo GROUP BY.
+
+        Args:
+            claves: iterable de tuplas (estudiante_ci, materia_id, gestion_id)
+
+        Returns:
+            Dict {clave: {'ser': x, 'hacer': y, 'saber': z, 'decidir': w}}.
+            Las dimensiones sin evaluaciones valen 0.
+        """
+        claves = list(dict.fromkeys(claves))
+        resultado = {clave: dict.fromkeys(DIMENSIONES, 0) for clave in claves}
+        if not claves:
+            return resultado
+
+        filas = NotaIntegralService._consulta_promedios().filter(
+            tuple_(Evaluacion.estudiante_ci, Evaluacion.materia_id, Evaluacion.gestion_id).in_(claves)
+        ).all()
+
+        for estudiante_ci, materia_id, gestion_id, nombre, promedio in filas:
+            resultado[(estudiante_ci, materia_id, gestion_id)][nombre] = promedio or 0
+
+        return resultado
+
+    @staticmethod
+    def promedios_por_curso(curso_id, materia_id, gestion_id):
+        """
+        Calcula los promedios por dimensión de todos los estudiantes inscritos en un curso
+        para una materia y gestión, con una sola consulta para todo el curso.
+
+        Returns:
+            Dict {estudiante_ci: {'ser': x, 'hacer': y, 'saber': z, 'decidir': w}}.
+            Solo incluye estudiantes con evaluaciones; el resto vale 0 en todas las dimensiones.
+        """
+        inscritos = db.session.query(Inscripcion.estudiante_ci).filter(
+            Inscripcion.curso_id == curso_id
+        )
+
+        filas = NotaIntegralService._consulta_promedios().filter(
+            Evaluacion.materia_id == materia_id,
+            Evaluacion.gestion_id == gestion_id,
+            Evaluacion.estudiante_ci.in_(inscritos)
+        ).all()
+
+        # Pivotear las filas (estudiante, dimensión) a un dict por estudiante
+        resultado = {}
+        for estudiante_ci, _, _, nombre, promedio in filas:
+            notas = resultado.setdefault(estudiante_ci, dict.fromkeys(DIMENSIONES, 0))
+            notas[nombre] = promedio or 0
+
+        return resultado
+
+    @staticmethod
+    def expresion_dimension():
+        """
+        Retorna (dimensión, filtro): CASE que traduce tipo_evaluacion_id a su dimensión según el
+        catálogo en memoria (NULL para tipos sin dimensión) y el filtro de los tipos con dimensión.
+        """
+        dimension_por_tipo = {
+            tipo_id: dimension
+            for tipo_id, dimension in CatalogoEvaluacionService.dimension_por_tipo().items()
+            if dimension in DIMENSIONES
+        }
+        if not dimension_por_tipo:
+            # Sin tipos asociados a las dimensiones: ninguna evaluación cuenta
+            return literal(None), false()
+
+        return (
+            case(dimension_por_tipo, value=Evaluacion.tipo_evaluacion_id),
+            Evaluacion.tipo_evaluacion_id.in_(list(dimension_por_tipo))
+        )
+
+    @staticmethod
+    def _consulta_promedios():
+        """
+        Consulta base: promedio de notas agrupado por (estudiante, materia, gestión, dimensión).
+        La dimensión de cada tipo sale del catálogo en memoria, sin tocar tipo_evaluacion.
+        """
+        dimension, filtro = NotaIntegralService.expresion_dimension()
+
+        return db.session.query(
+            Evaluacion.estudiante_ci,
+            Evaluacion.materia_id,
+            Evaluacion.gestion_id,
+            dimension,
+            func.avg(Evaluacion.nota)
+        ).filter(
+            filtro
+        ).group_by(
+            Evaluacion.estudiante_ci,
+            Evaluacion.materia_id,
+            Evaluacion.gestion_id,
+            dimension
+        )
+
+    @staticmethod
+    def nota_integral(promedios):
+        """
+        Suma directa de las dimensiones (sin dividir).
+        Cada dimensión ya tiene su peso correcto: ser=15, decidir=15, hacer=35, saber=35 = 100 total
+        """
+        return round(sum(promedios[dimension] for dimension in DIMENSIONES), 2)
+
+    @staticmethod
+    def nota_final_de(estudiante_ci, materia_id, gestion_id):
+        """Retorna (promedios por dimensión, nota final integral) de un estudiante en una materia y gestión"""
+        clave = (estudiante_ci, materia_id, gestion_id)
+        promedios = NotaIntegralService.promedios_por_dimension([clave])[clave]
+        return promedios, NotaIntegralService.nota_integral(promedios)
@@ -0,0 +1,79 @@
+# services/paso_notas_service.py
+import time
+from sqlalchemy import func, select
+from app import db
+from ..models.Evaluacion_Model import Evaluacion
+from ..models.Inscripcion_Model import Inscripcion
+from ..models.MateriaCurso_Model import MateriaCurso
+from .UpsertNotasService import UpsertNotasService
+
+
+class PasoNotasService:
+    """
+    Paso de notas: la NotaFinal de cada (estudiante, materia) de una gestión es el promedio
+    simple de todas sus evaluaciones. Solo se consideran estudiantes inscritos en un curso
+    que tiene asignada la materia.
+    """
+
+    @staticmethod
+    def pasar_notas(gestion_id, curso_ids=None):
+        """
+        Calcula los promedios con un solo GROUP BY y los guarda con un upsert por lotes (sin commit).
+
+        Args:
+            gestion_id: gestión a procesar
+            curso_ids: cursos a procesar; None procesa todos los cursos
+
+        Returns:
+            Dict con la cantidad de notas guardadas y los tiempos de cálculo y escritura en ms
+        """
+        inicio = time.perf_counter()
+
+        # El estudiante está inscrito en un curso (de los pedidos) que tiene la materia
+        condiciones = [
+            Inscripcion.estudiante_ci == Evaluacion.estudiante_ci,
+            MateriaCurso.materia_id == Evaluacion.materia_id,
+        ]
+        if curso_ids is not None:
+            condiciones.append(Inscripcion.curso_id.in_(curso_ids))
+
+        inscrito_con_materia = select(Inscripcion.id).join(
+            MateriaCurso, MateriaCurso.curso_id == Inscripcion.curso_id
+        ).where(*condiciones).exists()
+
+        promedios = db.session.query(
+            Evaluacion.estudiante_ci,
+            Evaluacion.materia_id,
+            func.sum(Evaluacion.nota),
+            func.count(Evaluacion.nota)
+        ).filter(
+            Evaluacion.gestion_id == gestion_id,
+            inscrito_con_materia
+        ).group_by(
+            Evaluacion.estudiante_ci,
+            Evaluacion.materia_id
+        ).all()
+
+        filas = [
+            {
+                'estudiante_ci': estudiante_ci,
+                'materia_id': materia_id,
+                'gestion_id': gestion_id,
+                'valor': round(suma / cantidad, 2)
+            }
+            for estudiante_ci, materia_id, suma, cantidad in promedios
+            if cantidad
+        ]
+        calculado = time.perf_counter()
+
+        UpsertNotasService.upsert_notas_finales(filas)
+        escrito = time.perf_counter()
+
+        return {
+            'notas_procesadas': len(filas),
+            'tiempo_ms': {
+                'calculo': round((calculado - inicio) * 1000, 2),
+                'escritura': round((escrito - calculado) * 1000, 2),
+                'total': round((escrito - inicio) * 1000, 2)
+            }
+        }
@@ -0,0 +1,103 @@
+# services/ranking_estudiantes_service.py
+from sqlalchemy import case, func, or_, select
+from app import db
+from ..models.Estudiante_Model import Estudiante
+from ..models.NotaFinal_Model import NotaFinal
+from .AnaliticaService import NOTA_APROBACION
+
+
+class RankingEstudiantesService:
+    """
+    Mejores y peores K estudiantes por materia según su nota final, con las estadísticas de
+    cada materia, en una sola consulta con funciones de ventana:
+    ROW_NUMBER() OVER (PARTITION BY materia_id ORDER BY valor) en ambos sentidos, y
+    COUNT/SUM/MIN/MAX OVER (PARTITION BY materia_id) para las estadísticas.
+
+    Sirve para las materias de un docente o, sin materia_ids, para toda la institución.
+    """
+    K_POR_DEFECTO = 3
+    K_MAXIMO = 50
+
+    @staticmethod
+    def por_materia(gestion_ids, materia_ids=None, k=None):
+        """
+        Args:
+            gestion_ids: gestiones cuyas notas finales se consideran (p. ej. las de un año)
+            materia_ids: materias a rankear (None: todas)
+            k: cantidad de mejores y de peores por materia
+
+        Returns:
+            Dict {materia_id: {'mejores': [...], 'peores': [...], 'estadisticas': {...}}}.
+            Empates: entre notas iguales, los mejores por orden de registro y los peores al revés.
+        """
+        k = min(k or RankingEstudiantesService.K_POR_DEFECTO, RankingEstudiantesService.K_MAXIMO)
+        if not gestion_ids or (materia_ids is not None and not materia_ids):
+            return {}
+
+        por_materia = {'partition_by': NotaFinal.materia_id}
+        aprobado = case((NotaFinal.valor >= NOTA_APROBACION, 1), else_=0)
+        notas = select(
+            NotaFinal.materia_id,
+            NotaFinal.estudiante_ci,
+            Estudiante.nombreCompleto.label('nombre_completo'),
+            NotaFinal.valor,
+            func.row_number().over(order_by=(NotaFinal.valor.desc(), NotaFinal.id), **por_materia).label('mejor'),
+            func.row_number().over(order_by=(NotaFinal.valor, NotaFinal.id.desc()), **por_materia).label('peor'),
+            func.count().over(**por_materia).label('total'),
+            func.sum(NotaFinal.valor).over(**por_materia).label('suma'),
+            func.max(NotaFinal.valor).over(**por_materia).label('maximo'),
+            func.min(NotaFinal.valor).over(**por_materia).label('minimo'),
+            func.sum(aprobado).over(**por_materia).label('aprobados')
+        ).join(
+            Estudiante, Estudiante.ci == NotaFinal.estudiante_ci
+        ).where(
+            NotaFinal.gestion_id.in_(list(gestion_ids)),
+            NotaFinal.valor.isnot(None)
+        )
+        if materia_ids is not None:
+            notas = notas.where(NotaFinal.materia_id.in_(list(materia_ids)))
+        notas = notas.subquery()
+
+        filas = db.session.execute(
+            select(notas).where(or_(notas.c.mejor <= k, notas.c.peor <= k)).order_by(notas.c.materia_id, notas.c.mejor)
+        ).all()
+
+        resultado = {}
+        for fila in filas:
+            materia = resultado.get(fila.materia_id)
+            if materia is None:
+                materia = resultado[fila.materia_id] = {
+                    'mejores': [],
+                    'peores': [],
+                    'estadisticas': RankingEstudiantesService._estadisticas(fila)
+                }
+            if fila.mejor <= k:
+                materia['mejores'].append(RankingEstudiantesService._estudiante(fila))
+            if fila.peor <= k:
+                materia['peores'].append((fila.peor, RankingEstudiantesService._estudiante(fila)))
+
+        for materia in resultado.values():
+            materia['peores'] = [estudiante for _, estudiante in sorted(materia['peores'], key=lambda par: par[0])]
+        return resultado
+
+    @staticmethod
+    def _estudiante(fila):
+        return {
+            'estudiante_id': fila.estudiante_ci,
+            'ci': fila.estudiante_ci,
+            'nombre_completo': fila.nombre_completo,
+            'nota_final': fila.valor,
+            'estado': 'Aprobado' if fila.valor >= NOTA_APROBACION else 'Reprobado'
+        }
+
+    @staticmethod
+    def _estadisticas(fila):
+        return {
+            'total_estudiantes': fila.total,
+            'promedio_materia': round(fila.suma / fila.total, 2),
+            'nota_maxima': fila.maximo,
+            'nota_minima': fila.minimo,
+            'aprobados': fila.aprobados,
+            'reprobados': fila.total - fila.aprobados,
+            'porcentaje_aprobacion': round((fila.aprobados / fila.total) * 100, 2)
+        }
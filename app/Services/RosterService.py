@@ -0,0 +1,103 @@
+# services/roster_service.py
+from sqlalchemy import Integer, cast, delete, func, insert, or_, select
+from app import db
+from ..models.DocenteMateria_Model import DocenteMateria
+from ..models.Estudiante_Model import Estudiante
+from ..models.Inscripcion_Model import Inscripcion
+from ..models.MateriaCurso_Model import MateriaCurso
+from ..models.Roster_Model import Roster
+
+COLUMNAS = ('docente_ci', 'materia_id', 'curso_id', 'estudiante_ci', 'nombre', 'anio', 'orden')
+
+
+class RosterService:
+    """
+    Tabla roster: (docente, materia, curso, año) -> estudiantes inscritos, con su nombre.
+
+    Es la lista que abren los docentes en filtrar-estudiantes y en los boletines filtrados;
+    leerla es un solo recorrido del índice ix_roster_lista en vez de armarla desde las
+    inscripciones. Se recalcula en la base (INSERT ... SELECT) solo para las filas afectadas,
+    en la misma transacción que el cambio de Inscripcion, DocenteMateria, MateriaCurso o
+    Estudiante que la origina.
+    """
+
+    @staticmethod
+    def estudiantes(docente_ci, materia_id, curso_id, year=None):
+        """Estudiantes de la lista, en el orden de sus inscripciones (una consulta indexada)"""
+        consulta = Estudiante.query.join(
+            Roster, Roster.estudiante_ci == Estudiante.ci
+        ).filter(
+            Roster.docente_ci == docente_ci,
+            Roster.materia_id == materia_id,
+            Roster.curso_id == curso_id
+        )
+        if year is not None:
+            consulta = consulta.filter(Roster.anio == year)
+        else:
+            # Sin año: una fila por estudiante aunque tenga inscripciones en varios años
+            consulta = consulta.group_by(Estudiante.ci)
+        return consulta.order_by(func.min(Roster.orden) if year is None else Roster.orden).all()
+
+    @staticmethod
+    def refrescar(curso_ids=None, materia_ids=None, estudiante_cis=None):
+        """
+        Recalcula (sin commit) las filas de los cursos, materias o estudiantes indicados.
+        Llamar después de flush() para que la consulta vea el cambio.
+        """
+        condiciones_roster = []
+        condiciones_origen = []
+        if curso_ids:
+            condiciones_roster.append(Roster.curso_id.in_(curso_ids))
+            condiciones_origen.append(MateriaCurso.curso_id.in_(curso_ids))
+        if materia_ids:
+            condiciones_roster.append(Roster.materia_id.in_(materia_ids))
+            condiciones_origen.append(DocenteMateria.materia_id.in_(materia_ids))
+        if estudiante_cis:
+            condiciones_roster.append(Roster.estudiante_ci.in_(estudiante_cis))
+            condiciones_origen.append(Inscripcion.estudiante_ci.in_(estudiante_cis))
+        if not condiciones_roster:
+            return
+
+        db.session.execute(delete(Roster).where(or_(*condiciones_roster)))
+        db.session.execute(
+            insert(Roster).from_select(COLUMNAS, RosterService._consulta_origen(or_(*condiciones_origen)))
+        )
+
+    @staticmethod
+    def reconstruir():
+        """Recalcula toda la tabla (sin commit); retorna la cantidad de filas"""
+        db.session.execute(delete(Roster))
+        db.session.execute(insert(Roster).from_select(COLUMNAS, RosterService._consulta_origen()))
+        return db.session.query(func.count(Roster.id)).scalar()
+
+    @staticmethod
+    def _consulta_origen(condicion=None):
+        """Docente que enseña la materia -> curso que tiene la materia -> estudiantes inscritos al curso"""
+        anio = cast(func.extract('year', Inscripcion.fecha), Integer)
+        consulta = select(
+            DocenteMateria.docente_ci,
+            DocenteMateria.materia_id,
+            MateriaCurso.curso_id,
+            Inscripcion.estudiante_ci,
+            Estudiante.nombreCompleto,
+            anio,
+            func.min(Inscripcion.id)
+        ).join(
+            MateriaCurso, MateriaCurso.materia_id == DocenteMateria.materia_id
+        ).join(
+            Inscripcion, Inscripcion.curso_id == MateriaCurso.curso_id
+        ).join(
+            Estudiante, Estudiante.ci == Inscripcion.estudiante_ci
+        ).where(
+            DocenteMateria.docente_ci.isnot(None)
+        ).group_by(
+            DocenteMateria.docente_ci,
+            DocenteMateria.materia_id,
+            MateriaCurso.curso_id,
+            Inscripcion.estudiante_ci,
+            Estudiante.nombreCompleto,
+            anio
+        )
+        if condicion is not None:
+            consulta = consulta.where(condicion)
+        return consulta
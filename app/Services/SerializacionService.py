@@ -0,0 +1,102 @@
+# services/serializacion_service.py
+import json
+from datetime import date, datetime
+from flask import current_app
+from flask_restx import fields
+
+# Codificador JSON rápido opcional (pip install orjson); sin él se usa json de la biblioteca estándar
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class SerializacionService:
+    """
+    Serialización directa de filas (Row de un select de columnas) a dicts con el formato de un
+    modelo de respuesta de flask-restx, sin construir objetos del ORM ni pasar por
+    schema.dump + marshal_with. Los modelos de app/api_model siguen documentando la respuesta.
+    """
+    _convertidores = {}
+
+    @staticmethod
+    def convertidores(modelo_respuesta):
+        """Lista (campo, función de conversión) de `modelo_respuesta`, en su orden"""
+        convertidores = SerializacionService._convertidores.get(modelo_respuesta.name)
+        if convertidores is None:
+            convertidores = [
+                (nombre, _convertidor(campo))
+                for nombre, campo in SerializacionService.campos(modelo_respuesta).items()
+            ]
+            SerializacionService._convertidores[modelo_respuesta.name] = convertidores
+        return convertidores
+
+    @staticmethod
+    def campos(modelo_respuesta):
+        """Campos del modelo, incluidos los heredados con ns.inherit"""
+        return getattr(modelo_respuesta, 'resolved', modelo_respuesta)
+
+    @staticmethod
+    def a_dicts(filas, modelo_respuesta, campos=None):
+        """
+        Convierte filas con atributos por nombre de columna en dicts como los de marshal().
+        Los campos del modelo que no estén en la fila salen en None (igual que marshal).
+
+        Args:
+            campos: subconjunto opcional de campos a incluir (proyección)
+        """
+        convertidores = SerializacionService.convertidores(modelo_respuesta)
+        if campos is not None:
+            convertidores = [(nombre, f) for nombre, f in convertidores if nombre in campos]
+
+        datos = []
+        for fila in filas:
+            valores = fila._mapping
+            datos.append({
+                nombre: (None if (valor := valores.get(nombre)) is None else convertir(valor))
+                for nombre, convertir in convertidores
+            })
+        return datos
+
+    @staticmethod
+    def dumps(datos):
+        """JSON en bytes (UTF-8), con orjson si está instalado"""
+        if orjson is not None:
+            return orjson.dumps(datos)
+        return json.dumps(datos, ensure_ascii=False, default=_valor_json).encode('utf-8')
+
+    @staticmethod
+    def respuesta_json(datos, codigo=200, cabeceras=None):
+        """Response JSON ya codificada (un Resource la devuelve tal cual)"""
+        return current_app.response_class(
+            SerializacionService.dumps(datos),
+            status=codigo,
+            headers=cabeceras,
+            mimetype='application/json'
+        )
+
+
+def _convertidor(campo):
+    """Función equivalente al format() del campo de flask-restx para valores no nulos"""
+    if isinstance(campo, fields.Boolean):
+        return bool
+    if isinstance(campo, fields.Integer):
+        return int
+    if isinstance(campo, fields.Float):
+        return float
+    if isinstance(campo, (fields.Date, fields.DateTime)):
+        return _iso
+    if isinstance(campo, fields.String):
+        # Las fechas en campos String salían con el formato ISO de marshmallow
+        return lambda valor: valor.isoformat() if isinstance(valor, (date, datetime)) else str(valor)
+    return lambda valor: valor
+
+
+def _iso(valor):
+    return valor.isoformat() if isinstance(valor, (date, datetime)) else valor
+
+
+def _valor_json(valor):
+    if isinstance(valor, (date, datetime)):
+        return valor.isoformat()
+    raise TypeError(f"Tipo no serializable: {type(valor).__name__}")
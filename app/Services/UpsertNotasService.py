@@ -0,0 +1,128 @@
+# services/upsert_notas_service.py
+from sqlalchemy import inspect
+from sqlalchemy.dialects import postgresql, sqlite
+from app import db
+from ..models.NotaFinal_Model import NotaFinal
+from ..models.NotaEstimada_Model import NotaEstimada
+from .AnaliticaService import AnaliticaService
+
+# Clave única de nota_final y nota_estimada (uq_nota_final_clave / uq_nota_estimada_clave)
+CLAVE = ('estudiante_ci', 'materia_id', 'gestion_id')
+
+# Dialectos con INSERT ... ON CONFLICT DO UPDATE
+INSERTS_CON_CONFLICTO = {
+    'postgresql': postgresql.insert,
+    'sqlite': sqlite.insert,
+}
+
+
+class UpsertNotasService:
+    """
+    Inserta o actualiza NotaFinal / NotaEstimada por (estudiante_ci, materia_id, gestion_id)
+    con una sentencia INSERT ... ON CONFLICT DO UPDATE por lote, sin consultar antes.
+    En otros motores, o si la tabla no tiene la restricción única de CLAVE (bases creadas con
+    create_all antes de la migración 3f2a9c4d1b7e: falta `flask db upgrade`), recurre a buscar
+    y luego crear o actualizar.
+
+    No hace commit. Las filas devueltas (RETURNING) tienen los atributos de la tabla
+    (id, estudiante_ci, materia_id, gestion_id, valor...), como las instancias del modelo.
+    """
+    TAMANO_LOTE = 1000
+
+    # {(url de la base, tabla, clave): tiene UNIQUE sobre la clave}, consultado una vez por proceso
+    _claves_unicas = {}
+
+    @staticmethod
+    def upsert_notas_finales(filas):
+        """
+        Args:
+            filas: iterable de dicts con estudiante_ci, materia_id, gestion_id y valor
+        Returns:
+            Dict {(estudiante_ci, materia_id, gestion_id): fila guardada}
+        """
+        guardadas = UpsertNotasService.upsert(NotaFinal, filas, ('valor',))
+        # Los resúmenes de los dashboards de esas (gestión, materia) quedan por recalcular
+        AnaliticaService.marcar((gestion_id, materia_id) for _, materia_id, gestion_id in guardadas)
+        return guardadas
+
+    @staticmethod
+    def upsert_notas_estimadas(filas):
+        """
+        Args:
+            filas: iterable de dicts con estudiante_ci, materia_id, gestion_id,
+                   valor_estimado y razon_estimacion
+        """
+        return UpsertNotasService.upsert(NotaEstimada, filas, ('valor_estimado', 'razon_estimacion'))
+
+    @staticmethod
+    def upsert(modelo, filas, columnas):
+        """Upsert por lotes de `filas` en la tabla de `modelo`, actualizando `columnas` si la clave existe"""
+        # Si una clave se repite en el lote gana la última fila (ON CONFLICT no admite repetidas)
+        por_clave = {}
+        for fila in filas:
+            por_clave[tuple(fila[c] for c in CLAVE)] = {c: fila[c] for c in CLAVE + tuple(columnas)}
+        if not por_clave:
+            return {}
+
+        insert = INSERTS_CON_CONFLICTO.get(db.session.get_bind().dialect.name)
+        if insert is None or not UpsertNotasService.tiene_clave_unica(modelo):
+            return UpsertNotasService._upsert_orm(modelo, por_clave, columnas)
+
+        # Que el ORM no sobrescriba después lo que escribe la sentencia
+        db.session.flush()
+
+        tabla = modelo.__table__
+        guardadas = {}
+        valores = list(por_clave.values())
+        for inicio in range(0, len(valores), UpsertNotasService.TAMANO_LOTE):
+            sentencia = insert(tabla).values(valores[inicio:inicio + UpsertNotasService.TAMANO_LOTE])
+            sentencia = sentencia.on_conflict_do_update(
+                index_elements=list(CLAVE),
+                set_={columna: sentencia.excluded[columna] for columna in columnas}
+            ).returning(*tabla.c)
+
+            for fila in db.session.execute(sentencia):
+                guardadas[(fila.estudiante_ci, fila.materia_id, fila.gestion_id)] = fila
+
+        # Las instancias ya cargadas en la sesión quedan desactualizadas
+        for objeto in list(db.session.identity_map.values()):
+            if isinstance(objeto, modelo):
+                db.session.expire(objeto)
+
+        return guardadas
+
+    @classmethod
+    def tiene_clave_unica(cls, modelo, clave=CLAVE):
+        """True si la tabla de `modelo` tiene en la base una restricción o índice UNIQUE sobre `clave`"""
+        conexion = db.session.connection()
+        llave = (str(conexion.engine.url), modelo.__tablename__, tuple(clave))
+        if llave not in cls._claves_unicas:
+            inspector = inspect(conexion)
+            unicas = [uq['column_names'] for uq in inspector.get_unique_constraints(modelo.__tablename__)]
+            unicas += [ix['column_names'] for ix in inspector.get_indexes(modelo.__tablename__) if ix['unique']]
+            cls._claves_unicas[llave] = any(set(columnas) == set(clave) for columnas in unicas)
+        return cls._claves_unicas[llave]
+
+    @staticmethod
+    def verificar_claves_unicas():
+        """Nombres de las tablas de notas sin la restricción única (vacía si la base está al día)"""
+        return [
+            modelo.__tablename__ for modelo in (NotaFinal, NotaEstimada)
+            if not UpsertNotasService.tiene_clave_unica(modelo)
+        ]
+
+    @staticmethod
+    def _upsert_orm(modelo, por_clave, columnas):
+        """Alternativa para motores sin ON CONFLICT: buscar y luego crear o actualizar"""
+        guardadas = {}
+        for clave, valores in por_clave.items():
+            objeto = modelo.query.filter_by(**dict(zip(CLAVE, clave))).first()
+            if objeto is None:
+                objeto = modelo(**valores)
+                db.session.add(objeto)
+            else:
+                for columna in columnas:
+                    setattr(objeto, columna, valores[columna])
+            guardadas[clave] = objeto
+        db.session.flush()
+        return guardadas
@@ -15,7 +15,12 @@ def create_app():
     ma.init_app(app)
     mi.init_app(app, db)
     api.init_app(app)
-    cors.init_app(app)
+    cors.init_app(app, expose_headers=['X-Next-Cursor', 'Link'])  # Paginación de listados
+    
+    # Comandos de línea (flask grades ...)
+    from .commands import grades_cli, api_cli
+    app.cli.add_command(grades_cli)
+    app.cli.add_command(api_cli)
     
     # Register ML Blueprint
     from app.ml import ml_bp
@@ -44,6 +49,63 @@ def create_app():
                 run_seeders()
             except Exception as seeder_error:
                 print(f"Error al ejecutar seeders: {seeder_error}")
+
+        # Cargar en memoria los catálogos de evaluación integral y tipos de evaluación
+        try:
+            from .Services.CatalogoEvaluacionService import CatalogoEvaluacionService
+            CatalogoEvaluacionService.cargar()
+        except Exception as e:
+            print(f"Error al cargar el catálogo de evaluaciones: {e}")
+
+        # Construir la tabla roster si está vacía (bases creadas antes de la tabla o recién sembradas)
+        try:
+            from .models.Roster_Model import Roster
+            from .models.Inscripcion_Model import Inscripcion
+            if Roster.query.first() is None and Inscripcion.query.first() is not None:
+                from .Services.RosterService import RosterService
+                filas = RosterService.reconstruir()
+                db.session.commit()
+                print(f"Tabla roster construida con {filas} filas.")
+        except Exception as e:
+            db.session.rollback()
+            print(f"Error al construir la tabla roster: {e}")
+
+        # Las notas se guardan con ON CONFLICT sobre la clave única que agrega la migración
+        # 3f2a9c4d1b7e; sin ella (base creada con create_all) se usa el camino lento del ORM
+        try:
+            from .Services.UpsertNotasService import UpsertNotasService
+            sin_clave = UpsertNotasService.verificar_claves_unicas()
+            db.session.rollback()
+            if sin_clave:
+                print(f"Advertencia: {', '.join(sin_clave)} sin restricción única; ejecute 'flask db upgrade'. "
+                      "Mientras tanto las notas se guardan fila por fila.")
+        except Exception as e:
+            db.session.rollback()
+            print(f"Error al verificar las restricciones únicas de notas: {e}")
+
+        # Los trabajos en segundo plano mueren con el proceso que los ejecutaba
+        try:
+            from .Services.GeneracionGestionService import GeneracionGestionService
+            abandonados = GeneracionGestionService.marcar_abandonados()
+            db.session.commit()
+            if abandonados:
+                print(f"{abandonados} trabajos sin avance marcados con error.")
+        except Exception as e:
+            db.session.rollback()
+            print(f"Error al revisar los trabajos en segundo plano: {e}")
+
+        # Construir los resúmenes de los dashboards si están vacíos
+        try:
+            from .models.ResumenMateria_Model import ResumenMateria
+            from .models.Evaluacion_Model import Evaluacion
+            if ResumenMateria.query.first() is None and Evaluacion.query.first() is not None:
+                from .Services.AnaliticaService import AnaliticaService
+                filas = AnaliticaService.reconstruir()
+                db.session.commit()
+                print(f"Resúmenes de dashboards construidos con {filas} filas.")
+        except Exception as e:
+            db.session.rollback()
+            print(f"Error al construir los resúmenes de dashboards: {e}")
     
     # Elimina cualquier configuración previa  # Acceso directo a la configuración interna
 
@@ -24,5 +24,18 @@ evaluacion_model_response = ns.model('EvaluacionResponse', {
     'gestion_id': fields.Integer(required=True, description='ID de la gestion'),
 })
 
+asistencia_item_model = ns.model('AsistenciaCursoItem', {
+    'estudiante_ci': fields.Integer(required=True, description='CI del estudiante'),
+    'estado': fields.String(description='Presente, Tarde, Licencia o Falta'),
+    'presente': fields.Boolean(description='Alternativa a estado: true = Presente, false = Falta'),
+    'nota': fields.Float(description='Puntaje explícito (0 a 15); tiene prioridad sobre estado'),
+    'descripcion': fields.String(description='Descripción opcional')
+})
 
-
+asistencia_curso_model_request = ns.model('AsistenciaCursoRequest', {
+    'curso_id': fields.Integer(required=True, description='ID del curso'),
+    'materia_id': fields.Integer(required=True, description='ID de la materia'),
+    'gestion_id': fields.Integer(required=True, description='ID de la gestion'),
+    'fecha': fields.Date(required=True, description='Fecha de la asistencia'),
+    'asistencias': fields.List(fields.Nested(asistencia_item_model), required=True, description='Asistencia de cada estudiante')
+})
@@ -13,3 +13,19 @@ gestion_model_response = ns.model('GestionResponse', {
     'anio': fields.Integer(required=True, description='Año'),
     'periodo': fields.String(required=True, description='Periodo'),
 })
+
+
+trabajo_model_response = ns.model('TrabajoResponse', {
+    'id': fields.Integer(description='ID del trabajo'),
+    'tipo': fields.String(description='Tipo de trabajo'),
+    'estado': fields.String(description='pendiente, en_proceso, completado o error'),
+    'total': fields.Integer(description='Filas a procesar'),
+    'procesados': fields.Integer(description='Filas procesadas'),
+    'porcentaje': fields.Float(description='Avance en porcentaje'),
+    'mensaje': fields.String(description='Resultado o error'),
+    'gestion_id': fields.Integer(description='Gestión asociada'),
+})
+
+gestion_con_trabajo_model_response = ns.inherit('GestionConTrabajoResponse', gestion_model_response, {
+    'trabajo': fields.Nested(trabajo_model_response, description='Generación de notas en curso'),
+})
@@ -1,5 +1,13 @@
-from flask_restx import reqparse
+import base64
+import json
+from datetime import date, datetime
+from urllib.parse import urlencode
+from flask import request
+from flask_restx import reqparse, abort
+from sqlalchemy import and_, or_, select
 from werkzeug.datastructures import FileStorage
+from app import db
+from ..Services.SerializacionService import SerializacionService
 
 # Parser para upload de imágenes
 upload_parser = reqparse.RequestParser()
@@ -17,4 +25,178 @@ estudiante_parser.add_argument('ci', type=int, required=True, help="CI numérico
 estudiante_parser.add_argument('fechaNacimiento', required=True, help="Formato YYYY-MM-DD")
 estudiante_parser.add_argument('apoderado', required=False)
 estudiante_parser.add_argument('telefono', required=False)
-estudiante_parser.add_argument('file', type=FileStorage, location='files', required=False)
\ No newline at end of file
+estudiante_parser.add_argument('file', type=FileStorage, location='files', required=False)
+
+# Listados paginados: paginación por cursor (keyset), orden, filtros y proyección
+LIMITE_POR_DEFECTO = 1000
+LIMITE_MAXIMO = 1000
+
+# Parámetros reservados; cualquier otro parámetro con el nombre de un campo del listado es un filtro
+PARAMETROS_LISTADO = ('limit', 'cursor', 'sort', 'fields')
+
+listado_parser = reqparse.RequestParser()
+listado_parser.add_argument('limit', type=int, location='args', required=False,
+                            help=f"Filas por página (máximo {LIMITE_MAXIMO})")
+listado_parser.add_argument('cursor', location='args', required=False,
+                            help="Cursor de la página siguiente (cabecera X-Next-Cursor de la respuesta anterior)")
+listado_parser.add_argument('sort', location='args', required=False,
+                            help="Campo de orden; con '-' delante es descendente (p. ej. -fecha)")
+listado_parser.add_argument('fields', location='args', required=False,
+                            help="Campos a devolver separados por coma (p. ej. id,nota)")
+
+
+def listar_paginado(modelo, modelo_respuesta):
+    """
+    Lista `modelo` por páginas acotadas, leyendo limit, cursor, sort, fields y filtros de la
+    query string. Los demás parámetros cuyo nombre es un campo del listado filtran por igualdad
+    (varios valores separados por coma filtran con IN); los que no son campos se ignoran, como
+    antes de la paginación (p. ej. el anti-caché `_=<timestamp>`).
+
+    Se consultan solo las columnas necesarias (select de Core, sin objetos del ORM) y las filas
+    se serializan directamente con el formato de `modelo_respuesta`.
+
+    El cuerpo sigue siendo una lista con el formato de `modelo_respuesta`; si hay más filas,
+    la respuesta trae el cursor en la cabecera X-Next-Cursor y un Link rel="next".
+
+    Returns:
+        Response JSON lista para devolver desde un Resource
+    """
+    args = listado_parser.parse_args()
+    campos_respuesta = SerializacionService.campos(modelo_respuesta)
+    columnas = _columnas_listables(modelo, campos_respuesta)
+    clave = modelo.__table__.primary_key.columns[0]
+
+    limite = LIMITE_POR_DEFECTO if args['limit'] is None else args['limit']
+    if limite < 1 or limite > LIMITE_MAXIMO:
+        abort(400, f"limit debe estar entre 1 y {LIMITE_MAXIMO}")
+
+    campos = None
+    if args['fields']:
+        campos = [campo.strip() for campo in args['fields'].split(',') if campo.strip()]
+        desconocidos = [campo for campo in campos if campo not in campos_respuesta]
+        if desconocidos:
+            abort(400, f"Campos desconocidos: {', '.join(desconocidos)}")
+
+    # Orden: campo pedido y la clave primaria como desempate, los nulos al final
+    orden = args['sort'] or clave.key
+    descendente = orden.startswith('-')
+    orden = orden.lstrip('-')
+    if orden not in columnas:
+        abort(400, f"No se puede ordenar por '{orden}'")
+    columna_orden = columnas[orden]
+
+    # Columnas pedidas, más las del orden (para el cursor)
+    seleccion = {
+        nombre: columna for nombre, columna in columnas.items()
+        if campos is None or nombre in campos
+    }
+    seleccion.setdefault(clave.key, clave)
+    seleccion.setdefault(columna_orden.key, columna_orden)
+    consulta = select(*seleccion.values())
+
+    # Filtros por igualdad
+    for nombre, valor in request.args.items():
+        if nombre in PARAMETROS_LISTADO or nombre not in columnas:
+            continue
+        valores = [_convertir(columnas[nombre], v) for v in valor.split(',')]
+        columna = columnas[nombre]
+        consulta = consulta.where(columna == valores[0] if len(valores) == 1 else columna.in_(valores))
+
+    if args['cursor']:
+        valor, ultima_clave = _leer_cursor(args['cursor'], columna_orden, clave)
+        consulta = consulta.where(
+            _despues_de(columna_orden, clave, valor, ultima_clave, descendente)
+        )
+
+    if descendente:
+        consulta = consulta.order_by(columna_orden.desc().nulls_last(), clave.desc())
+    else:
+        consulta = consulta.order_by(columna_orden.asc().nulls_last(), clave.asc())
+
+    # Una fila de más indica si hay página siguiente
+    filas = db.session.execute(consulta.limit(limite + 1)).all()
+    hay_mas = len(filas) > limite
+    filas = filas[:limite]
+
+    datos = SerializacionService.a_dicts(filas, modelo_respuesta, campos)
+
+    cabeceras = {}
+    if hay_mas:
+        ultima = filas[-1]._mapping
+        cursor = _crear_cursor(ultima[columna_orden.key], ultima[clave.key])
+        siguiente = request.args.to_dict()
+        siguiente['cursor'] = cursor
+        url = f"{request.base_url}?{urlencode(siguiente)}"
+        cabeceras['X-Next-Cursor'] = cursor
+        cabeceras['Link'] = f'<{url}>; rel="next"'
+
+    return SerializacionService.respuesta_json(datos, 200, cabeceras)
+
+
+def _columnas_listables(modelo, campos_respuesta):
+    """Columnas de la tabla que también están en el modelo de respuesta (no expone p. ej. contraseñas)"""
+    return {
+        columna.key: columna
+        for columna in modelo.__table__.columns
+        if columna.key in campos_respuesta
+    }
+
+
+def _convertir(columna, valor):
+    """Convierte un valor de la query string (o del cursor) al tipo de la columna"""
+    if valor is None:
+        return None
+    try:
+        tipo = columna.type.python_type
+        if tipo is bool:
+            return str(valor).lower() in ('true', '1', 'si', 'sí')
+        if tipo is date:
+            return date.fromisoformat(valor)
+        if tipo is datetime:
+            return datetime.fromisoformat(valor)
+        return tipo(valor)
+    except (ValueError, TypeError, NotImplementedError):
+        abort(400, f"Valor inválido para '{columna.key}': {valor}")
+
+
+def _crear_cursor(valor, clave):
+    if isinstance(valor, (date, datetime)):
+        valor = valor.isoformat()
+    texto = json.dumps([valor, clave])
+    return base64.urlsafe_b64encode(texto.encode()).decode().rstrip('=')
+
+
+def _leer_cursor(cursor, columna_orden, clave):
+    try:
+        texto = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        valor, ultima_clave = json.loads(texto)
+    except (ValueError, TypeError):
+        abort(400, "cursor inválido")
+    return _convertir(columna_orden, valor), _convertir(clave, ultima_clave)
+
+
+def _despues_de(columna, clave, valor, ultima_clave, descendente):
+    """Filas que van después de (valor, ultima_clave) en el orden (columna NULLS LAST, clave)"""
+    if valor is None:
+        # Ya se está recorriendo el bloque final de nulos
+        return and_(columna.is_(None), clave < ultima_clave if descendente else clave > ultima_clave)
+    if descendente:
+        return or_(columna < valor, and_(columna == valor, clave < ultima_clave), columna.is_(None))
+    return or_(columna > valor, and_(columna == valor, clave > ultima_clave), columna.is_(None))
+
+
+# Búsqueda de personas por nombre
+busqueda_parser = reqparse.RequestParser()
+busqueda_parser.add_argument('limit', type=int, location='args', required=False,
+                             help="Resultados como máximo (máximo 100; sin limit, todas las coincidencias)")
+
+
+# Exportación por streaming (NDJSON / CSV)
+exportacion_parser = reqparse.RequestParser()
+exportacion_parser.add_argument('formato', location='args', choices=('ndjson', 'csv'), default='ndjson',
+                                help="ndjson (un objeto JSON por línea) o csv")
+exportacion_parser.add_argument('gestion_id', type=int, location='args', required=False)
+exportacion_parser.add_argument('curso_id', type=int, location='args', required=False,
+                                help="Estudiantes inscritos en el curso y materias del curso")
+exportacion_parser.add_argument('materia_id', type=int, location='args', required=False)
+exportacion_parser.add_argument('estudiante_ci', type=int, location='args', required=False)
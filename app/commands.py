@@ -0,0 +1,187 @@
+# commands.py
+import click
+from flask.cli import AppGroup
+from app import db
+
+grades_cli = AppGroup('grades', help='Procesos por lotes sobre las notas.')
+
+
+@grades_cli.command('close-term')
+@click.argument('gestion_id', type=int)
+@click.option('--chunk-size', type=int, default=None,
+              help='Filas de agregados leídas por bloque (por defecto 5000).')
+def close_term(gestion_id, chunk_size):
+    """Calcula y guarda la nota final integral de todos los estudiantes y materias de una gestión."""
+    from .models.Gestion_Model import Gestion
+    from .Services.CierreGestionService import CierreGestionService
+
+    gestion = db.session.get(Gestion, gestion_id)
+    if not gestion:
+        raise click.ClickException(f'Gestión {gestion_id} no encontrada')
+
+    click.echo(f'Cerrando gestión {gestion.id} ({gestion.anio} - {gestion.periodo})...')
+
+    def mostrar_avance(resumen):
+        click.echo(f"  bloque {resumen['bloques']}: {resumen['notas']} notas, "
+                   f"{resumen['evaluaciones']} evaluaciones, {resumen['segundos']:.2f} s")
+
+    try:
+        resumen = CierreGestionService.cerrar_gestion(gestion_id, chunk_size, mostrar_avance)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        raise click.ClickException(f'Error al cerrar la gestión: {e}')
+
+    segundos = resumen['segundos'] or 1e-9
+    click.echo(f"Notas finales guardadas: {resumen['notas']} "
+               f"({resumen['evaluaciones']} evaluaciones) en {resumen['segundos']:.2f} s")
+    click.echo(f"Rendimiento: {resumen['notas'] / segundos:.0f} notas/s, "
+               f"{resumen['evaluaciones'] / segundos:.0f} evaluaciones/s")
+
+
+@grades_cli.command('expire-jobs')
+@click.option('--minutes', type=int, default=None,
+              help='Minutos sin avance para considerar interrumpido un trabajo (por defecto 15).')
+def expire_jobs(minutes):
+    """Marca con error los trabajos de generación de notas cuyo proceso terminó sin completarlos."""
+    from .Services.GeneracionGestionService import GeneracionGestionService
+
+    try:
+        cantidad = GeneracionGestionService.marcar_abandonados(minutes)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        raise click.ClickException(f'Error al revisar los trabajos: {e}')
+    click.echo(f'Trabajos marcados con error: {cantidad}')
+
+
+@grades_cli.command('run-job')
+@click.argument('trabajo_id', type=int)
+def run_job(trabajo_id):
+    """Ejecuta en primer plano un trabajo de generación de notas pendiente o con error."""
+    from .models.Trabajo_Model import Trabajo
+    from .Services.GeneracionGestionService import GeneracionGestionService
+
+    trabajo = db.session.get(Trabajo, trabajo_id)
+    if not trabajo:
+        raise click.ClickException(f'Trabajo {trabajo_id} no encontrado')
+    if trabajo.estado not in ('pendiente', 'error'):
+        raise click.ClickException(f"El trabajo {trabajo_id} está '{trabajo.estado}'; "
+                                   "use 'flask grades expire-jobs' si su proceso terminó")
+
+    click.echo(f'Generando las notas de la gestión {trabajo.gestion_id}...')
+    trabajo = GeneracionGestionService.ejecutar(trabajo_id)
+    if trabajo.estado == 'error':
+        raise click.ClickException(trabajo.mensaje)
+    click.echo(trabajo.mensaje)
+
+
+api_cli = AppGroup('api', help='Utilidades de la API.')
+
+
+@api_cli.command('bench-serialization')
+@click.option('--rows', type=int, default=10000, help='Evaluaciones a serializar por repetición.')
+@click.option('--repeat', type=int, default=5, help='Repeticiones (se informa la mejor).')
+def bench_serialization(rows, repeat):
+    """Compara el costo por fila de listar evaluaciones: ORM + schema.dump + marshal vs filas de Core."""
+    import json
+    import time
+    from flask_restx import marshal
+    from sqlalchemy import select
+    from .models.Evaluacion_Model import Evaluacion
+    from .schemas.Evaluacion_schema import EvaluacionSchema
+    from .api_model.Evaluacion import evaluacion_model_response
+    from .Services.SerializacionService import SerializacionService, orjson
+
+    esquema = EvaluacionSchema(many=True)
+    columnas = [Evaluacion.__table__.c[nombre] for nombre in evaluacion_model_response]
+
+    def anterior():
+        objetos = Evaluacion.query.order_by(Evaluacion.id).limit(rows).all()
+        cuerpo = json.dumps(marshal(esquema.dump(objetos), evaluacion_model_response))
+        db.session.expunge_all()
+        return len(objetos), len(cuerpo)
+
+    def directo():
+        filas = db.session.execute(select(*columnas).order_by(Evaluacion.id).limit(rows)).all()
+        cuerpo = SerializacionService.dumps(SerializacionService.a_dicts(filas, evaluacion_model_response))
+        return len(filas), len(cuerpo)
+
+    click.echo(f"Codificador JSON: {'orjson' if orjson is not None else 'json (biblioteca estándar)'}")
+    for nombre, funcion in (('ORM + schema.dump + marshal', anterior), ('Row de Core + SerializacionService', directo)):
+        mejor = None
+        for _ in range(repeat):
+            inicio = time.perf_counter()
+            cantidad, tamano = funcion()
+            segundos = time.perf_counter() - inicio
+            mejor = segundos if mejor is None else min(mejor, segundos)
+        if not cantidad:
+            raise click.ClickException('No hay evaluaciones para medir')
+        click.echo(f"{nombre}: {cantidad} filas, {tamano} bytes, "
+                   f"{mejor * 1000:.1f} ms, {mejor / cantidad * 1e6:.2f} µs/fila")
+
+
+@api_cli.command('refresh-roster')
+def refresh_roster():
+    """Recalcula toda la tabla roster (docente, materia, curso, año -> estudiantes)."""
+    from .Services.RosterService import RosterService
+
+    try:
+        filas = RosterService.reconstruir()
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        raise click.ClickException(f'Error al reconstruir la tabla roster: {e}')
+    click.echo(f'Tabla roster reconstruida: {filas} filas')
+
+
+@api_cli.command('rebuild-acumulados')
+@click.option('--gestion', 'gestion_ids', type=int, multiple=True, help='Gestión a reconstruir (repetible; por defecto todas).')
+@click.option('--check', 'solo_revisar', is_flag=True, help='Solo informa las claves cuyos acumulados no coinciden.')
+def rebuild_acumulados(gestion_ids, solo_revisar):
+    """Reconstruye acumulado_evaluacion desde evaluacion (tras SQL manual o escrituras que no lo actualizaron)."""
+    import time
+    from .Services.AcumuladoEvaluacionService import AcumuladoEvaluacionService
+
+    gestion_ids = list(gestion_ids) or None
+    inicio = time.perf_counter()
+    if solo_revisar:
+        distintas = AcumuladoEvaluacionService.diferencias(gestion_ids)
+        db.session.rollback()
+        for estudiante_ci, materia_id, gestion_id in distintas[:20]:
+            click.echo(f'  estudiante {estudiante_ci}, materia {materia_id}, gestión {gestion_id}')
+        click.echo(f'Claves con acumulados distintos de evaluacion: {len(distintas)} '
+                   f'({time.perf_counter() - inicio:.2f} s)')
+        if distintas:
+            raise SystemExit(1)
+        return
+
+    try:
+        claves = AcumuladoEvaluacionService.reconstruir_todo(gestion_ids)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        raise click.ClickException(f'Error al reconstruir los acumulados: {e}')
+    click.echo(f'Acumulados reconstruidos para {claves} claves en {time.perf_counter() - inicio:.2f} s')
+
+
+@api_cli.command('refresh-analytics')
+@click.option('--all', 'completo', is_flag=True, help='Recalcula todos los resúmenes, no solo los pendientes.')
+def refresh_analytics(completo):
+    """Recalcula los resúmenes de los dashboards (pensado para ejecutarse de forma programada, p. ej. cron)."""
+    import time
+    from .Services.AnaliticaService import AnaliticaService
+
+    inicio = time.perf_counter()
+    try:
+        if completo:
+            filas = AnaliticaService.reconstruir()
+            mensaje = f'Resúmenes reconstruidos: {filas} filas de resumen_materia'
+        else:
+            marcas = AnaliticaService.refrescar_pendientes()
+            mensaje = f'Resúmenes pendientes recalculados: {marcas} marcas procesadas'
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        raise click.ClickException(f'Error al recalcular los resúmenes: {e}')
+    click.echo(f'{mensaje} en {time.perf_counter() - inicio:.2f} s')
@@ -7,6 +7,7 @@ from app.models.NotaEstimada_Model import NotaEstimada
 from app.models.NotaFinal_Model import NotaFinal
 from app.models.Estudiante_Model import Estudiante
 from app import db
+from app.Services.UpsertNotasService import UpsertNotasService
 import logging
 
 logger = logging.getLogger(__name__)
@@ -25,67 +26,113 @@ class NotasPredictionService:
         Returns:
             NotaEstimada actualizada o None si hubo error
         """
+        clave = (nota_final.estudiante_ci, nota_final.materia_id, nota_final.gestion_id)
+        return NotasPredictionService.predict_and_update_notas_estimadas([nota_final]).get(clave)
+
+    @staticmethod
+    def predict_and_update_notas_estimadas(notas_finales):
+        """
+        Predice y actualiza las notas estimadas de varias notas finales: una consulta de
+        estudiantes, una predicción por edad distinta, un upsert por lotes y un solo commit
+        
+        Args:
+            notas_finales: NotaFinal (o filas con sus columnas) recién creadas/actualizadas
+        
+        Returns:
+            Dict {(estudiante_ci, materia_id, gestion_id): NotaEstimada guardada} ({} si hubo error)
+        """
+        notas_finales = list(notas_finales)
+        if not notas_finales:
+            return {}
+        
         try:
-            # Obtener información del estudiante
-            estudiante = Estudiante.query.filter_by(ci=nota_final.estudiante_ci).first()
-            
-            if not estudiante:
-                logger.error(f"No se encontró estudiante con CI: {nota_final.estudiante_ci}")
-                return None
-            
-            # Preparar datos para la predicción
-            student_data = {
-                'edad': estudiante.calcular_edad() if hasattr(estudiante, 'calcular_edad') else 16,
-                'nota_actual': nota_final.valor
+            # Obtener información de todos los estudiantes en una consulta
+            estudiantes = {
+                estudiante.ci: estudiante
+                for estudiante in Estudiante.query.filter(
+                    Estudiante.ci.in_({nota_final.estudiante_ci for nota_final in notas_finales})
+                )
             }
             
-            # Realizar predicción con el modelo ML
-            result = ml_service.predict_performance(student_data)
-            
-            if not result.get('success', False):
-                logger.error(f"Error en predicción de ML: {result.get('error')}")
-                return None
-            
-            # Obtener el valor predictivo
-            predicted_score = result.get('predicted_score', 0)
-            category = result.get('performance_category', 'No clasificado')
-            recommendations = result.get('recommendations', [])
-            
-            # Buscar si ya existe una nota estimada para este estudiante, materia y gestión
-            nota_estimada = NotaEstimada.query.filter_by(
-                estudiante_ci=nota_final.estudiante_ci,
-                materia_id=nota_final.materia_id,
-                gestion_id=nota_final.gestion_id
-            ).first()
-            
-            razon = f"Predicción ML ({category}): " + ", ".join(recommendations[:2])
+            # El modelo de rendimiento solo usa la edad: una predicción por edad distinta
+            predicciones = {}
+            filas = []
+            for nota_final in notas_finales:
+                estudiante = estudiantes.get(nota_final.estudiante_ci)
+                if not estudiante:
+                    logger.error(f"No se encontró estudiante con CI: {nota_final.estudiante_ci}")
+                    continue
+                
+                # Preparar datos para la predicción
+                student_data = {
+                    'edad': estudiante.calcular_edad() if hasattr(estudiante, 'calcular_edad') else 16,
+                    'nota_actual': nota_final.valor
+                }
+                
+                # Realizar predicción con el modelo ML
+                result = predicciones.get(student_data['edad'])
+                if result is None:
+                    result = predicciones[student_data['edad']] = ml_service.predict_performance(student_data)
+                
+                if not result.get('success', False):
+                    logger.error(f"Error en predicción de ML: {result.get('error')}")
+                    continue
+                
+                # Obtener el valor predictivo
+                category = result.get('performance_category', 'No clasificado')
+                recommendations = result.get('recommendations', [])
+                filas.append({
+                    'estudiante_ci': nota_final.estudiante_ci,
+                    'materia_id': nota_final.materia_id,
+                    'gestion_id': nota_final.gestion_id,
+                    'valor_estimado': result.get('predicted_score', 0),
+                    'razon_estimacion': f"Predicción ML ({category}): " + ", ".join(recommendations[:2])
+                })
             
-            if nota_estimada:
-                # Actualizar nota existente
-                nota_estimada.valor_estimado = predicted_score
-                nota_estimada.razon_estimacion = razon
-            else:
-                # Crear nueva nota estimada
-                nota_estimada = NotaEstimada(
-                    valor_estimado=predicted_score,
-                    razon_estimacion=razon,
-                    estudiante_ci=nota_final.estudiante_ci,
-                    materia_id=nota_final.materia_id,
-                    gestion_id=nota_final.gestion_id
-                )
-                db.session.add(nota_estimada)
+            # Crear o actualizar todas las notas estimadas con un upsert por lotes
+            notas_estimadas = UpsertNotasService.upsert_notas_estimadas(filas)
             
             # Guardar cambios
             db.session.commit()
-            logger.info(f"Nota estimada actualizada para estudiante {nota_final.estudiante_ci}, " +
-                       f"materia {nota_final.materia_id}, valor: {predicted_score}")
+            logger.info(f"Notas estimadas actualizadas: {len(notas_estimadas)}")
             
-            return nota_estimada
+            return notas_estimadas
             
         except Exception as e:
             db.session.rollback()
-            logger.error(f"Error al actualizar nota estimada: {str(e)}")
+            logger.error(f"Error al actualizar notas estimadas: {str(e)}")
+            return {}
+
+    def predict_and_upsert_nota_estimada(self, estudiante_ci, materia_id, gestion_id):
+        """
+        Predice la nota de un estudiante y guarda la NotaEstimada con un upsert (con commit)
+        
+        Returns:
+            Fila guardada de NotaEstimada o None si no hubo predicción
+        """
+        prediccion = self.predict_student_grade(
+            estudiante_ci=estudiante_ci,
+            materia_id=materia_id,
+            gestion_id=gestion_id
+        )
+        
+        if not prediccion or 'nota_estimada' not in prediccion:
             return None
+        
+        try:
+            nota_estimada = UpsertNotasService.upsert_notas_estimadas([{
+                'estudiante_ci': estudiante_ci,
+                'materia_id': materia_id,
+                'gestion_id': gestion_id,
+                'valor_estimado': prediccion['nota_estimada'],
+                'razon_estimacion': prediccion.get('razon', 'Predicción ML basada en rendimiento académico')
+            }])[(estudiante_ci, materia_id, gestion_id)]
+            db.session.commit()
+            return nota_estimada
+        except Exception:
+            db.session.rollback()
+            raise
+
     def predict_student_grade(self, estudiante_ci, materia_id, gestion_id):
         """
         Predice la nota estimada para un estudiante específico
@@ -0,0 +1,17 @@
+from app import db
+
+class AcumuladoEvaluacion(db.Model):
+    """Suma y cantidad de notas por estudiante, materia, gestión y tipo de evaluación"""
+    __tablename__ = 'acumulado_evaluacion'
+    __table_args__ = (
+        db.UniqueConstraint('estudiante_ci', 'materia_id', 'gestion_id', 'tipo_evaluacion_id',
+                            name='uq_acumulado_evaluacion_clave'),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    suma = db.Column(db.Float, nullable=False, default=0.0)
+    cantidad = db.Column(db.Integer, nullable=False, default=0)
+
+    estudiante_ci = db.Column(db.Integer, db.ForeignKey('estudiante.ci'), nullable=False)
+    materia_id = db.Column(db.Integer, db.ForeignKey('materia.id'), nullable=False)
+    gestion_id = db.Column(db.Integer, db.ForeignKey('gestion.id'), nullable=False)
+    tipo_evaluacion_id = db.Column(db.Integer, db.ForeignKey('tipo_evaluacion.id'), nullable=False)
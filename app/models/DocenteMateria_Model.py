@@ -6,7 +6,7 @@ class DocenteMateria(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     fecha = db.Column(db.Date)
 
-    docente_ci = db.Column(db.Integer, db.ForeignKey('docente.ci'))
+    docente_ci = db.Column(db.Integer, db.ForeignKey('docente.ci'), index=True)
     materia_id = db.Column(db.Integer, db.ForeignKey('materia.id'))
 
     # Relaciones hacia ambos lados
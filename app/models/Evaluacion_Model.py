@@ -2,6 +2,11 @@ from app import db
 
 class Evaluacion(db.Model):
     __tablename__ = 'evaluacion'
+    __table_args__ = (
+        db.Index('ix_evaluacion_clave', 'estudiante_ci', 'materia_id', 'gestion_id', 'tipo_evaluacion_id'),
+        db.Index('ix_evaluacion_gestion_tipo', 'gestion_id', 'tipo_evaluacion_id'),
+        db.Index('ix_evaluacion_gestion_materia', 'gestion_id', 'materia_id'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     descripcion = db.Column(db.Text)
     fecha = db.Column(db.Date)
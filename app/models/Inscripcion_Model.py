@@ -5,8 +5,8 @@ class Inscripcion(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     descripcion = db.Column(db.String(100))
     fecha = db.Column(db.Date)
-    estudiante_ci = db.Column(db.Integer, db.ForeignKey('estudiante.ci'))
-    curso_id = db.Column(db.Integer, db.ForeignKey('curso.id'))
+    estudiante_ci = db.Column(db.Integer, db.ForeignKey('estudiante.ci'), index=True)
+    curso_id = db.Column(db.Integer, db.ForeignKey('curso.id'), index=True)
     
     estudiante = db.relationship('Estudiante', backref='inscripciones')
     curso = db.relationship('Curso', backref='inscripciones')
@@ -6,7 +6,7 @@ class MateriaCurso(db.Model):
     anio = db.Column(db.Integer)
 
     materia_id = db.Column(db.Integer, db.ForeignKey('materia.id'))
-    curso_id = db.Column(db.Integer, db.ForeignKey('curso.id'))
+    curso_id = db.Column(db.Integer, db.ForeignKey('curso.id'), index=True)
 
     materia = db.relationship('Materia', back_populates='cursos')
     curso = db.relationship('Curso', back_populates='materias')
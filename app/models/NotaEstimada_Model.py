@@ -2,6 +2,9 @@ from app import db
 
 class NotaEstimada(db.Model):
     __tablename__ = 'nota_estimada'
+    __table_args__ = (
+        db.UniqueConstraint('estudiante_ci', 'materia_id', 'gestion_id', name='uq_nota_estimada_clave'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     valor_estimado = db.Column(db.Float)
     razon_estimacion = db.Column(db.Text)
@@ -2,6 +2,9 @@ from app import db
 
 class NotaFinal(db.Model):
     __tablename__ = 'nota_final'
+    __table_args__ = (
+        db.UniqueConstraint('estudiante_ci', 'materia_id', 'gestion_id', name='uq_nota_final_clave'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     valor = db.Column(db.Float)
     estudiante_ci = db.Column(db.Integer, db.ForeignKey('estudiante.ci'))
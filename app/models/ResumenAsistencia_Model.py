@@ -0,0 +1,18 @@
+from app import db
+
+class ResumenAsistencia(db.Model):
+    """
+    Resumen materializado de la asistencia final de cada gestión (todas las materias).
+    Los estudiantes se clasifican por su promedio de asistencia final en la escala de 15 puntos.
+    Lo calcula AnaliticaService; no se edita a mano.
+    """
+    __tablename__ = 'resumen_asistencia'
+    id = db.Column(db.Integer, primary_key=True)
+    gestion_id = db.Column(db.Integer, nullable=False, unique=True)
+    cantidad = db.Column(db.Integer, nullable=False, default=0)
+    suma = db.Column(db.Float, nullable=False, default=0.0)
+    estudiantes = db.Column(db.Integer, nullable=False, default=0)
+    excelente = db.Column(db.Integer, nullable=False, default=0)
+    buena = db.Column(db.Integer, nullable=False, default=0)
+    regular = db.Column(db.Integer, nullable=False, default=0)
+    deficiente = db.Column(db.Integer, nullable=False, default=0)
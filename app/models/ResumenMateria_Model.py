@@ -0,0 +1,25 @@
+from app import db
+
+class ResumenMateria(db.Model):
+    """
+    Resumen materializado de las evaluaciones por gestión, materia y tipo de evaluación.
+    Lo calcula AnaliticaService a partir de la tabla evaluacion; no se edita a mano.
+    """
+    __tablename__ = 'resumen_materia'
+    __table_args__ = (
+        db.UniqueConstraint('gestion_id', 'materia_id', 'tipo_evaluacion_id', name='uq_resumen_materia_clave'),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    gestion_id = db.Column(db.Integer, nullable=False)
+    materia_id = db.Column(db.Integer, nullable=False)
+    tipo_evaluacion_id = db.Column(db.Integer, nullable=False)
+    cantidad = db.Column(db.Integer, nullable=False, default=0)
+    suma = db.Column(db.Float, nullable=False, default=0.0)
+    minimo = db.Column(db.Float)
+    maximo = db.Column(db.Float)
+    estudiantes = db.Column(db.Integer, nullable=False, default=0)
+    # Estudiantes según su promedio del tipo en la materia (escala de asistencia de 15 puntos)
+    excelente = db.Column(db.Integer, nullable=False, default=0)
+    buena = db.Column(db.Integer, nullable=False, default=0)
+    regular = db.Column(db.Integer, nullable=False, default=0)
+    deficiente = db.Column(db.Integer, nullable=False, default=0)
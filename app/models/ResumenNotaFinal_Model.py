@@ -0,0 +1,20 @@
+from app import db
+
+class ResumenNotaFinal(db.Model):
+    """
+    Resumen materializado de las notas finales por gestión y materia.
+    Lo calcula AnaliticaService a partir de la tabla nota_final; no se edita a mano.
+    """
+    __tablename__ = 'resumen_nota_final'
+    __table_args__ = (
+        db.UniqueConstraint('gestion_id', 'materia_id', name='uq_resumen_nota_final_clave'),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    gestion_id = db.Column(db.Integer, nullable=False)
+    materia_id = db.Column(db.Integer, nullable=False)
+    cantidad = db.Column(db.Integer, nullable=False, default=0)
+    suma = db.Column(db.Float, nullable=False, default=0.0)
+    minimo = db.Column(db.Float)
+    maximo = db.Column(db.Float)
+    aprobados = db.Column(db.Integer, nullable=False, default=0)
+    reprobados = db.Column(db.Integer, nullable=False, default=0)
@@ -0,0 +1,17 @@
+from app import db
+
+class ResumenPendiente(db.Model):
+    """
+    (gestión, materia) cuyas notas cambiaron y cuyos resúmenes aún no se recalcularon.
+    materia_id nulo marca la gestión completa. Una sola fila por clave: ver AnaliticaService.marcar.
+    """
+    __tablename__ = 'resumen_pendiente'
+    __table_args__ = (
+        db.UniqueConstraint('gestion_id', 'materia_id', name='uq_resumen_pendiente_clave'),
+        # UNIQUE no compara los NULL: la marca de gestión completa necesita su propio índice
+        db.Index('uq_resumen_pendiente_gestion', 'gestion_id', unique=True,
+                 postgresql_where=db.text('materia_id IS NULL'), sqlite_where=db.text('materia_id IS NULL')),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    gestion_id = db.Column(db.Integer, nullable=False, index=True)
+    materia_id = db.Column(db.Integer)
@@ -0,0 +1,10 @@
+from app import db
+
+class ResumenVersion(db.Model):
+    """
+    Versión de los resúmenes de cada gestión: cambia cada vez que AnaliticaService los recalcula.
+    Las cachés en memoria de los workers la comparan para saber si siguen vigentes.
+    """
+    __tablename__ = 'resumen_version'
+    gestion_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    version = db.Column(db.BigInteger, nullable=False)
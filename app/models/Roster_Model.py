@@ -0,0 +1,24 @@
+from app import db
+
+class Roster(db.Model):
+    """
+    Lista materializada de estudiantes por docente, materia, curso y año de inscripción.
+    Se deriva de DocenteMateria, MateriaCurso e Inscripcion (ver RosterService); no se edita a mano.
+    """
+    __tablename__ = 'roster'
+    __table_args__ = (
+        db.UniqueConstraint('docente_ci', 'materia_id', 'curso_id', 'anio', 'estudiante_ci',
+                            name='uq_roster_clave'),
+        db.Index('ix_roster_lista', 'docente_ci', 'materia_id', 'curso_id', 'anio', 'orden'),
+        db.Index('ix_roster_curso', 'curso_id'),
+        db.Index('ix_roster_estudiante', 'estudiante_ci'),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    docente_ci = db.Column(db.Integer, nullable=False)
+    materia_id = db.Column(db.Integer, nullable=False)
+    curso_id = db.Column(db.Integer, nullable=False)
+    estudiante_ci = db.Column(db.Integer, nullable=False)
+    nombre = db.Column(db.String(50))
+    anio = db.Column(db.Integer)
+    # Primera inscripción del estudiante en el curso y año: conserva el orden de la lista
+    orden = db.Column(db.Integer, nullable=False)
@@ -0,0 +1,16 @@
+from datetime import datetime
+from app import db
+
+class Trabajo(db.Model):
+    """Proceso en segundo plano (p. ej. generación de notas de una gestión) y su avance"""
+    __tablename__ = 'trabajo'
+    id = db.Column(db.Integer, primary_key=True)
+    tipo = db.Column(db.String(50), nullable=False)
+    estado = db.Column(db.String(20), nullable=False, default='pendiente')
+    total = db.Column(db.Integer, nullable=False, default=0)
+    procesados = db.Column(db.Integer, nullable=False, default=0)
+    mensaje = db.Column(db.Text)
+    creado = db.Column(db.DateTime, default=datetime.utcnow)
+    actualizado = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    gestion_id = db.Column(db.Integer, db.ForeignKey('gestion.id', ondelete='SET NULL'))
@@ -1,6 +1,21 @@
 from .Docente_Model import Docente
 from .Materia_Model import Materia
 from .DocenteMateria_Model import DocenteMateria
-from .Materia_Model import Materia
 from .MateriaCurso_Model import MateriaCurso
 from .Curso_Model import Curso
+from .Estudiante_Model import Estudiante
+from .Gestion_Model import Gestion
+from .Inscripcion_Model import Inscripcion
+from .EvaluacionIntegral_Model import EvaluacionIntegral
+from .TipoEvaluacion_Model import TipoEvaluacion
+from .Evaluacion_Model import Evaluacion
+from .NotaFinal_Model import NotaFinal
+from .NotaEstimada_Model import NotaEstimada
+from .AcumuladoEvaluacion_Model import AcumuladoEvaluacion
+from .Trabajo_Model import Trabajo
+from .Roster_Model import Roster
+from .ResumenMateria_Model import ResumenMateria
+from .ResumenNotaFinal_Model import ResumenNotaFinal
+from .ResumenAsistencia_Model import ResumenAsistencia
+from .ResumenPendiente_Model import ResumenPendiente
+from .ResumenVersion_Model import ResumenVersion
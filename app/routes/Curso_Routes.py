@@ -8,18 +8,19 @@ from app import db
 from flask_jwt_extended import jwt_required
 from flask_restx import Namespace, Resource
 from ..api_model.Curso import ns, curso_model_request, curso_model_response
+from ..api_model.parsers import listado_parser, listar_paginado
 
 curso_schema = CursoSchema()
 cursos_schema = CursoSchema(many=True)
 
 @ns.route('/')
 class CursoList(Resource):
-    @ns.marshal_list_with(curso_model_response)
+    @ns.expect(listado_parser)
+    @ns.response(200, 'Success', [curso_model_response])
     @jwt_required()
     def get(self):
         """Lista todos los cursos"""
-        cursos = Curso.query.all()
-        return cursos_schema.dump(cursos)
+        return listar_paginado(Curso, curso_model_response)
 
     @ns.expect(curso_model_request)
     @ns.marshal_with(curso_model_response, code=201)
@@ -5,18 +5,20 @@ from app import db
 from flask_jwt_extended import jwt_required
 from flask_restx import Namespace, Resource
 from ..api_model.DocenteMateria import ns, docente_materia_model_request, docente_materia_mode_response
+from ..api_model.parsers import listado_parser, listar_paginado
+from ..Services.RosterService import RosterService
 
 docente_materia_schema = DocenteMateriaSchema()
 docentes_materias_schema = DocenteMateriaSchema(many=True)
 
 @ns.route('/')
 class DocenteMateriaList(Resource):
-    @ns.marshal_list_with(docente_materia_mode_response)
+    @ns.expect(listado_parser)
+    @ns.response(200, 'Success', [docente_materia_mode_response])
     @jwt_required()
     def get(self):
         """Lista todas las asignaciones de docente a materia"""
-        items = DocenteMateria.query.all()
-        return docentes_materias_schema.dump(items)
+        return listar_paginado(DocenteMateria, docente_materia_mode_response)
 
     @ns.expect(docente_materia_model_request)
     @ns.marshal_with(docente_materia_mode_response, code=201)
@@ -28,6 +30,8 @@ class DocenteMateriaList(Resource):
 
         try:
             db.session.add(nueva_asignacion)
+            db.session.flush()
+            RosterService.refrescar(materia_ids=[nueva_asignacion.materia_id])
             db.session.commit()
             return docente_materia_schema.dump(nueva_asignacion), 201
         except Exception as e:
@@ -51,12 +55,15 @@ class DocenteMateriaResource(Resource):
         """Actualizar una asignación por ID"""
         asignacion = DocenteMateria.query.get_or_404(id)
         data = request.json
+        materia_anterior = asignacion.materia_id
 
         for key, value in data.items():
             if hasattr(asignacion, key):
                 setattr(asignacion, key, value)
 
         try:
+            db.session.flush()
+            RosterService.refrescar(materia_ids={materia_anterior, asignacion.materia_id} - {None})
             db.session.commit()
             return docente_materia_schema.dump(asignacion)
         except Exception as e:
@@ -68,7 +75,10 @@ class DocenteMateriaResource(Resource):
         """Eliminar una asignación por ID"""
         asignacion = DocenteMateria.query.get_or_404(id)
         try:
+            materia_id = asignacion.materia_id
             db.session.delete(asignacion)
+            db.session.flush()
+            RosterService.refrescar(materia_ids=[materia_id])
             db.session.commit()
             return {"message": "Asignación eliminada correctamente"}, 200
         except Exception as e:
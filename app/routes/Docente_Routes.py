@@ -4,12 +4,15 @@ from ..models.MateriaCurso_Model import MateriaCurso
 from ..models.Materia_Model import Materia
 from ..models.Curso_Model import Curso
 from ..models.Estudiante_Model import Estudiante
-from ..models.Evaluacion_Model import Evaluacion
 from ..models.Gestion_Model import Gestion
-from ..models.NotaFinal_Model import NotaFinal
-from ..models.Inscripcion_Model import Inscripcion
 from ..schemas.Docente_schema import  DocenteSchema
 from ..schemas.Materia_schema import MateriaSchema
+from ..Services.BusquedaNombreService import BusquedaNombreService
+from ..Services.AnaliticaService import AnaliticaService
+from ..Services.RankingEstudiantesService import RankingEstudiantesService
+from ..Services.EstadisticaAsistenciaService import EstadisticaAsistenciaService, NOTA_MAXIMA_ASISTENCIA
+from ..Services.DashboardDocenteService import DashboardDocenteService
+from ..Services.SerializacionService import SerializacionService
 from flask import request 
 from app import db
 from werkzeug.security import generate_password_hash
@@ -17,6 +20,7 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 from flask_restx import Namespace, Resource
 from ..api_model.Docente import ns, docente_model_request, docente_model_response
 from ..api_model.Materia import materia_model_response
+from ..api_model.parsers import listado_parser, listar_paginado, busqueda_parser
 from datetime import datetime
 
 
@@ -28,12 +32,12 @@ materias_schema = MateriaSchema(many=True)
 
 @ns.route('/')
 class DocenteList(Resource):
-    @ns.marshal_with(docente_model_response)
+    @ns.expect(listado_parser)
+    @ns.response(200, 'Success', [docente_model_response])
     @jwt_required()
     def get(self):
         """Lista todos los docentes"""
-        docentes = Docente.query.all()
-        return docentes_schema.dump(docentes)
+        return listar_paginado(Docente, docente_model_response)
 
     @ns.marshal_with(docente_model_response)
     @ns.expect(docente_model_request)
@@ -52,6 +56,7 @@ class DocenteList(Resource):
         try:
             db.session.add(nuevo_docente)
             db.session.commit()
+            BusquedaNombreService.invalidar(Docente)
             return docente_schema.dump(nuevo_docente), 201
         except Exception as e:
             db.session.rollback()
@@ -85,6 +90,7 @@ class DocenteResource(Resource):
 
         try:
             db.session.commit()
+            BusquedaNombreService.invalidar(Docente)
             return docente_schema.dump(docente)
         except Exception as e:
             db.session.rollback()
@@ -99,6 +105,7 @@ class DocenteResource(Resource):
         try:
             db.session.delete(docente)
             db.session.commit()
+            BusquedaNombreService.invalidar(Docente)
             return {"message": "Docente eliminado correctamente"}, 200
         except Exception as e:
             db.session.rollback()
@@ -109,10 +116,14 @@ class DocenteResource(Resource):
 @ns.param('nombreCompleto', 'Nombre a buscar')
 class DocenteBuscar(Resource):
     @jwt_required()
+    @ns.expect(busqueda_parser)
     @ns.marshal_list_with(docente_model_response)
     def get(self, nombreCompleto):
-        """Buscar docente por nombre"""
-        docentes = Docente.query.filter(Docente.nombreCompleto.ilike(f"%{nombreCompleto}%")).all()
+        """Buscar docente por nombre (prefijo, sin tildes, tolerante a errores; ordenado por relevancia)"""
+        args = busqueda_parser.parse_args()
+        docentes = BusquedaNombreService.buscar(
+            Docente, Docente.nombreCompleto, nombreCompleto, args['limit']
+        )
         if not docentes:
             ns.abort(404, f"No se encontraron docente con nombre '{nombreCompleto}'")
         return docentes_schema.dump(docentes)
@@ -225,14 +236,10 @@ class AsistenciaGlobal(Resource):
                 gestion = Gestion.query.get(gestion_id)
                 if not gestion:
                     ns.abort(404, 'Gestión no encontrada')
-              # Obtener todas las evaluaciones de asistencia final para la gestión
-            # Usando tipo_evaluacion_id = 2 para "Asistencia-Final" que contiene las notas finales
-            evaluaciones_asistencia_final = Evaluacion.query.filter_by(
-                gestion_id=gestion_id,
-                tipo_evaluacion_id=2  # ID para Asistencia-Final
-            ).all()
+            # Totales, promedios por estudiante y categorías de la asistencia final de la gestión
+            estadisticas = EstadisticaAsistenciaService.global_gestion(gestion_id)
             
-            if not evaluaciones_asistencia_final:
+            if not estadisticas:
                 return {
                     'mensaje': f'No se encontraron registros de asistencia final para la gestión {gestion.anio} - {gestion.periodo}',
                     'gestion': {
@@ -249,46 +256,24 @@ class AsistenciaGlobal(Resource):
                 }, 200
             
             # Calcular estadísticas de asistencia usando regla de tres
-            total_evaluaciones = len(evaluaciones_asistencia_final)
-            suma_notas_actual = sum(eval.nota for eval in evaluaciones_asistencia_final)
-            
-            # Obtener estudiantes únicos
-            estudiantes_unicos = set(eval.estudiante_ci for eval in evaluaciones_asistencia_final)
-            total_estudiantes = len(estudiantes_unicos)
+            total_evaluaciones = estadisticas['total_evaluaciones']
+            suma_notas_actual = estadisticas['suma']
+            total_estudiantes = estadisticas['total_estudiantes']
             
             # Calcular la asistencia máxima teórica (asumiendo nota máxima de 15 por estudiante)
             # Regla de tres: Si cada estudiante puede tener máximo 15 de asistencia
-            asistencia_maxima_teorica = total_estudiantes * 15
+            asistencia_maxima_teorica = total_estudiantes * NOTA_MAXIMA_ASISTENCIA
             
             # Calcular porcentaje usando regla de tres
             # Si asistencia_maxima_teorica = 100%, entonces suma_notas_actual = X%
             porcentaje_asistencia = round((suma_notas_actual / asistencia_maxima_teorica) * 100, 2) if asistencia_maxima_teorica > 0 else 0
             
             # Calcular promedio general de notas
-            promedio_general = suma_notas_actual / total_evaluaciones if total_evaluaciones > 0 else 0
-            
-            # Calcular promedio por estudiante para categorización
-            promedios_por_estudiante = {}
-            for eval in evaluaciones_asistencia_final:
-                if eval.estudiante_ci not in promedios_por_estudiante:
-                    promedios_por_estudiante[eval.estudiante_ci] = []
-                promedios_por_estudiante[eval.estudiante_ci].append(eval.nota)            
-            # Categorizar estudiantes por nivel de asistencia (escala de 15)
-            estudiantes_excelente = 0  # >= 13.5 (90% de 15)
-            estudiantes_buena = 0      # 10.5-13.4 (70-89% de 15)
-            estudiantes_regular = 0    # 7.5-10.4 (50-69% de 15)
-            estudiantes_deficiente = 0 # < 7.5 (< 50% de 15)
+            promedio_general = estadisticas['promedio']
             
-            for ci, notas in promedios_por_estudiante.items():
-                promedio_estudiante = sum(notas) / len(notas)
-                if promedio_estudiante >= 13.5:  # 90% de 15
-                    estudiantes_excelente += 1
-                elif promedio_estudiante >= 10.5:  # 70% de 15
-                    estudiantes_buena += 1
-                elif promedio_estudiante >= 7.5:   # 50% de 15
-                    estudiantes_regular += 1
-                else:
-                    estudiantes_deficiente += 1
+            # Estudiantes por nivel de asistencia según su promedio (escala de 15):
+            # excelente >= 13.5 (90%), buena >= 10.5 (70%), regular >= 7.5 (50%), deficiente < 7.5
+            distribucion = estadisticas['distribucion']
             
             return {
                 'gestion': {
@@ -306,12 +291,12 @@ class AsistenciaGlobal(Resource):
                     'total_evaluaciones_asistencia_final': total_evaluaciones,
                     'total_estudiantes_evaluados': total_estudiantes,
                     'promedio_general_notas': round(promedio_general, 2),
-                    'nota_maxima_por_estudiante': 15,
+                    'nota_maxima_por_estudiante': NOTA_MAXIMA_ASISTENCIA,
                     'distribucion_asistencia': {
-                        'excelente_90_100': estudiantes_excelente,
-                        'buena_70_89': estudiantes_buena,
-                        'regular_50_69': estudiantes_regular,
-                        'deficiente_0_49': estudiantes_deficiente
+                        'excelente_90_100': distribucion['excelente'],
+                        'buena_70_89': distribucion['buena'],
+                        'regular_50_69': distribucion['regular'],
+                        'deficiente_0_49': distribucion['deficiente']
                     }
                 },
                 'mensaje': f'Estadísticas de asistencia final calculadas para {total_estudiantes} estudiantes usando regla de tres'
@@ -339,15 +324,15 @@ class EvaluacionesContadas(Resource):
             anio = request.args.get('anio', type=int)
             periodo = request.args.get('periodo', type=str)
             
-            # Construir consulta base
-            query = Evaluacion.query
+            # Gestiones a contar (None: todas)
+            gestion_ids = None
             
             # Si se proporciona gestion_id específico, usarlo directamente
             if gestion_id:
                 gestion = Gestion.query.get(gestion_id)
                 if not gestion:
                     ns.abort(404, 'Gestión no encontrada')
-                query = query.filter_by(gestion_id=gestion_id)
+                gestion_ids = [gestion_id]
             
             # Si se proporcionan año y/o período, filtrar por gestiones que coincidan
             elif anio or periodo:
@@ -385,12 +370,11 @@ class EvaluacionesContadas(Resource):
                 
                 # Filtrar evaluaciones por las gestiones encontradas
                 gestion_ids = [g.id for g in gestiones_filtradas]
-                query = query.filter(Evaluacion.gestion_id.in_(gestion_ids))
             
-            # Obtener todas las evaluaciones filtradas
-            evaluaciones = query.all()
+            # Conteos agrupados en la base (GROUP BY gestión y tipo) en vez de cargar las evaluaciones
+            filas, totales = AnaliticaService.conteos_evaluaciones(gestion_ids)
             
-            if not evaluaciones:
+            if not totales.evaluaciones:
                 return {
                     'mensaje': 'No se encontraron evaluaciones para los criterios especificados',
                     'filtros_aplicados': {
@@ -401,53 +385,35 @@ class EvaluacionesContadas(Resource):
                     'total_evaluaciones': 0
                 }, 200
             
-            # Agrupar conteos por gestión
+            # Agrupar conteos por gestión (en el orden en que aparecen sus evaluaciones)
             conteos_por_gestion = {}
-            total_evaluaciones = len(evaluaciones)
+            total_evaluaciones = totales.evaluaciones
             
-            for evaluacion in evaluaciones:
-                gestion = Gestion.query.get(evaluacion.gestion_id)
-                if gestion:
-                    gestion_key = f"{gestion.anio}_{gestion.periodo}"
-                    
-                    if gestion_key not in conteos_por_gestion:
-                        conteos_por_gestion[gestion_key] = {
-                            'gestion_info': {
-                                'id': gestion.id,
-                                'anio': gestion.anio,
-                                'periodo': gestion.periodo
-                            },
-                            'total_evaluaciones': 0,
-                            'evaluaciones_por_tipo': {},
-                            'estudiantes_evaluados': set(),
-                            'materias_evaluadas': set()
-                        }
-                    
-                    conteos_por_gestion[gestion_key]['total_evaluaciones'] += 1
-                    conteos_por_gestion[gestion_key]['estudiantes_evaluados'].add(evaluacion.estudiante_ci)
-                    conteos_por_gestion[gestion_key]['materias_evaluadas'].add(evaluacion.materia_id)
-                    
-                    # Contar por tipo de evaluación
-                    tipo_eval_id = evaluacion.tipo_evaluacion_id
-                    if tipo_eval_id not in conteos_por_gestion[gestion_key]['evaluaciones_por_tipo']:
-                        conteos_por_gestion[gestion_key]['evaluaciones_por_tipo'][tipo_eval_id] = 0
-                    conteos_por_gestion[gestion_key]['evaluaciones_por_tipo'][tipo_eval_id] += 1
-            
-            # Convertir sets a conteos
-            for gestion_key in conteos_por_gestion:
-                conteos_por_gestion[gestion_key]['total_estudiantes_evaluados'] = len(
-                    conteos_por_gestion[gestion_key]['estudiantes_evaluados']
-                )
-                conteos_por_gestion[gestion_key]['total_materias_evaluadas'] = len(
-                    conteos_por_gestion[gestion_key]['materias_evaluadas']
-                )
-                # Remover los sets para la serialización JSON
-                del conteos_por_gestion[gestion_key]['estudiantes_evaluados']
-                del conteos_por_gestion[gestion_key]['materias_evaluadas']
+            for fila in filas:
+                gestion_key = f"{fila.anio}_{fila.periodo}"
+                
+                if gestion_key not in conteos_por_gestion:
+                    conteos_por_gestion[gestion_key] = {
+                        'gestion_info': {
+                            'id': fila.gestion_id,
+                            'anio': fila.anio,
+                            'periodo': fila.periodo
+                        },
+                        'total_evaluaciones': 0,
+                        'evaluaciones_por_tipo': {},
+                        'total_estudiantes_evaluados': fila.estudiantes,
+                        'total_materias_evaluadas': fila.materias
+                    }
+                
+                conteos_por_gestion[gestion_key]['total_evaluaciones'] += fila.cantidad
+                
+                # Contar por tipo de evaluación
+                por_tipo = conteos_por_gestion[gestion_key]['evaluaciones_por_tipo']
+                por_tipo[fila.tipo_evaluacion_id] = por_tipo.get(fila.tipo_evaluacion_id, 0) + fila.cantidad
             
             # Calcular estadísticas generales
-            total_estudiantes_unicos = len(set(eval.estudiante_ci for eval in evaluaciones))
-            total_materias_unicas = len(set(eval.materia_id for eval in evaluaciones))
+            total_estudiantes_unicos = totales.estudiantes
+            total_materias_unicas = totales.materias
             
             # Información de gestiones incluidas
             gestiones_incluidas = []
@@ -461,7 +427,7 @@ class EvaluacionesContadas(Resource):
                 ]
             else:
                 # Todas las gestiones que tienen evaluaciones
-                gestiones_con_eval = set(eval.gestion_id for eval in evaluaciones)
+                gestiones_con_eval = set(fila.gestion_id for fila in filas)
                 gestiones_incluidas = [
                     {'id': g.id, 'anio': g.anio, 'periodo': g.periodo}
                     for g in Gestion.query.filter(Gestion.id.in_(gestiones_con_eval)).all()
@@ -489,6 +455,17 @@ class EvaluacionesContadas(Resource):
 
 # ========== ENDPOINTS PARA DASHBOARD DEL DOCENTE ==========
 
+def obtener_gestion():
+    """Gestión del parámetro gestion_id (404 si no existe) o la última registrada (None si no hay)"""
+    gestion_id = request.args.get('gestion_id', type=int)
+    if not gestion_id:
+        return Gestion.query.order_by(Gestion.anio.desc(), Gestion.id.desc()).first()
+    gestion = Gestion.query.get(gestion_id)
+    if not gestion:
+        ns.abort(404, 'Gestión no encontrada')
+    return gestion
+
+
 @ns.route('/dashboard/docente/<int:ci>/estudiantes-por-curso')
 @ns.param('ci', 'CI del docente')
 class EstudiantesPorCurso(Resource):
@@ -503,94 +480,10 @@ class EstudiantesPorCurso(Resource):
             docente = Docente.query.get_or_404(ci)
 
             # Obtener parámetro de año (defaultea al año actual)
-            from datetime import datetime
             year = request.args.get('year', default=datetime.now().year, type=int)
 
-            # Obtener las materias asignadas al docente
-            docente_materias = DocenteMateria.query.filter_by(docente_ci=ci).all()
-
-            if not docente_materias:
-                return {
-                    'mensaje': 'El docente no tiene materias asignadas',
-                    'docente': {
-                        'ci': docente.ci,
-                        'nombre_completo': docente.nombreCompleto
-                    },
-                    'year_filtrado': year,
-                    'cursos': [],
-                    'total_estudiantes': 0
-                }, 200
-
-            # Obtener cursos y contar estudiantes filtrado por año de inscripción
-            cursos_estudiantes = {}
-            total_estudiantes_general = 0
-
-            for dm in docente_materias:
-                # Obtener materias-cursos donde esté asignada esta materia
-                materias_curso = MateriaCurso.query.filter_by(materia_id=dm.materia_id).all()
-
-                for mc in materias_curso:
-                    curso = mc.curso
-                    if not curso:
-                        continue
-
-                    # Contar estudiantes inscritos en este curso FILTRADO POR AÑO
-                    from ..models.Inscripcion_Model import Inscripcion
-                    total_estudiantes_curso = Inscripcion.query.filter(
-                        Inscripcion.curso_id == curso.id,
-                        db.extract('year', Inscripcion.fecha) == year
-                    ).count()
-
-                    curso_key = f"{curso.id}_{curso.nombre}"
-                    
-                    if curso_key not in cursos_estudiantes:
-                        cursos_estudiantes[curso_key] = {
-                            'curso_info': {
-                                'id': curso.id,
-                                'nombre': curso.nombre,
-                                'paralelo': curso.Paralelo,
-                                'nivel': curso.Nivel
-                            },
-                            'total_estudiantes': total_estudiantes_curso,
-                            'materias_docente': []
-                        }
-
-                    # Agregar materia a la lista si no está ya
-                    materia_info = {
-                        'id': dm.materia.id,
-                        'nombre': dm.materia.nombre
-                    }
-
-                    if materia_info not in cursos_estudiantes[curso_key]['materias_docente']:
-                        cursos_estudiantes[curso_key]['materias_docente'].append(materia_info)
-
-            # Calcular total general (sin duplicados) filtrado por año
-            cursos_unicos = set()
-            for data in cursos_estudiantes.values():
-                cursos_unicos.add(data['curso_info']['id'])
-
-            total_estudiantes_general = sum(
-                Inscripcion.query.filter(
-                    Inscripcion.curso_id == curso_id,
-                    db.extract('year', Inscripcion.fecha) == year
-                ).count()
-                for curso_id in cursos_unicos
-            )
-
-            return {
-                'docente': {
-                    'ci': docente.ci,
-                    'nombre_completo': docente.nombreCompleto
-                },
-                'year_filtrado': year,
-                'cursos': list(cursos_estudiantes.values()),
-                'resumen': {
-                    'total_cursos': len(cursos_estudiantes),
-                    'total_estudiantes': total_estudiantes_general,
-                    'total_materias_asignadas': len(docente_materias)
-                },
-                'mensaje': f'Información de estudiantes por curso para el docente {docente.nombreCompleto} - Año {year}'
-            }, 200
+            alcance = DashboardDocenteService.alcance(docente)
+            return DashboardDocenteService.estudiantes_por_curso(alcance, year), 200
         except Exception as e:
             ns.abort(500, f'Error interno del servidor: {str(e)}')
 
@@ -607,93 +500,10 @@ class AsistenciaPromedio(Resource):
         try:
             # Verificar que el docente existe
             docente = Docente.query.get_or_404(ci)
-            
-            # Obtener gestión
-            gestion_id = request.args.get('gestion_id', type=int)
-            if not gestion_id:
-                gestion = Gestion.query.order_by(Gestion.anio.desc(), Gestion.id.desc()).first()
-                if not gestion:
-                    return {
-                        'mensaje': 'No se encontraron gestiones registradas',
-                        'asistencia_promedio': {},
-                        'promedio_general': 0
-                    }, 200
-                gestion_id = gestion.id
-            else:
-                gestion = Gestion.query.get(gestion_id)
-                if not gestion:
-                    ns.abort(404, 'Gestión no encontrada')
-            
-            # Obtener las materias asignadas al docente
-            docente_materias = DocenteMateria.query.filter_by(docente_ci=ci).all()
-            
-            if not docente_materias:                return {
-                    'mensaje': 'El docente no tiene materias asignadas',
-                    'docente': {
-                        'ci': docente.ci,
-                        'nombre_completo': docente.nombreCompleto
-                    },
-                    'asistencia_promedio': {},
-                    'promedio_general': 0
-                }, 200
-            
-            asistencia_por_materia = {}
-            suma_promedios = 0
-            materias_con_datos = 0
-            
-            for dm in docente_materias:
-                materia = dm.materia
-                
-                # Obtener todas las evaluaciones de asistencia final (tipo 2) para esta materia y gestión
-                evaluaciones_asistencia = Evaluacion.query.filter_by(
-                    materia_id=materia.id,
-                    gestion_id=gestion_id,
-                    tipo_evaluacion_id=2  # Asistencia-Final
-                ).all()
-                
-                if evaluaciones_asistencia:
-                    # Calcular promedio de asistencia para esta materia
-                    suma_notas = sum(eval.nota for eval in evaluaciones_asistencia)
-                    promedio_materia = suma_notas / len(evaluaciones_asistencia)
-                    
-                    # Convertir a porcentaje (escala de 15 a 100%)
-                    porcentaje_asistencia = round((promedio_materia / 15) * 100, 2)
-                    
-                    asistencia_por_materia[f"materia_{materia.id}"] = {
-                        'materia_info': {
-                            'id': materia.id,
-                            'nombre': materia.nombre
-                        },
-                        'promedio_asistencia_nota': round(promedio_materia, 2),
-                        'porcentaje_asistencia': porcentaje_asistencia,
-                        'total_evaluaciones': len(evaluaciones_asistencia),
-                        'total_estudiantes_evaluados': len(set(eval.estudiante_ci for eval in evaluaciones_asistencia))
-                    }
-                    
-                    suma_promedios += porcentaje_asistencia
-                    materias_con_datos += 1
-            
-            # Calcular promedio general
-            promedio_general = round(suma_promedios / materias_con_datos, 2) if materias_con_datos > 0 else 0
-            return {
-                'docente': {
-                    'ci': docente.ci,
-                    'nombre_completo': docente.nombreCompleto
-                },
-                'gestion': {
-                    'id': gestion.id,
-                    'anio': gestion.anio,
-                    'periodo': gestion.periodo
-                },
-                'asistencia_por_materia': asistencia_por_materia,
-                'resumen': {
-                    'promedio_general_asistencia': promedio_general,
-                    'total_materias_con_datos': materias_con_datos,
-                    'total_materias_asignadas': len(docente_materias)
-                },
-                'mensaje': f'Promedio de asistencia calculado para {materias_con_datos} materias del docente'
-            }, 200
-            
+            gestion = obtener_gestion()
+
+            alcance = DashboardDocenteService.alcance(docente)
+            return DashboardDocenteService.asistencia_promedio(alcance, gestion), 200
         except Exception as e:
             ns.abort(500, f'Error interno del servidor: {str(e)}')
 
@@ -710,129 +520,32 @@ class NotasPromedio(Resource):
         try:
             # Verificar que el docente existe
             docente = Docente.query.get_or_404(ci)
-            
-            # Obtener gestión
-            gestion_id = request.args.get('gestion_id', type=int)
-            if not gestion_id:
-                gestion = Gestion.query.order_by(Gestion.anio.desc(), Gestion.id.desc()).first()
-                if not gestion:
-                    return {
-                        'mensaje': 'No se encontraron gestiones registradas',
-                        'notas_promedio': {},
-                        'promedio_general': 0
-                    }, 200
-                gestion_id = gestion.id
-            else:
-                gestion = Gestion.query.get(gestion_id)
-                if not gestion:
-                    ns.abort(404, 'Gestión no encontrada')
-            
-            # Obtener las materias asignadas al docente
-            docente_materias = DocenteMateria.query.filter_by(docente_ci=ci).all()
-            
-            if not docente_materias:                return {
-                    'mensaje': 'El docente no tiene materias asignadas',
-                    'docente': {
-                        'ci': docente.ci,
-                        'nombre_completo': docente.nombreCompleto
-                    },
-                    'notas_promedio': {},
-                    'promedio_general': 0
-                }, 200
-            
-            from ..models.NotaFinal_Model import NotaFinal
-            
-            notas_por_materia = {}
-            suma_promedios = 0
-            materias_con_datos = 0
-            
-            for dm in docente_materias:
-                materia = dm.materia
-                
-                # Obtener todas las notas finales para esta materia y gestión
-                notas_finales = NotaFinal.query.filter_by(
-                    materia_id=materia.id,
-                    gestion_id=gestion_id
-                ).all()
-                
-                if notas_finales:
-                    # Calcular promedio de notas para esta materia
-                    suma_notas = sum(nota.valor for nota in notas_finales)
-                    promedio_materia = suma_notas / len(notas_finales)
-                    
-                    # Categorizar el promedio
-                    if promedio_materia >= 61:
-                        categoria = "Excelente"
-                    elif promedio_materia >= 51:
-                        categoria = "Bueno"
-                    elif promedio_materia >= 36:
-                        categoria = "Regular"
-                    else:
-                        categoria = "Deficiente"
-                    
-                    notas_por_materia[f"materia_{materia.id}"] = {
-                        'materia_info': {
-                            'id': materia.id,
-                            'nombre': materia.nombre
-                        },
-                        'promedio_notas': round(promedio_materia, 2),
-                        'categoria': categoria,
-                        'total_estudiantes': len(notas_finales),
-                        'distribucion_notas': {
-                            'aprobados': len([n for n in notas_finales if n.valor >= 51]),
-                            'reprobados': len([n for n in notas_finales if n.valor < 51]),
-                            'nota_maxima': max(nota.valor for nota in notas_finales),
-                            'nota_minima': min(nota.valor for nota in notas_finales)
-                        }
-                    }
-                    
-                    suma_promedios += promedio_materia
-                    materias_con_datos += 1
-            
-            # Calcular promedio general
-            promedio_general = round(suma_promedios / materias_con_datos, 2) if materias_con_datos > 0 else 0
-            
-            # Categorizar promedio general
-            if promedio_general >= 61:
-                categoria_general = "Excelente"
-            elif promedio_general >= 51:
-                categoria_general = "Bueno"
-            elif promedio_general >= 36:
-                categoria_general = "Regular"
-            else:
-                categoria_general = "Deficiente"
-            return {
-                'docente': {
-                    'ci': docente.ci,
-                    'nombre_completo': docente.nombreCompleto
-                },
-                'gestion': {
-                    'id': gestion.id,
-                    'anio': gestion.anio,
-                    'periodo': gestion.periodo
-                },
-                'notas_por_materia': notas_por_materia,
-                'resumen': {
-                    'promedio_general': promedio_general,
-                    'categoria_general': categoria_general,
-                    'total_materias_con_datos': materias_con_datos,
-                    'total_materias_asignadas': len(docente_materias)
-                },
-                'mensaje': f'Promedio de notas calculado para {materias_con_datos} materias del docente'
-            }, 200
-            
+            gestion = obtener_gestion()
+
+            alcance = DashboardDocenteService.alcance(docente)
+            return DashboardDocenteService.notas_promedio(alcance, gestion), 200
         except Exception as e:
             ns.abort(500, f'Error interno del servidor: {str(e)}')
 
 
+def obtener_k():
+    """Parámetro k (mejores y peores por materia) validado"""
+    k = request.args.get('k', default=RankingEstudiantesService.K_POR_DEFECTO, type=int)
+    if k < 1 or k > RankingEstudiantesService.K_MAXIMO:
+        ns.abort(400, f'k debe estar entre 1 y {RankingEstudiantesService.K_MAXIMO}')
+    return k
+
+
 @ns.route('/dashboard/docente/<string:ci>/mejores-peores-estudiantes')
 class MejoresPeoresEstudiantes(Resource):
     @jwt_required()
     @ns.doc(params={
-        'year': 'Año para filtrar (opcional, por defecto año actual)'
+        'year': 'Año para filtrar (opcional, por defecto año actual)',
+        'k': 'Cantidad de mejores y peores estudiantes por materia (opcional, 3 por defecto)'
     })
     def get(self, ci):
-        """Obtener top 3 mejores y peores estudiantes por materia que enseña el docente"""
+        """Obtener los k mejores y peores estudiantes por materia que enseña el docente"""
+        k = obtener_k()
         try:
             # Verificar que el docente existe
             docente = Docente.query.filter_by(ci=ci).first()
@@ -842,130 +555,78 @@ class MejoresPeoresEstudiantes(Resource):
             # Obtener el año para filtrar
             year = request.args.get('year', type=int)
             if not year:
-                year = datetime.now().year            # Obtener todas las materias asignadas al docente 
-            docente_materias = DocenteMateria.query.filter_by(docente_ci=docente.ci).all()
-            
-            if not docente_materias:
-                return {
-                    'mensaje': 'El docente no tiene materias asignadas',
-                    'docente': {
-                        'ci': docente.ci,
-                        'nombre_completo': docente.nombreCompleto
-                    },
-                    'year': year,
-                    'materias_con_estudiantes': {}
-                }, 200
+                year = datetime.now().year
             
-            # Obtener gestiones del año especificado
-            gestiones = Gestion.query.filter_by(anio=year).all()
+            alcance = DashboardDocenteService.alcance(docente)
+            return DashboardDocenteService.mejores_peores(alcance, year, k), 200
             
-            if not gestiones:
-                return {
-                    'mensaje': f'No se encontraron gestiones para el año {year}',
-                    'docente': {
-                        'ci': docente.ci,
-                        'nombre_completo': docente.nombreCompleto
-                    },
-                    'year': year,
-                    'materias_con_estudiantes': {}
-                }, 200            
-            materias_resultados = {}
-            gestion_ids = [g.id for g in gestiones]
+        except Exception as e:
+            ns.abort(500, f'Error interno del servidor: {str(e)}')
+
+
+@ns.route('/dashboard/docente/<int:ci>/snapshot')
+@ns.param('ci', 'CI del docente')
+class SnapshotDashboardDocente(Resource):
+    @jwt_required()
+    @ns.doc(params={
+        'year': 'Año de inscripción y del ranking (opcional, año actual por defecto)',
+        'gestion_id': 'ID de la gestión para asistencia y notas (opcional, última gestión por defecto)',
+        'k': 'Cantidad de mejores y peores estudiantes por materia (opcional, 3 por defecto)'
+    })
+    def get(self, ci):
+        """
+        Dashboard completo del docente en una respuesta: estudiantes por curso, asistencia
+        promedio, notas promedio y mejores/peores estudiantes (cada bloque igual al de su
+        endpoint). Responde con ETag; con If-None-Match vigente devuelve 304 sin cuerpo.
+        """
+        k = obtener_k()
+        docente = Docente.query.get_or_404(ci)
+        year = request.args.get('year', default=datetime.now().year, type=int)
+        gestion = obtener_gestion()
+        try:
+            alcance = DashboardDocenteService.alcance(docente)
+            respuesta = SerializacionService.respuesta_json(
+                DashboardDocenteService.snapshot(alcance, year, gestion, k),
+                cabeceras={'Cache-Control': 'private, no-cache'}
+            )
+            respuesta.add_etag()
+            return respuesta.make_conditional(request)
+        except Exception as e:
+            ns.abort(500, f'Error interno del servidor: {str(e)}')
+
+
+@ns.route('/dashboard/admin/mejores-peores-estudiantes')
+class MejoresPeoresEstudiantesInstitucion(Resource):
+    @jwt_required()
+    @ns.doc(params={
+        'year': 'Año para filtrar (opcional, por defecto año actual)',
+        'k': 'Cantidad de mejores y peores estudiantes por materia (opcional, 3 por defecto)'
+    })
+    def get(self):
+        """Los k mejores y peores estudiantes de cada materia de la institución"""
+        # Verificar que el usuario sea administrador
+        verificar_admin()
+        k = obtener_k()
+        
+        try:
+            year = request.args.get('year', type=int) or datetime.now().year
+            gestion_ids = [g.id for g in Gestion.query.filter_by(anio=year).all()]
             
-            for docente_materia in docente_materias:
-                materia = Materia.query.get(docente_materia.materia_id)
-                if not materia:
-                    continue
-                
-                # Obtener notas finales de estudiantes para esta materia en las gestiones del año especificado
-                notas_estudiantes = db.session.query(
-                    NotaFinal,
-                    Estudiante
-                ).join(
-                    Estudiante,
-                    NotaFinal.estudiante_ci == Estudiante.ci
-                ).filter(
-                    NotaFinal.materia_id == materia.id,
-                    NotaFinal.gestion_id.in_(gestion_ids)
-                ).all()
-                
-                if not notas_estudiantes:
-                    materias_resultados[f"materia_{materia.id}"] = {
-                        'materia_info': {
-                            'id': materia.id,
-                            'nombre': materia.nombre
-                        },
-                        'mensaje': 'No hay notas registradas para esta materia',
-                        'mejores_estudiantes': [],
-                        'peores_estudiantes': [],
-                        'total_estudiantes': 0
-                    }
-                    continue
-                
-                # Crear lista de estudiantes con sus notas
-                estudiantes_notas = []
-                for nota_final, estudiante in notas_estudiantes:
-                    estudiante_data = {
-                        'estudiante_id': estudiante.id,
-                        'ci': estudiante.ci,
-                        'nombre_completo': estudiante.nombreCompleto,
-                        'nota_final': nota_final.valor,
-                        'estado': 'Aprobado' if nota_final.valor >= 51 else 'Reprobado'
-                    }
-                    estudiantes_notas.append(estudiante_data)
-                
-                # Ordenar por nota (mayor a menor)
-                estudiantes_ordenados = sorted(
-                    estudiantes_notas, 
-                    key=lambda x: x['nota_final'], 
-                    reverse=True
-                )
-                
-                # Top 3 mejores (los primeros 3)
-                mejores_3 = estudiantes_ordenados[:3]
-                
-                # Top 3 peores (los últimos 3, pero ordenados de peor a mejor)
-                peores_3 = estudiantes_ordenados[-3:]
-                peores_3.reverse()  # Para mostrar del peor al menos peor
-                
-                # Calcular estadísticas adicionales
-                notas_valores = [est['nota_final'] for est in estudiantes_notas]
-                promedio_materia = sum(notas_valores) / len(notas_valores)
-                nota_maxima = max(notas_valores)
-                nota_minima = min(notas_valores)
-                aprobados = len([n for n in notas_valores if n >= 51])
-                reprobados = len(notas_valores) - aprobados
-                
-                materias_resultados[f"materia_{materia.id}"] = {
-                    'materia_info': {
-                        'id': materia.id,
-                        'nombre': materia.nombre
-                    },
-                    'mejores_estudiantes': mejores_3,
-                    'peores_estudiantes': peores_3,
-                    'estadisticas': {
-                        'total_estudiantes': len(estudiantes_notas),
-                        'promedio_materia': round(promedio_materia, 2),
-                        'nota_maxima': nota_maxima,
-                        'nota_minima': nota_minima,
-                        'aprobados': aprobados,
-                        'reprobados': reprobados,
-                        'porcentaje_aprobacion': round((aprobados / len(notas_valores)) * 100, 2)
-                    }
-                }
+            ranking = RankingEstudiantesService.por_materia(gestion_ids, None, k)
+            materias = Materia.query.filter(Materia.id.in_(list(ranking))).order_by(Materia.id).all()
             
             return {
-                'docente': {
-                    'ci': docente.ci,
-                    'nombre_completo': docente.nombreCompleto
-                },
                 'year': year,
-                'materias_con_estudiantes': materias_resultados,
+                'k': k,
+                'materias_con_estudiantes': {
+                    f"materia_{materia.id}": DashboardDocenteService.ranking_de_materia(materia, ranking[materia.id])
+                    for materia in materias
+                },
                 'resumen': {
-                    'total_materias_evaluadas': len([m for m in materias_resultados.values() if m.get('estadisticas')]),
-                    'total_materias_asignadas': len(docente_materias)
+                    'total_materias_evaluadas': len(materias),
+                    'total_gestiones': len(gestion_ids)
                 },
-                'mensaje': f'Ranking de estudiantes obtenido para {len(materias_resultados)} materias del docente'
+                'mensaje': f'Ranking de estudiantes obtenido para {len(materias)} materias en {year}'
             }, 200
             
         except Exception as e:
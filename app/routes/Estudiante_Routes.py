@@ -21,21 +21,26 @@ from ..api_model.Estudiante import (ns, estudiante_model_request,
                                    estudiante_model_response,
                                    upload_parser,
                                    estudiante_image_response)
-from ..api_model.parsers import upload_parser, estudiante_parser
+from ..api_model.parsers import upload_parser, estudiante_parser, listado_parser, listar_paginado, busqueda_parser
 import cloudinary.uploader
 from sqlalchemy import func
+from sqlalchemy.orm import joinedload
+from ..Services.BoletinService import BoletinService
+from ..Services.AsignacionDocenteService import AsignacionDocenteService
+from ..Services.BusquedaNombreService import BusquedaNombreService
+from ..Services.RosterService import RosterService
 
 estudiante_schema = EstudianteSchema()
 estudiantes_schema = EstudianteSchema(many=True)
 
 @ns.route('/')
 class EstudianteList(Resource):
-    @ns.marshal_with(estudiante_model_response)
+    @ns.expect(listado_parser)
+    @ns.response(200, 'Success', [estudiante_model_response])
     @jwt_required()
     def get(self):
         """Lista todos los estudiantes"""
-        estudiantes = Estudiante.query.all()
-        return estudiantes_schema.dump(estudiantes)
+        return listar_paginado(Estudiante, estudiante_model_response)
 
     @ns.expect(estudiante_parser)
     @ns.marshal_with(estudiante_model_response)
@@ -73,6 +78,7 @@ class EstudianteList(Resource):
         try:
             db.session.add(nuevo_estudiante)
             db.session.commit()
+            BusquedaNombreService.invalidar(Estudiante)
             return estudiante_schema.dump(nuevo_estudiante), 201
         except Exception as e:
             db.session.rollback()
@@ -109,7 +115,10 @@ class EstudianteResource(Resource):
                 setattr(estudiante, key, value)
 
         try:
+            db.session.flush()
+            RosterService.refrescar(estudiante_cis={ci, estudiante.ci})
             db.session.commit()
+            BusquedaNombreService.invalidar(Estudiante)
             return estudiante_schema.dump(estudiante)
         except Exception as e:
             db.session.rollback()
@@ -121,7 +130,10 @@ class EstudianteResource(Resource):
         estudiante = Estudiante.query.get_or_404(ci)
         try:
             db.session.delete(estudiante)
+            db.session.flush()
+            RosterService.refrescar(estudiante_cis=[ci])
             db.session.commit()
+            BusquedaNombreService.invalidar(Estudiante)
             return {"message": "Estudiante eliminado correctamente"}, 200
         except Exception as e:
             db.session.rollback()
@@ -132,10 +144,14 @@ class EstudianteResource(Resource):
 @ns.param('nombreCompleto', 'Nombre a buscar')
 class EstudianteBuscar(Resource):
     @jwt_required()
+    @ns.expect(busqueda_parser)
     @ns.marshal_list_with(estudiante_model_response)
     def get(self, nombreCompleto):
-        """Buscar estudiante por nombre"""
-        estudiantes = Estudiante.query.filter(Estudiante.nombreCompleto.ilike(f"%{nombreCompleto}%")).all()
+        """Buscar estudiante por nombre (prefijo, sin tildes, tolerante a errores; ordenado por relevancia)"""
+        args = busqueda_parser.parse_args()
+        estudiantes = BusquedaNombreService.buscar(
+            Estudiante, Estudiante.nombreCompleto, nombreCompleto, args['limit']
+        )
         if not estudiantes:
             ns.abort(404, f"No se encontraron estudiantes con nombre '{nombreCompleto}'")
         return estudiantes_schema.dump(estudiantes)
@@ -227,47 +243,16 @@ class EstudiantesFiltrados(Resource):
 
             # Validar parámetros requeridos
             if not all([docente_ci, materia_id, curso_id]):
-                ns.abort(400, 'Faltan parámetros requeridos: docente_ci, materia_id, curso_id')            # Validar que el docente existe
-            docente = Docente.query.filter_by(ci=docente_ci).first()
-            if not docente:
-                ns.abort(404, 'Docente no encontrado')
-
-            # Validar que la materia existe
-            materia = Materia.query.get(materia_id)
-            if not materia:
-                ns.abort(404, 'Materia no encontrada')
-
-            # Validar que el curso existe
-            curso = Curso.query.get(curso_id)
-            if not curso:
-                ns.abort(404, 'Curso no encontrado')
-
-            # Validar que el docente enseña esa materia
-            dm = DocenteMateria.query.filter_by(
-                docente_ci=docente_ci,
-                materia_id=materia_id
-            ).first()
-
-            if not dm:
-                ns.abort(404, 'El docente no enseña esa materia')
-
-            # Verificar que la materia pertenece a ese curso
-            mc = MateriaCurso.query.filter_by(
-                materia_id=materia_id,
-                curso_id=curso_id
-            ).first()
-
-            if not mc:
-                ns.abort(404, 'La materia no pertenece a ese curso')
-
-            # Buscar inscripciones al curso del año especificado
-            inscripciones = Inscripcion.query.filter(
-                Inscripcion.curso_id == curso_id,
-                func.extract('year', Inscripcion.fecha) == year
-            ).all()
-
-            # Extraer estudiantes únicos de las inscripciones
-            estudiantes = list({ins.estudiante.ci: ins.estudiante for ins in inscripciones}.values())
+                ns.abort(400, 'Faltan parámetros requeridos: docente_ci, materia_id, curso_id')
+
+            # Validar docente, materia, curso y sus asignaciones (una consulta)
+            try:
+                AsignacionDocenteService.resolver(docente_ci, materia_id, curso_id)
+            except ValueError as e:
+                ns.abort(404, str(e))
+
+            # Estudiantes del curso en el año especificado, desde la tabla roster
+            estudiantes = RosterService.estudiantes(docente_ci, materia_id, curso_id, year)
 
             return estudiantes_schema.dump(estudiantes), 200
 
@@ -296,47 +281,14 @@ class BoletinEstudiantesFiltrados(Resource):
             if not all([docente_ci, materia_id, curso_id]):
                 ns.abort(400, 'Faltan parámetros requeridos: docente_ci, materia_id, curso_id')
 
-            # Validar que el docente existe
-            docente = Docente.query.filter_by(ci=docente_ci).first()
-            if not docente:
-                ns.abort(404, 'Docente no encontrado')
-
-            # Validar que la materia existe
-            materia = Materia.query.get(materia_id)
-            if not materia:
-                ns.abort(404, 'Materia no encontrada')
-
-            # Validar que el curso existe
-            curso = Curso.query.get(curso_id)
-            if not curso:
-                ns.abort(404, 'Curso no encontrado')
-
-            # Validar que el docente enseña esa materia
-            dm = DocenteMateria.query.filter_by(
-                docente_ci=docente_ci,
-                materia_id=materia_id
-            ).first()
-
-            if not dm:
-                ns.abort(404, 'El docente no enseña esa materia')
-
-            # Verificar que la materia pertenece a ese curso
-            mc = MateriaCurso.query.filter_by(
-                materia_id=materia_id,
-                curso_id=curso_id
-            ).first()
-
-            if not mc:
-                ns.abort(404, 'La materia no pertenece a ese curso')
-
-            # Buscar inscripciones al curso del año especificado
-            inscripciones = Inscripcion.query.filter(
-                Inscripcion.curso_id == curso_id,
-                func.extract('year', Inscripcion.fecha) == year
-            ).all()
+            # Validar docente, materia, curso y sus asignaciones en una sola consulta
+            try:
+                docente, materia, curso = AsignacionDocenteService.resolver(docente_ci, materia_id, curso_id)
+            except ValueError as e:
+                ns.abort(404, str(e))
 
-            # Extraer estudiantes únicos de las inscripciones
-            estudiantes = list({ins.estudiante.ci: ins.estudiante for ins in inscripciones}.values())
+            # Estudiantes del curso en el año especificado, desde la tabla roster
+            estudiantes = RosterService.estudiantes(docente_ci, materia_id, curso_id, year)
 
             if not estudiantes:
                 return {
@@ -361,6 +313,11 @@ class BoletinEstudiantesFiltrados(Resource):
                     'resumen': {}
                 }, 200
 
+            # Notas finales de todo el curso en una sola consulta, indexadas por (ci, gestión)
+            notas_finales = BoletinService.notas_finales(
+                [estudiante.ci for estudiante in estudiantes], materia_id, [g.id for g in gestiones]
+            )
+
             # Construir el boletín para cada estudiante
             boletin_resultado = []
             
@@ -382,11 +339,7 @@ class BoletinEstudiantesFiltrados(Resource):
                 
                 # Para cada gestión (período), obtener la nota final
                 for gestion in gestiones:
-                    nota_final = NotaFinal.query.filter_by(
-                        estudiante_ci=estudiante.ci,
-                        materia_id=materia_id,
-                        gestion_id=gestion.id
-                    ).first()
+                    nota_final = notas_finales.get((estudiante.ci, gestion.id))
                     
                     periodo_info = {
                         'gestion_id': gestion.id,
@@ -472,47 +425,14 @@ class BoletinCompletoEstudiantesFiltrados(Resource):
             if not all([docente_ci, materia_id, curso_id]):
                 ns.abort(400, 'Faltan parámetros requeridos: docente_ci, materia_id, curso_id')
 
-            # Validar que el docente existe
-            docente = Docente.query.filter_by(ci=docente_ci).first()
-            if not docente:
-                ns.abort(404, 'Docente no encontrado')
-
-            # Validar que la materia existe
-            materia = Materia.query.get(materia_id)
-            if not materia:
-                ns.abort(404, 'Materia no encontrada')
-
-            # Validar que el curso existe
-            curso = Curso.query.get(curso_id)
-            if not curso:
-                ns.abort(404, 'Curso no encontrado')
-
-            # Validar que el docente enseña esa materia
-            dm = DocenteMateria.query.filter_by(
-                docente_ci=docente_ci,
-                materia_id=materia_id
-            ).first()
-
-            if not dm:
-                ns.abort(404, 'El docente no enseña esa materia')
-
-            # Verificar que la materia pertenece a ese curso
-            mc = MateriaCurso.query.filter_by(
-                materia_id=materia_id,
-                curso_id=curso_id
-            ).first()
-
-            if not mc:
-                ns.abort(404, 'La materia no pertenece a ese curso')
-
-            # Buscar inscripciones al curso del año especificado
-            inscripciones = Inscripcion.query.filter(
-                Inscripcion.curso_id == curso_id,
-                func.extract('year', Inscripcion.fecha) == year
-            ).all()
+            # Validar docente, materia, curso y sus asignaciones en una sola consulta
+            try:
+                docente, materia, curso = AsignacionDocenteService.resolver(docente_ci, materia_id, curso_id)
+            except ValueError as e:
+                ns.abort(404, str(e))
 
-            # Extraer estudiantes únicos de las inscripciones
-            estudiantes = list({ins.estudiante.ci: ins.estudiante for ins in inscripciones}.values())
+            # Estudiantes del curso en el año especificado, desde la tabla roster
+            estudiantes = RosterService.estudiantes(docente_ci, materia_id, curso_id, year)
 
             if not estudiantes:
                 return {
@@ -537,8 +457,18 @@ class BoletinCompletoEstudiantesFiltrados(Resource):
                     'resumen': {}
                 }, 200
 
+            # Notas finales y estimadas de todo el curso: dos consultas, indexadas por (ci, gestión)
+            estudiante_cis = [estudiante.ci for estudiante in estudiantes]
+            gestion_ids = [g.id for g in gestiones]
+            notas_finales = BoletinService.notas_finales(estudiante_cis, materia_id, gestion_ids)
+            notas_estimadas = BoletinService.notas_estimadas(estudiante_cis, materia_id, gestion_ids)
+
             # Construir el boletín completo para cada estudiante
             boletin_resultado = []
+
+            # Promedios generales de la clase (se acumulan en la misma pasada)
+            todas_notas_finales = []
+            todas_notas_estimadas = []
             
             for estudiante in estudiantes:
                 estudiante_boletin = {
@@ -565,19 +495,8 @@ class BoletinCompletoEstudiantesFiltrados(Resource):
                 
                 # Para cada gestión (período), obtener tanto la nota final como la estimada
                 for gestion in gestiones:
-                    # Buscar nota final
-                    nota_final = NotaFinal.query.filter_by(
-                        estudiante_ci=estudiante.ci,
-                        materia_id=materia_id,
-                        gestion_id=gestion.id
-                    ).first()
-                    
-                    # Buscar nota estimada
-                    nota_estimada = NotaEstimada.query.filter_by(
-                        estudiante_ci=estudiante.ci,
-                        materia_id=materia_id,
-                        gestion_id=gestion.id
-                    ).first()
+                    nota_final = notas_finales.get((estudiante.ci, gestion.id))
+                    nota_estimada = notas_estimadas.get((estudiante.ci, gestion.id))
                     
                     periodo_info = {
                         'gestion_id': gestion.id,
@@ -599,9 +518,11 @@ class BoletinCompletoEstudiantesFiltrados(Resource):
                     # Acumular notas para calcular promedios
                     if nota_final:
                         notas_finales_por_periodo.append(nota_final.valor)
+                        todas_notas_finales.append(nota_final.valor)
                     
                     if nota_estimada:
                         notas_estimadas_por_periodo.append(nota_estimada.valor_estimado)
+                        todas_notas_estimadas.append(nota_estimada.valor_estimado)
                 
                 # Calcular promedios
                 if notas_finales_por_periodo:
@@ -626,17 +547,6 @@ class BoletinCompletoEstudiantesFiltrados(Resource):
             estudiantes_con_notas_finales = sum(1 for est in boletin_resultado if est['total_periodos']['con_nota_final'] > 0)
             estudiantes_con_notas_estimadas = sum(1 for est in boletin_resultado if est['total_periodos']['con_nota_estimada'] > 0)
             
-            # Promedios generales de la clase
-            todas_notas_finales = []
-            todas_notas_estimadas = []
-            
-            for est in boletin_resultado:
-                for periodo in est['periodos']:
-                    if periodo['nota_final']['tiene_nota']:
-                        todas_notas_finales.append(periodo['nota_final']['valor'])
-                    if periodo['nota_estimada']['tiene_nota']:
-                        todas_notas_estimadas.append(periodo['nota_estimada']['valor'])
-            
             promedio_general_final = round(sum(todas_notas_finales) / len(todas_notas_finales), 2) if todas_notas_finales else 0.0
             promedio_general_estimado = round(sum(todas_notas_estimadas) / len(todas_notas_estimadas), 2) if todas_notas_estimadas else 0.0
             
@@ -710,7 +620,9 @@ class BoletinCompletoEstudiante(Resource):
                 ns.abort(404, 'Estudiante no encontrado')
 
             # Obtener todas las inscripciones del estudiante para conocer sus cursos
-            inscripciones = Inscripcion.query.filter_by(estudiante_ci=ci).all()
+            inscripciones = Inscripcion.query.options(
+                joinedload(Inscripcion.curso)
+            ).filter_by(estudiante_ci=ci).all()
             if not inscripciones:
                 return {
                     'mensaje': 'El estudiante no tiene inscripciones registradas',
@@ -721,8 +633,8 @@ class BoletinCompletoEstudiante(Resource):
                     'materias': []
                 }, 200
 
-            # Obtener todas las materias de todos los cursos en los que está inscrito
-            materias_set = set()
+            # Obtener los cursos en los que está inscrito
+            cursos_ids = set()
             cursos_info = []
             
             for inscripcion in inscripciones:
@@ -736,15 +648,14 @@ class BoletinCompletoEstudiante(Resource):
                         'nivel': curso.Nivel,
                         'fecha_inscripcion': inscripcion.fecha.strftime('%Y-%m-%d') if inscripcion.fecha else None
                     })
-                    
-                    # Obtener materias del curso
-                    materias_curso = MateriaCurso.query.filter_by(curso_id=curso.id).all()
-                    for mc in materias_curso:
-                        if mc.materia:
-                            materias_set.add(mc.materia.id)
-
-            # Convertir set a lista de objetos materia
-            materias = [Materia.query.get(mid) for mid in materias_set if Materia.query.get(mid)]
+                    cursos_ids.add(curso.id)
+
+            # Todas las materias de esos cursos en una sola consulta (sin repetir)
+            materias = Materia.query.join(
+                MateriaCurso, MateriaCurso.materia_id == Materia.id
+            ).filter(
+                MateriaCurso.curso_id.in_(cursos_ids)
+            ).distinct().order_by(Materia.id).all() if cursos_ids else []
             
             if not materias:                return {
                     'mensaje': 'No se encontraron materias para el estudiante',
@@ -771,6 +682,11 @@ class BoletinCompletoEstudiante(Resource):
                     'year_solicitado': year
                 }, 200
 
+            # Notas finales y estimadas del estudiante para todas sus materias y gestiones del año
+            materia_ids = [materia.id for materia in materias]
+            notas_finales = BoletinService.notas_de_estudiante(NotaFinal, ci, materia_ids, list(gestiones_dict))
+            notas_estimadas = BoletinService.notas_de_estudiante(NotaEstimada, ci, materia_ids, list(gestiones_dict))
+
             # Construir el boletín por materia
             boletin_materias = []
             
@@ -794,19 +710,8 @@ class BoletinCompletoEstudiante(Resource):
                 notas_estimadas_acumuladas = []
                   # Para cada gestión del año especificado, buscar notas finales y estimadas
                 for gestion in gestiones:
-                    # Buscar nota final
-                    nota_final = NotaFinal.query.filter_by(
-                        estudiante_ci=ci,
-                        materia_id=materia.id,
-                        gestion_id=gestion.id
-                    ).first()
-                    
-                    # Buscar nota estimada
-                    nota_estimada = NotaEstimada.query.filter_by(
-                        estudiante_ci=ci,
-                        materia_id=materia.id,
-                        gestion_id=gestion.id
-                    ).first()
+                    nota_final = notas_finales.get((materia.id, gestion.id))
+                    nota_estimada = notas_estimadas.get((materia.id, gestion.id))
                     
                     # Solo agregar el período si tiene al menos una nota
                     if nota_final or nota_estimada:
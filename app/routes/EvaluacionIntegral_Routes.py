@@ -1,22 +1,24 @@
 from ..models.EvaluacionIntegral_Model import EvaluacionIntegral
 from ..schemas.EvaluacionIntegral_schema import EvaluacionIntegralSchema
+from ..Services.CatalogoEvaluacionService import CatalogoEvaluacionService
 from flask import request
 from app import db
 from flask_jwt_extended import jwt_required
 from flask_restx import Namespace, Resource
 from ..api_model.EvalaucionIntegral import ns, EvaluacionIntegral_model_request, EvaluacionIntegral_model_response
+from ..api_model.parsers import listado_parser, listar_paginado
 
 evaluacionIntegral_schema = EvaluacionIntegralSchema()
 evaluacionIntegrales_schema = EvaluacionIntegralSchema(many=True)
 
 @ns.route('/')
 class EvaluacionIntegralList(Resource):
-    @ns.marshal_list_with(EvaluacionIntegral_model_response)
+    @ns.expect(listado_parser)
+    @ns.response(200, 'Success', [EvaluacionIntegral_model_response])
     @jwt_required()
     def get(self):
         """Lista todos las evaluaciones Integrales"""
-        evaluacionesIntegrales = EvaluacionIntegral.query.all()
-        return evaluacionIntegrales_schema.dump(evaluacionesIntegrales)
+        return listar_paginado(EvaluacionIntegral, EvaluacionIntegral_model_response)
 
     @ns.expect(EvaluacionIntegral_model_request)
     @ns.marshal_with(EvaluacionIntegral_model_response, code=201)
@@ -28,6 +30,7 @@ class EvaluacionIntegralList(Resource):
         try:
             db.session.add(nueva_evaluacionIntegral)
             db.session.commit()
+            CatalogoEvaluacionService.invalidar()
             return evaluacionIntegral_schema.dump(nueva_evaluacionIntegral), 201
         except Exception as e:
             db.session.rollback()
@@ -57,6 +60,7 @@ class EvaluacionIntegralResource(Resource):
 
         try:
             db.session.commit()
+            CatalogoEvaluacionService.invalidar()
             return evaluacionIntegral_schema.dump(evaluacionIntegral)
         except Exception as e:
             db.session.rollback()
@@ -69,6 +73,7 @@ class EvaluacionIntegralResource(Resource):
         try:
             db.session.delete(evaluacionIntegral)
             db.session.commit()
+            CatalogoEvaluacionService.invalidar()
             return {"message": "evaluacion Integral eliminado correctamente"}, 200
         except Exception as e:
             db.session.rollback()
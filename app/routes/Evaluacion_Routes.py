@@ -1,9 +1,6 @@
 from ..models.Evaluacion_Model import Evaluacion
-from ..models.EvaluacionIntegral_Model import EvaluacionIntegral
-from ..models.TipoEvaluacion_Model import TipoEvaluacion
 from ..models.Gestion_Model import Gestion
 from ..models.Materia_Model import Materia
-from ..models.NotaEstimada_Model import NotaEstimada
 from ..models.NotaFinal_Model import NotaFinal
 from ..models.MateriaCurso_Model import MateriaCurso
 from ..models.Inscripcion_Model import Inscripcion
@@ -12,9 +9,17 @@ from ..schemas.Evaluacion_schema import EvaluacionSchema
 from flask import request
 from app import db
 from flask_jwt_extended import jwt_required
-from flask_restx import Namespace, Resource
-from ..api_model.Evaluacion import ns, evaluacion_model_request, evaluacion_model_response
-from sqlalchemy import func
+from flask_restx import Resource
+from ..api_model.Evaluacion import ns, evaluacion_model_request, evaluacion_model_response, asistencia_curso_model_request
+from ..api_model.parsers import listado_parser, listar_paginado, exportacion_parser
+from ..Services.ExportacionService import ExportacionService
+from datetime import date
+from ..Services.NotaIntegralService import NotaIntegralService, DIMENSIONES
+from ..Services.CatalogoEvaluacionService import CatalogoEvaluacionService
+from ..Services.AcumuladoEvaluacionService import AcumuladoEvaluacionService
+from ..Services.EvaluacionMasivaService import EvaluacionMasivaService
+from ..Services.InscripcionService import InscripcionService
+from ..Services.PasoNotasService import PasoNotasService
 
 # Importar el servicio de ML para predicciones
 from ..ml.notas_prediction_service import NotasPredictionService
@@ -24,12 +29,12 @@ evaluaciones_schema = EvaluacionSchema(many=True)
 
 @ns.route('/')
 class EvaluacionList(Resource):
-    @ns.marshal_list_with(evaluacion_model_response)
+    @ns.expect(listado_parser)
+    @ns.response(200, 'Success', [evaluacion_model_response])
     @jwt_required()
     def get(self):
         """Lista todas las evaluaciones"""
-        items = Evaluacion.query.all()
-        return evaluaciones_schema.dump(items)
+        return listar_paginado(Evaluacion, evaluacion_model_response)
 
     @ns.expect(evaluacion_model_request)
     @ns.marshal_with(evaluacion_model_response, code=201)
@@ -40,85 +45,30 @@ class EvaluacionList(Resource):
         nueva_evaluacion = evaluacion_schema.load(data)
 
         try:
-            # Guardar evaluación
+            # Guardar evaluación (sin commit: todo se confirma en una sola transacción)
             db.session.add(nueva_evaluacion)
-            db.session.commit()
+            db.session.flush()
 
             # === Actualizar Nota Final del estudiante para esa materia y gestión ===
-            estudiante_ci = data["estudiante_ci"]
-            gestion_id = data["gestion_id"]
-            materia_id = data["materia_id"]
-
-            # Obtener notas individuales
-            ser_nota = NotaFinalDe(estudiante_ci, gestion_id, materia_id, "ser")
-            hacer_nota = NotaFinalDe(estudiante_ci, gestion_id, materia_id, "hacer")
-            saber_nota = NotaFinalDe(estudiante_ci, gestion_id, materia_id, "saber")
-            decidir_nota = NotaFinalDe(estudiante_ci, gestion_id, materia_id, "decidir")
-
-            def extraer_nota(valor):
-                return valor["Nota"] if isinstance(valor, dict) and "Nota" in valor else 0
-
-            # Calcular nota final integral (suma directa, sin dividir)
-            # Cada dimensión ya tiene su peso correcto: ser=15, decidir=15, hacer=35, saber=35 = 100 total
-            nota_final_valor = round((
-                extraer_nota(ser_nota) +
-                extraer_nota(hacer_nota) +
-                extraer_nota(saber_nota) +
-                extraer_nota(decidir_nota)
-            ), 2)
-
-            # Buscar o crear NotaFinal
-            nota_final = NotaFinal.query.filter_by(
-                estudiante_ci=estudiante_ci,
-                gestion_id=gestion_id,
-                materia_id=materia_id
-            ).first()
-            
-            if not nota_final:
-                nota_final = NotaFinal(
-                    estudiante_ci=estudiante_ci,
-                    gestion_id=gestion_id,
-                    materia_id=materia_id,
-                    valor=nota_final_valor
-                )
-                db.session.add(nota_final)
-            else:
-                nota_final.valor = nota_final_valor
-            
+            estudiante_ci = nueva_evaluacion.estudiante_ci
+            gestion_id = nueva_evaluacion.gestion_id
+            materia_id = nueva_evaluacion.materia_id
+
+            # Sumar la evaluación a los acumulados y recalcular la nota final en O(1)
+            acumulados = AcumuladoEvaluacionService.registrar_alta(nueva_evaluacion)
+            AcumuladoEvaluacionService.actualizar_nota_final(estudiante_ci, materia_id, gestion_id, acumulados)
+
             db.session.commit()
 
             # === INTEGRACIÓN ML: Predecir y actualizar nota estimada ===
             try:
                 ml_service = NotasPredictionService()
-                prediccion = ml_service.predict_student_grade(
+                ml_service.predict_and_upsert_nota_estimada(
                     estudiante_ci=estudiante_ci,
                     materia_id=materia_id,
                     gestion_id=gestion_id
                 )
-                
-                if prediccion and 'nota_estimada' in prediccion:
-                    # Buscar o crear NotaEstimada
-                    nota_estimada = NotaEstimada.query.filter_by(
-                        estudiante_ci=estudiante_ci,
-                        gestion_id=gestion_id,
-                        materia_id=materia_id
-                    ).first()
-
-                    if not nota_estimada:
-                        nota_estimada = NotaEstimada(
-                            estudiante_ci=estudiante_ci,
-                            gestion_id=gestion_id,
-                            materia_id=materia_id,
-                            valor_estimado=prediccion['nota_estimada'],
-                            razon_estimacion=prediccion.get('razon', 'Predicción ML basada en rendimiento académico')
-                        )
-                        db.session.add(nota_estimada)
-                    else:
-                        nota_estimada.valor_estimado = prediccion['nota_estimada']
-                        nota_estimada.razon_estimacion = prediccion.get('razon', 'Predicción ML actualizada')
-
-                    db.session.commit()
-                    
+
             except Exception as ml_error:
                 # No fallar si hay error en ML, solo registrar
                 print(f"Error en predicción ML: {str(ml_error)}")
@@ -129,6 +79,44 @@ class EvaluacionList(Resource):
             db.session.rollback()
             ns.abort(500, f"Error al crear la evaluación: {str(e)}")
 
+@ns.route('/bulk')
+class EvaluacionBulk(Resource):
+    @ns.expect([evaluacion_model_request])
+    @jwt_required()
+    def post(self):
+        """
+        Crea varias evaluaciones en una sola transacción.
+        Recalcula la nota final una vez por (estudiante, materia, gestión) y reporta los errores por fila.
+        """
+        data = request.json
+        if isinstance(data, dict):
+            data = data.get('evaluaciones')
+        if not isinstance(data, list) or not data:
+            ns.abort(400, "Se esperaba una lista de evaluaciones")
+        if len(data) > EvaluacionMasivaService.MAX_EVALUACIONES:
+            ns.abort(400, f"Máximo {EvaluacionMasivaService.MAX_EVALUACIONES} evaluaciones por solicitud")
+
+        try:
+            evaluaciones, errores, notas_finales = EvaluacionMasivaService.registrar(data)
+            if not evaluaciones:
+                db.session.rollback()
+                return {"message": "No se creó ninguna evaluación", "creadas": 0, "errores": errores}, 400
+
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            ns.abort(500, f"Error al crear las evaluaciones: {str(e)}")
+
+        # === INTEGRACIÓN ML: notas estimadas de las notas finales recalculadas, en un lote ===
+        NotasPredictionService.predict_and_update_notas_estimadas(notas_finales.values())
+
+        return {
+            "creadas": len(evaluaciones),
+            "evaluaciones": evaluaciones_schema.dump(evaluaciones),
+            "notas_finales_actualizadas": len(notas_finales),
+            "errores": errores
+        }, 201
+
 @ns.route('/boletin/<int:estudiante_ci>')
 class BoletinEstudiante(Resource):
     @jwt_required()
@@ -192,80 +180,55 @@ class BoletinEstudiante(Resource):
 @ns.route('/paso_notas/curso/<int:curso_id>/gestion/<int:gestion_id>')
 class PasarNotasDeEvaluacionANotaFinal(Resource):
     @jwt_required()
-    def get(self, curso_id, gestion_id):
+    def post(self, curso_id, gestion_id):
         """Genera o actualiza las notas finales de los estudiantes en un curso dado y gestión"""
 
-        # Obtener todas las materias asignadas a este curso
-        materias_curso = MateriaCurso.query.filter_by(curso_id=curso_id).all()
-        if not materias_curso:
+        # Verificar que el curso tenga materias y estudiantes
+        if not MateriaCurso.query.filter_by(curso_id=curso_id).first():
             return {"mensaje": "No hay materias asignadas al curso"}, 404
 
-        materia_ids = [mc.materia_id for mc in materias_curso]
-
-        # Obtener todos los estudiantes inscritos en el curso
-        inscripciones = Inscripcion.query.filter_by(curso_id=curso_id).all()
-        if not inscripciones:
+        if not Inscripcion.query.filter_by(curso_id=curso_id).first():
             return {"mensaje": "No hay estudiantes inscritos en este curso"}, 404
 
-        total_procesados = 0
-        errores = []
-
-        for inscripcion in inscripciones:
-            estudiante_ci = inscripcion.estudiante_ci
+        try:
+            resultado = PasoNotasService.pasar_notas(gestion_id, [curso_id])
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            return {"mensaje": "Error al guardar los cambios", "error": str(e)}, 500
 
-            for materia_id in materia_ids:
-                # Obtener todas las evaluaciones del estudiante en esa materia y gestión
-                evaluaciones = Evaluacion.query.filter_by(
-                    estudiante_ci=estudiante_ci,
-                    materia_id=materia_id,
-                    gestion_id=gestion_id
-                ).all()
+        return {
+            "mensaje": f"Notas finales procesadas correctamente: {resultado['notas_procesadas']}",
+            "errores": [],
+            **resultado
+        }, 200
 
-                if not evaluaciones:
-                    continue  # No hay evaluaciones, saltamos
+    def get(self, curso_id, gestion_id):
+        """Obsoleto: el paso de notas modifica datos y solo se ejecuta con POST"""
+        return {
+            "mensaje": "El paso de notas se ejecuta con POST en esta misma ruta; GET ya no lo ejecuta"
+        }, 405, {"Allow": "POST"}
 
-                suma = sum(eva.nota for eva in evaluaciones)
-                promedio = round(suma / len(evaluaciones), 2)
 
-                # Verificamos si ya existe una nota final para este estudiante/materia/gestión
-                nota_final = NotaFinal.query.filter_by(
-                    estudiante_ci=estudiante_ci,
-                    materia_id=materia_id,
-                    gestion_id=gestion_id
-                ).first()
-
-                try:
-                    if nota_final:
-                        # Actualizar
-                        nota_final.valor = promedio
-                    else:
-                        # Crear
-                        nota_final = NotaFinal(
-                            estudiante_ci=estudiante_ci,
-                            materia_id=materia_id,
-                            gestion_id=gestion_id,
-                            valor=promedio
-                        )   
-                        db.session.add(nota_final)
-
-                    total_procesados += 1
-
-                except Exception as e:
-                    errores.append({
-                        "estudiante_ci": estudiante_ci,
-                        "materia_id": materia_id,
-                        "error": str(e)
-                    })
+@ns.route('/paso_notas/gestion/<int:gestion_id>')
+class PasarNotasDeGestion(Resource):
+    @jwt_required()
+    def post(self, gestion_id):
+        """Genera o actualiza las notas finales de todos los cursos para una gestión"""
+        if not Gestion.query.get(gestion_id):
+            return {"mensaje": "Gestión no encontrada"}, 404
 
         try:
+            resultado = PasoNotasService.pasar_notas(gestion_id)
             db.session.commit()
         except Exception as e:
             db.session.rollback()
             return {"mensaje": "Error al guardar los cambios", "error": str(e)}, 500
 
         return {
-            "mensaje": f"Notas finales procesadas correctamente: {total_procesados}",
-            "errores": errores
+            "mensaje": f"Notas finales procesadas correctamente: {resultado['notas_procesadas']}",
+            "gestion_id": gestion_id,
+            **resultado
         }, 200
 
 
@@ -330,112 +293,67 @@ class AsistenciaPost(Resource):
     def post(self):
         """Crea una nueva evaluación de asistencia diaria, actualiza asistencia final y recalcula nota final"""
         data = request.json
-        data['tipo_evaluacion_id'] = 1  # ID fijo para Asistencia-Diaria
+        data['tipo_evaluacion_id'] = CatalogoEvaluacionService.asistencia_diaria_id()
         nueva_evaluacion = evaluacion_schema.load(data)
 
         try:
-            # Guardar la asistencia diaria
+            # Guardar la asistencia diaria (sin commit: todo se confirma en una sola transacción)
             db.session.add(nueva_evaluacion)
-            db.session.commit()
+            db.session.flush()
+
+            estudiante_ci = nueva_evaluacion.estudiante_ci
+            gestion_id = nueva_evaluacion.gestion_id
+            materia_id = nueva_evaluacion.materia_id
 
-            # Actualizar o crear la evaluación de tipo Asistencia-Final (ID fijo = 2)
+            acumulados = AcumuladoEvaluacionService.registrar_alta(nueva_evaluacion)
+
+            # La asistencia final es el promedio de las asistencias diarias (sale de los acumulados)
+            nota_asistencia_final = AcumuladoEvaluacionService.promedio_tipo(
+                acumulados, nueva_evaluacion.tipo_evaluacion_id
+            ) or 0
+
+            # Actualizar o crear la evaluación de tipo Asistencia-Final
+            asistencia_final_id = CatalogoEvaluacionService.asistencia_final_id()
             tipoAsistenciaFinal = Evaluacion.query.filter_by(
-                tipo_evaluacion_id=2,  # ID fijo para Asistencia-Final
-                estudiante_ci=data["estudiante_ci"],
-                materia_id=data["materia_id"],
-                gestion_id=data["gestion_id"]
+                tipo_evaluacion_id=asistencia_final_id,
+                estudiante_ci=estudiante_ci,
+                materia_id=materia_id,
+                gestion_id=gestion_id
             ).first()
 
-            resultado_asistencia = AsistenciaFinal(data["estudiante_ci"], data["gestion_id"], data["materia_id"])
-            nota_asistencia_final = resultado_asistencia.get("asistenciaFinal", 0)
-
             if not tipoAsistenciaFinal:
                 tipoAsistenciaFinal = Evaluacion(
-                    estudiante_ci=data["estudiante_ci"],
-                    materia_id=data["materia_id"],
-                    gestion_id=data["gestion_id"],
-                    tipo_evaluacion_id=2,  # ID fijo para Asistencia-Final
+                    estudiante_ci=estudiante_ci,
+                    materia_id=materia_id,
+                    gestion_id=gestion_id,
+                    tipo_evaluacion_id=asistencia_final_id,
                     nota=nota_asistencia_final
                 )
                 db.session.add(tipoAsistenciaFinal)
+                db.session.flush()
+                acumulados = AcumuladoEvaluacionService.registrar_alta(tipoAsistenciaFinal)
             else:
+                anterior = datos_clave(tipoAsistenciaFinal)
                 tipoAsistenciaFinal.nota = nota_asistencia_final
-                db.session.add(tipoAsistenciaFinal)
+                db.session.flush()
+                acumulados = AcumuladoEvaluacionService.registrar_cambio(
+                    anterior, tipoAsistenciaFinal
+                )[(estudiante_ci, materia_id, gestion_id)]
 
-            db.session.commit()            # === Recalcular Nota Final del estudiante para esa materia y gestión ===
-            estudiante_ci = data["estudiante_ci"]
-            gestion_id = data["gestion_id"]
-            materia_id = data["materia_id"]
-
-            ser_nota = NotaFinalDe(estudiante_ci, gestion_id, materia_id, "ser")
-            hacer_nota = NotaFinalDe(estudiante_ci, gestion_id, materia_id, "hacer")
-            saber_nota = NotaFinalDe(estudiante_ci, gestion_id, materia_id, "saber")
-            decidir_nota = NotaFinalDe(estudiante_ci, gestion_id, materia_id, "decidir")
-
-            def extraer_nota(valor):
-                return valor["Nota"] if isinstance(valor, dict) and "Nota" in valor else 0
-
-            # Calcular nota final integral (suma directa, sin dividir)
-            # Cada dimensión ya tiene su peso correcto: ser=15, decidir=15, hacer=35, saber=35 = 100 total
-            nota_final_valor = round((
-                extraer_nota(ser_nota) +
-                extraer_nota(hacer_nota) +
-                extraer_nota(saber_nota) +
-                extraer_nota(decidir_nota)
-            ), 2)
-
-            # Buscar o crear NotaFinal
-            nota_final = NotaFinal.query.filter_by(
-                estudiante_ci=estudiante_ci,
-                gestion_id=gestion_id,
-                materia_id=materia_id
-            ).first()
+            # === Recalcular Nota Final del estudiante para esa materia y gestión ===
+            AcumuladoEvaluacionService.actualizar_nota_final(estudiante_ci, materia_id, gestion_id, acumulados)
 
-            if not nota_final:
-                nota_final = NotaFinal(
-                    estudiante_ci=estudiante_ci,
-                    gestion_id=gestion_id,
-                    materia_id=materia_id,
-                    valor=nota_final_valor
-                )
-                db.session.add(nota_final)
-            else:
-                nota_final.valor = nota_final_valor
-            
             db.session.commit()
 
             # === INTEGRACIÓN ML: Predecir y actualizar nota estimada ===
             try:
                 ml_service = NotasPredictionService()
-                prediccion = ml_service.predict_student_grade(
+                ml_service.predict_and_upsert_nota_estimada(
                     estudiante_ci=estudiante_ci,
                     materia_id=materia_id,
                     gestion_id=gestion_id
                 )
-                
-                if prediccion and 'nota_estimada' in prediccion:
-                    # Buscar o crear NotaEstimada
-                    nota_estimada = NotaEstimada.query.filter_by(
-                        estudiante_ci=estudiante_ci,
-                        gestion_id=gestion_id,
-                        materia_id=materia_id
-                    ).first()
-
-                    if not nota_estimada:
-                        nota_estimada = NotaEstimada(
-                            estudiante_ci=estudiante_ci,
-                            gestion_id=gestion_id,
-                            materia_id=materia_id,
-                            valor_estimado=prediccion['nota_estimada'],
-                            razon_estimacion=prediccion.get('razon', 'Predicción ML basada en rendimiento académico')
-                        )
-                        db.session.add(nota_estimada)
-                    else:
-                        nota_estimada.valor_estimado = prediccion['nota_estimada']
-                        nota_estimada.razon_estimacion = prediccion.get('razon', 'Predicción ML actualizada')
-
-                    db.session.commit()
-                    
+
             except Exception as ml_error:
                 # No fallar si hay error en ML, solo registrar
                 print(f"Error en predicción ML: {str(ml_error)}")
@@ -447,6 +365,59 @@ class AsistenciaPost(Resource):
             ns.abort(500, f"Error al crear la evaluación de asistencia: {str(e)}")
     
 
+@ns.route('/asistencia/curso/')
+class AsistenciaCursoPost(Resource):
+    @ns.expect(asistencia_curso_model_request)
+    @jwt_required()
+    def post(self):
+        """
+        Registra la asistencia de un día para todo un curso en una materia y gestión.
+        Actualiza las asistencias finales y las notas finales del curso en una sola transacción.
+        """
+        data = request.json or {}
+        curso_id = data.get('curso_id')
+        materia_id = data.get('materia_id')
+        gestion_id = data.get('gestion_id')
+        asistencias = data.get('asistencias')
+
+        if not curso_id or not materia_id or not gestion_id:
+            ns.abort(400, "Debe enviar curso_id, materia_id y gestion_id")
+        if not isinstance(asistencias, list) or not asistencias:
+            ns.abort(400, "Se esperaba una lista de asistencias")
+
+        try:
+            fecha = date.fromisoformat(data['fecha']) if data.get('fecha') else date.today()
+        except (TypeError, ValueError):
+            ns.abort(400, "Formato de fecha inválido, use YYYY-MM-DD")
+
+        if not MateriaCurso.query.filter_by(materia_id=materia_id, curso_id=curso_id).first():
+            ns.abort(404, "La materia no está asignada al curso")
+        if not Gestion.query.get(gestion_id):
+            ns.abort(404, "Gestión no encontrada")
+
+        try:
+            evaluaciones, errores, notas_finales = EvaluacionMasivaService.registrar_asistencia_curso(
+                curso_id, materia_id, gestion_id, fecha, asistencias
+            )
+            if not evaluaciones:
+                db.session.rollback()
+                return {"message": "No se registró ninguna asistencia", "registradas": 0, "errores": errores}, 400
+
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            ns.abort(500, f"Error al registrar la asistencia del curso: {str(e)}")
+
+        # === INTEGRACIÓN ML: notas estimadas de las notas finales recalculadas, en un lote ===
+        NotasPredictionService.predict_and_update_notas_estimadas(notas_finales.values())
+
+        return {
+            "registradas": len(evaluaciones),
+            "fecha": fecha.isoformat(),
+            "notas_finales_actualizadas": len(notas_finales),
+            "errores": errores
+        }, 201
+
 @ns.route('/asistencia/estudiante/<int:estudiante_ci>/gestion/<int:gestion_id>/materia/<int:materia_id>')
 @ns.doc(params={
     'estudiante_ci': 'CI del estudiante',
@@ -459,12 +430,22 @@ class AsistenciaFinal(Resource):
     def get(self, estudiante_ci, gestion_id, materia_id):
         return AsistenciaFinal(estudiante_ci, gestion_id, materia_id)
     
+def datos_clave(evaluacion):
+    """Copia de los campos de una evaluación que determinan sus acumulados"""
+    return {
+        'estudiante_ci': evaluacion.estudiante_ci,
+        'materia_id': evaluacion.materia_id,
+        'gestion_id': evaluacion.gestion_id,
+        'tipo_evaluacion_id': evaluacion.tipo_evaluacion_id,
+        'nota': evaluacion.nota
+    }
+
 def AsistenciaFinal(estudiante_ci, gestion_id, materia_id):
     evaluaciones = Evaluacion.query.filter_by(
         estudiante_ci=estudiante_ci,
         materia_id=materia_id,
         gestion_id=gestion_id,
-        tipo_evaluacion_id=1  # ID fijo para Asistencia-Diaria
+        tipo_evaluacion_id=CatalogoEvaluacionService.asistencia_diaria_id()
     ).all()
 
     if not evaluaciones:
@@ -476,91 +457,6 @@ def AsistenciaFinal(estudiante_ci, gestion_id, materia_id):
     return {"asistenciaFinal": promedio}
 
 
-
-
-    
-# @ns.route('/ser-final/estudiante/<int:estudiante_ci>/gestion/<int:gestion_id>/materia/<int:materia_id>')
-# @ns.doc(params={
-#     'estudiante_ci': 'CI del estudiante',
-#     'gestion_id': 'ID de la gestión',
-#     'materia_id': 'ID de la materia'
-# })
-# class EvaluacionFinalSer(Resource):
-
-#     @jwt_required()
-#     def get(self, estudiante_ci, gestion_id, materia_id):
-#         return NotaFinalDe(estudiante_ci, gestion_id, materia_id, "ser")
-    
-# @ns.route('/hacer-final/estudiante/<int:estudiante_ci>/gestion/<int:gestion_id>/materia/<int:materia_id>')
-# @ns.doc(params={
-#     'estudiante_ci': 'CI del estudiante',
-#     'gestion_id': 'ID de la gestión',
-#     'materia_id': 'ID de la materia'
-# })
-# class EvaluacionFinalHacer(Resource):
-
-#     @jwt_required()
-#     def get(self, estudiante_ci, gestion_id, materia_id):
-#         return NotaFinalDe(estudiante_ci, gestion_id, materia_id, "hacer")
-    
-# @ns.route('/decidir-final/estudiante/<int:estudiante_ci>/gestion/<int:gestion_id>/materia/<int:materia_id>')
-# @ns.doc(params={
-#     'estudiante_ci': 'CI del estudiante',
-#     'gestion_id': 'ID de la gestión',
-#     'materia_id': 'ID de la materia'
-# })
-# class EvaluacionFinalDecidir(Resource):
-
-#     @jwt_required()
-#     def get(self, estudiante_ci, gestion_id, materia_id):
-#         return NotaFinalDe(estudiante_ci, gestion_id, materia_id, "decidir")
-    
-# @ns.route('/saber-final/estudiante/<int:estudiante_ci>/gestion/<int:gestion_id>/materia/<int:materia_id>')
-# @ns.doc(params={
-#     'estudiante_ci': 'CI del estudiante',
-#     'gestion_id': 'ID de la gestión',
-#     'materia_id': 'ID de la materia'
-# })
-# class EvaluacionFinalSaber(Resource):
-
-#     @jwt_required()
-#     def get(self, estudiante_ci, gestion_id, materia_id):
-#         return NotaFinalDe(estudiante_ci, gestion_id, materia_id, "saber")
-
-
-
-
-
-def NotaFinalDe(estudiante_ci, gestion_id, materia_id, tipoDeEvaluacionIntegral):
-    # Buscar la EvaluacionIntegral que se llama "ser"
-    evaluacion_integral = EvaluacionIntegral.query.filter(func.lower(EvaluacionIntegral.nombre) == tipoDeEvaluacionIntegral).first()
-    if not evaluacion_integral:
-        return {"mensaje": "evaluacion integral no encontrada"}, 404
-
-    # Obtener los tipos de evaluación relacionados al SER
-    tipos_ser = TipoEvaluacion.query.filter_by(evaluacion_integral_id=evaluacion_integral.id).all()
-    tipo_ids = [tipo.id for tipo in tipos_ser]
-
-    if not tipo_ids:
-        return {"Nota": 0}, 404
-
-    # Buscar todas las evaluaciones del estudiante en esa materia y gestión que correspondan al SER
-    evaluaciones = Evaluacion.query.filter(
-        Evaluacion.estudiante_ci == estudiante_ci,
-        Evaluacion.materia_id == materia_id,
-        Evaluacion.gestion_id == gestion_id,
-        Evaluacion.tipo_evaluacion_id.in_(tipo_ids)
-    ).all()
-
-    if not evaluaciones:
-        return {"mensaje": "No se encontraron evaluaciones de la evaluacion integral"}, 404
-
-    # Calcular la suma de notas
-    suma = sum(eva.nota for eva in evaluaciones)
-    promedio = suma / len(evaluaciones)
-
-    return {"Nota": promedio}
-
 @ns.route('/estudiante/<int:estudiante_ci>')
 @ns.param('estudiante_ci', 'CI del estudiante')
 class EvaluacionesPorEstudiante(Resource):
@@ -602,6 +498,24 @@ class EvaluacionesPorEstudiante(Resource):
 #             ns.abort(500, f"Error al actualizar: {str(e)}")
 
 
+@ns.route('/export')
+class EvaluacionExport(Resource):
+    @ns.expect(exportacion_parser)
+    @ns.produces(['application/x-ndjson', 'text/csv'])
+    @jwt_required()
+    def get(self):
+        """Exporta las evaluaciones por streaming (NDJSON o CSV), filtrables por gestión, curso y materia"""
+        args = exportacion_parser.parse_args()
+        consulta = ExportacionService.consulta(
+            Evaluacion,
+            gestion_id=args['gestion_id'],
+            curso_id=args['curso_id'],
+            materia_id=args['materia_id'],
+            estudiante_ci=args['estudiante_ci']
+        )
+        return ExportacionService.respuesta(consulta, args['formato'], 'evaluaciones')
+
+
 @ns.route('/<int:id>')
 @ns.param('id', 'ID de la evaluación')
 class EvaluacionResource(Resource):
@@ -618,12 +532,20 @@ class EvaluacionResource(Resource):
         """Actualizar una evaluación por ID"""
         evaluacion = Evaluacion.query.get_or_404(id)
         data = request.json
+        anterior = datos_clave(evaluacion)
 
         for key, value in data.items():
             if hasattr(evaluacion, key):
                 setattr(evaluacion, key, value)
 
         try:
+            db.session.flush()
+
+            # Ajustar acumulados y nota final de la clave (o de ambas si cambió estudiante/materia/gestión)
+            afectados = AcumuladoEvaluacionService.registrar_cambio(anterior, evaluacion)
+            for (estudiante_ci, materia_id, gestion_id), acumulados in afectados.items():
+                AcumuladoEvaluacionService.actualizar_nota_final(estudiante_ci, materia_id, gestion_id, acumulados)
+
             db.session.commit()
             return evaluacion_schema.dump(evaluacion)
         except Exception as e:
@@ -636,6 +558,14 @@ class EvaluacionResource(Resource):
         evaluacion = Evaluacion.query.get_or_404(id)
         try:
             db.session.delete(evaluacion)
+            db.session.flush()
+
+            # Restar la evaluación de los acumulados y recalcular la nota final
+            acumulados = AcumuladoEvaluacionService.registrar_baja(evaluacion)
+            AcumuladoEvaluacionService.actualizar_nota_final(
+                evaluacion.estudiante_ci, evaluacion.materia_id, evaluacion.gestion_id, acumulados
+            )
+
             db.session.commit()
             return {"message": "Evaluación eliminada correctamente"}, 200
         except Exception as e:
@@ -664,7 +594,7 @@ class NotaAsistenciaFinalPorEstudiante(Resource):
         """Buscar evaluaciones de asistencia final por CI del estudiante"""
         evaluaciones = Evaluacion.query.filter_by(
             estudiante_ci=estudiante_ci,
-            tipo_evaluacion_id=2  # ID fijo para Asistencia-Final
+            tipo_evaluacion_id=CatalogoEvaluacionService.asistencia_final_id()
         ).all()
         if not evaluaciones:
             ns.abort(404, f"No se encontraron evaluaciones de asistencia final para el estudiante con CI {estudiante_ci}")
@@ -686,84 +616,27 @@ class BoletinPorMateria(Resource):
         if not mc:
             return {'mensaje': 'La materia no pertenece a ese curso'}, 404
 
-        # Obtener inscripciones al curso
-        inscripciones = Inscripcion.query.filter_by(curso_id=curso_id).all()
+        # Obtener inscripciones al curso junto con sus estudiantes (una sola consulta)
+        inscripciones = InscripcionService.inscripciones_de_curso(curso_id)
         estudiantes = [ins.estudiante for ins in inscripciones]
 
+        # Promedios por dimensión de todo el curso en una sola consulta, pivoteados por estudiante
+        promedios = NotaIntegralService.promedios_por_curso(curso_id, materia_id, gestion_id)
+        sin_notas = dict.fromkeys(DIMENSIONES, 0)
+
         resultado = []
 
         for estudiante in estudiantes:
-            ser = getSer(estudiante.ci, gestion_id, materia_id)
-            hacer = getHacer(estudiante.ci, gestion_id, materia_id)
-            saber = getSaber(estudiante.ci, gestion_id, materia_id)
-            decidir = getDecidir(estudiante.ci, gestion_id, materia_id)            # Si alguna nota vino como error (tupla), la manejamos
-            def nota_valida(valor):
-                if isinstance(valor, dict) and "Nota" in valor:
-                    return valor["Nota"]
-                return 0  # Por defecto si hubo error
-
-            ser_nota = nota_valida(ser)
-            hacer_nota = nota_valida(hacer)
-            saber_nota = nota_valida(saber)
-            decidir_nota = nota_valida(decidir)
-
-            # Calcular nota final integral (suma directa, sin dividir)
-            # Cada dimensión ya tiene su peso correcto: ser=15, decidir=15, hacer=35, saber=35 = 100 total
-            nota_final_valor = round((ser_nota + hacer_nota + saber_nota + decidir_nota), 2)
+            notas = promedios.get(estudiante.ci, sin_notas)
 
             resultado.append({
                 "ci": estudiante.ci,
                 "nombreCompleto": estudiante.nombreCompleto,
-                "ser": ser_nota,
-                "hacer": hacer_nota,
-                "saber": saber_nota,
-                "decidir": decidir_nota,
-                "nota_final": nota_final_valor
+                "ser": notas["ser"],
+                "hacer": notas["hacer"],
+                "saber": notas["saber"],
+                "decidir": notas["decidir"],
+                "nota_final": NotaIntegralService.nota_integral(notas)
             })
 
         return resultado, 200
-
-
-def getSer(estudiante_ci, gestion_id, materia_id):
-    return NotaFinalDe(estudiante_ci, gestion_id, materia_id, "ser")
-
-def getHacer(estudiante_ci, gestion_id, materia_id):
-    return NotaFinalDe(estudiante_ci, gestion_id, materia_id, "hacer")
-
-def getDecidir(estudiante_ci, gestion_id, materia_id):
-    return NotaFinalDe(estudiante_ci, gestion_id, materia_id, "decidir")
-
-def getSaber(estudiante_ci, gestion_id, materia_id):
-    return NotaFinalDe(estudiante_ci, gestion_id, materia_id, "saber")
-
-def NotaFinalDe(estudiante_ci, gestion_id, materia_id, tipoDeEvaluacionIntegral):
-    # Buscar la EvaluacionIntegral que se llama "ser"
-    evaluacion_integral = EvaluacionIntegral.query.filter(func.lower(EvaluacionIntegral.nombre) == tipoDeEvaluacionIntegral).first()
-    if not evaluacion_integral:
-        return {"mensaje": "evaluacion integral no encontrada"}, 404
-
-    # Obtener los tipos de evaluación relacionados al SER
-    tipos_ser = TipoEvaluacion.query.filter_by(evaluacion_integral_id=evaluacion_integral.id).all()
-    tipo_ids = [tipo.id for tipo in tipos_ser]
-
-    if not tipo_ids:
-        return {"Nota": 0}, 404
-
-    # Buscar todas las evaluaciones del estudiante en esa materia y gestión que correspondan al SER
-    evaluaciones = Evaluacion.query.filter(
-        Evaluacion.estudiante_ci == estudiante_ci,
-        Evaluacion.materia_id == materia_id,
-        Evaluacion.gestion_id == gestion_id,
-        Evaluacion.tipo_evaluacion_id.in_(tipo_ids)
-    ).all()
-
-    if not evaluaciones:
-        return {"mensaje": "No se encontraron evaluaciones de la evaluacion integral"}, 404
-
-    # Calcular la suma de notas
-    suma = sum(eva.nota for eva in evaluaciones)
-    promedio = suma / len(evaluaciones)
-
-    return {"Nota": promedio}
-
-
@@ -1,30 +1,28 @@
 from ..models.Gestion_Model import Gestion
-from ..models.NotaFinal_Model import NotaFinal
-from ..models.NotaEstimada_Model import NotaEstimada
-from ..models.Estudiante_Model import Estudiante
-from ..models.TipoEvaluacion_Model import TipoEvaluacion
+from ..models.Trabajo_Model import Trabajo
 from ..schemas.Gestion_schema import GestionSchema
-from ..models.MateriaCurso_Model import MateriaCurso
-from ..models.Inscripcion_Model import Inscripcion
-from ..models.Evaluacion_Model import Evaluacion
+from ..Services.GeneracionGestionService import GeneracionGestionService
 from flask import request
 from app import db
 from flask_jwt_extended import jwt_required
 from flask_restx import Namespace, Resource
-from ..api_model.Gestion import ns, gestion_model_request, gestion_model_response
-from datetime import date 
+from ..api_model.Gestion import (
+    ns, gestion_model_request, gestion_model_response,
+    trabajo_model_response, gestion_con_trabajo_model_response
+)
+from ..api_model.parsers import listado_parser, listar_paginado
 
 gestion_schema = GestionSchema()
 gestiones_schema = GestionSchema(many=True)
 
 @ns.route('/')
 class GestionList(Resource):
-    @ns.marshal_list_with(gestion_model_response)
+    @ns.expect(listado_parser)
+    @ns.response(200, 'Success', [gestion_model_response])
     @jwt_required()
     def get(self):
         """Lista todas las gestiones"""
-        gestiones = Gestion.query.all()
-        return gestiones_schema.dump(gestiones)
+        return listar_paginado(Gestion, gestion_model_response)
 
     @ns.expect(gestion_model_request)
     @ns.marshal_with(gestion_model_response, code=201)
@@ -85,70 +83,63 @@ class GestionResource(Resource):
 @ns.route('/with-notas')
 class GestionWithNotas(Resource):
     @ns.expect(gestion_model_request)
-    @ns.marshal_with(gestion_model_response, code=201)
+    @ns.param('sincrono', 'true para generar las notas antes de responder (por defecto en segundo plano)')
+    @ns.marshal_with(gestion_con_trabajo_model_response, code=202)
     @jwt_required()
     def post(self):
         """Crea una nueva gestión y genera notas para cada estudiante en base a su curso y materias"""
         data = request.json
         nueva_gestion = gestion_schema.load(data)
+        sincrono = request.args.get('sincrono', 'false').lower() == 'true'
 
         try:
+            GeneracionGestionService.marcar_abandonados()
             db.session.add(nueva_gestion)
-            db.session.commit()  # Para obtener nueva_gestion.id
-
-            estudiantes = Estudiante.query.all()
-
-            tipoEvaluacionId = TipoEvaluacion.query.filter_by(nombre = 'Asistencia-Final').first()
-            
-            for est in estudiantes:
-                # Obtener la inscripción activa del estudiante (última o principal)
-                inscripcion = Inscripcion.query.filter_by(estudiante_ci=est.ci).order_by(Inscripcion.fecha.desc()).first()
-                if not inscripcion:
-                    continue  # Saltar si no tiene curso
-
-                curso = inscripcion.curso
-                if not curso:
-                    continue  # Saltar si no tiene curso asignado
-
-                # Obtener materias asociadas al curso
-                materias_curso = MateriaCurso.query.filter_by(curso_id=curso.id).all()
-
-                for mc in materias_curso:
-                    materia = mc.materia
-                    if not materia:
-                        continue
-
-                    nota_final = NotaFinal(
-                        valor=0.0,
-                        estudiante_ci=est.ci,
-                        gestion_id=nueva_gestion.id,
-                        materia_id=materia.id
-                    )
-                    db.session.add(nota_final)
-
-                    nota_estimada = NotaEstimada(
-                        valor_estimado=0.0,
-                        razon_estimacion="Generada automáticamente con la gestión",
-                        estudiante_ci=est.ci,
-                        gestion_id=nueva_gestion.id,
-                        materia_id=materia.id
-                    )
-                    db.session.add(nota_estimada)
-                    
-                    evaluacion = Evaluacion(
-                        descripcion="nota de asistencia final",
-                        fecha=date.today(),
-                        nota=0.0,
-                        tipo_evaluacion_id=tipoEvaluacionId.id,
-                        estudiante_ci=est.ci,
-                        materia_id=materia.id,
-                        gestion_id=nueva_gestion.id
-                    )
-                    db.session.add(evaluacion)
-
+            db.session.flush()  # Para obtener nueva_gestion.id
+            trabajo = GeneracionGestionService.crear_trabajo(nueva_gestion.id)
             db.session.commit()
-            return gestion_schema.dump(nueva_gestion), 201
-
         except Exception as e:
             db.session.rollback()
-            ns.abort(500, f"Error al crear la gestión con notas: {str(e)}")
\ No newline at end of file
+            ns.abort(500, f"Error al crear la gestión con notas: {str(e)}")
+
+        # La generación de NotaFinal, NotaEstimada y Asistencia-Final se consulta en /trabajos/<id>
+        if sincrono:
+            trabajo = GeneracionGestionService.ejecutar(trabajo.id)
+            if trabajo.estado == 'error':
+                ns.abort(500, trabajo.mensaje)
+            codigo = 201
+        else:
+            GeneracionGestionService.iniciar_en_segundo_plano(trabajo.id)
+            codigo = 202
+
+        respuesta = gestion_schema.dump(nueva_gestion)
+        respuesta['trabajo'] = datos_trabajo(trabajo)
+        return respuesta, codigo
+
+
+@ns.route('/trabajos/<int:id>')
+@ns.param('id', 'ID del trabajo')
+class TrabajoResource(Resource):
+    @ns.marshal_with(trabajo_model_response)
+    @jwt_required()
+    def get(self, id):
+        """Obtiene el estado y avance de un trabajo en segundo plano"""
+        trabajo = Trabajo.query.get_or_404(id)
+        return datos_trabajo(trabajo)
+
+
+def datos_trabajo(trabajo):
+    """Estado del trabajo con su porcentaje de avance"""
+    porcentaje = 100.0 if trabajo.estado == 'completado' else 0.0
+    if trabajo.total:
+        porcentaje = round(trabajo.procesados * 100.0 / trabajo.total, 2)
+    return {
+        'id': trabajo.id,
+        'tipo': trabajo.tipo,
+        'estado': trabajo.estado,
+        'total': trabajo.total,
+        'procesados': trabajo.procesados,
+        'porcentaje': porcentaje,
+        'mensaje': trabajo.mensaje,
+        'gestion_id': trabajo.gestion_id
+    }
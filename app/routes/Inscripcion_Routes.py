@@ -5,18 +5,20 @@ from app import db
 from flask_jwt_extended import jwt_required
 from flask_restx import Namespace, Resource
 from ..api_model.Inscripcion import ns, inscripcion_model_request, inscripcion_model_response
+from ..api_model.parsers import listado_parser, listar_paginado
+from ..Services.RosterService import RosterService
 
 inscripcion_schema = InscripcionSchema()
 inscripciones_schema = InscripcionSchema(many=True)
 
 @ns.route('/')
 class InscripcionList(Resource):
-    @ns.marshal_list_with(inscripcion_model_response)
+    @ns.expect(listado_parser)
+    @ns.response(200, 'Success', [inscripcion_model_response])
     @jwt_required()
     def get(self):
         """Lista todas las inscripciones"""
-        inscripciones = Inscripcion.query.all()
-        return inscripciones_schema.dump(inscripciones)
+        return listar_paginado(Inscripcion, inscripcion_model_response)
 
     @ns.expect(inscripcion_model_request)
     @ns.marshal_with(inscripcion_model_response, code=201)
@@ -27,6 +29,8 @@ class InscripcionList(Resource):
         nueva_inscripcion = inscripcion_schema.load(data)
         try:
             db.session.add(nueva_inscripcion)
+            db.session.flush()
+            RosterService.refrescar(curso_ids=[nueva_inscripcion.curso_id])
             db.session.commit()
             return inscripcion_schema.dump(nueva_inscripcion), 201
         except Exception as e:
@@ -50,12 +54,15 @@ class InscripcionResource(Resource):
         """Actualiza una inscripción por ID"""
         inscripcion = Inscripcion.query.get_or_404(id)
         data = request.json
+        curso_anterior = inscripcion.curso_id
 
         for key, value in data.items():
             if hasattr(inscripcion, key):
                 setattr(inscripcion, key, value)
 
         try:
+            db.session.flush()
+            RosterService.refrescar(curso_ids={curso_anterior, inscripcion.curso_id} - {None})
             db.session.commit()
             return inscripcion_schema.dump(inscripcion)
         except Exception as e:
@@ -67,7 +74,10 @@ class InscripcionResource(Resource):
         """Elimina una inscripción por ID"""
         inscripcion = Inscripcion.query.get_or_404(id)
         try:
+            curso_id = inscripcion.curso_id
             db.session.delete(inscripcion)
+            db.session.flush()
+            RosterService.refrescar(curso_ids=[curso_id])
             db.session.commit()
             return {"message": "Inscripción eliminada correctamente"}, 200
         except Exception as e:
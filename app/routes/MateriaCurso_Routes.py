@@ -5,18 +5,20 @@ from app import db
 from flask_jwt_extended import jwt_required
 from flask_restx import Namespace, Resource
 from ..api_model.MateriaCurso import ns, materia_curso_model_request, materia_curso_model_response
+from ..api_model.parsers import listado_parser, listar_paginado
+from ..Services.RosterService import RosterService
 
 materia_curso_schema = MateriaCursoSchema()
 materias_curso_schema = MateriaCursoSchema(many=True)
 
 @ns.route('/')
 class MateriaCursoList(Resource):
-    @ns.marshal_list_with(materia_curso_model_response)
+    @ns.expect(listado_parser)
+    @ns.response(200, 'Success', [materia_curso_model_response])
     @jwt_required()
     def get(self):
         """Lista todas las materias asignadas a cursos"""
-        materias_curso = MateriaCurso.query.all()
-        return materias_curso_schema.dump(materias_curso)
+        return listar_paginado(MateriaCurso, materia_curso_model_response)
 
     @ns.expect(materia_curso_model_request)
     @ns.marshal_with(materia_curso_model_response, code=201)
@@ -27,6 +29,8 @@ class MateriaCursoList(Resource):
         nueva_asignacion = materia_curso_schema.load(data)
         try:
             db.session.add(nueva_asignacion)
+            db.session.flush()
+            RosterService.refrescar(curso_ids=[nueva_asignacion.curso_id])
             db.session.commit()
             return materia_curso_schema.dump(nueva_asignacion), 201
         except Exception as e:
@@ -50,12 +54,15 @@ class MateriaCursoResource(Resource):
         """Actualiza una asignación por ID"""
         asignacion = MateriaCurso.query.get_or_404(id)
         data = request.json
+        curso_anterior = asignacion.curso_id
 
         for key, value in data.items():
             if hasattr(asignacion, key):
                 setattr(asignacion, key, value)
 
         try:
+            db.session.flush()
+            RosterService.refrescar(curso_ids={curso_anterior, asignacion.curso_id} - {None})
             db.session.commit()
             return materia_curso_schema.dump(asignacion)
         except Exception as e:
@@ -67,7 +74,10 @@ class MateriaCursoResource(Resource):
         """Elimina una asignación por ID"""
         asignacion = MateriaCurso.query.get_or_404(id)
         try:
+            curso_id = asignacion.curso_id
             db.session.delete(asignacion)
+            db.session.flush()
+            RosterService.refrescar(curso_ids=[curso_id])
             db.session.commit()
             return {"message": "Asignación eliminada correctamente"}, 200
         except Exception as e:
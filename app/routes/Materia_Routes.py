@@ -5,18 +5,19 @@ from app import db
 from flask_jwt_extended import jwt_required
 from flask_restx import Namespace, Resource
 from ..api_model.Materia import ns, materia_model_request, materia_model_response
+from ..api_model.parsers import listado_parser, listar_paginado
 
 materia_schema = MateriaSchema()
 materias_schema = MateriaSchema(many=True)
 
 @ns.route('/')
 class MateriaList(Resource):
-    @ns.marshal_list_with(materia_model_response)
+    @ns.expect(listado_parser)
+    @ns.response(200, 'Success', [materia_model_response])
     @jwt_required()
     def get(self):
         """Lista todas las materias"""
-        materias = Materia.query.all()
-        return materias_schema.dump(materias)
+        return listar_paginado(Materia, materia_model_response)
 
     @ns.expect(materia_model_request)
     @ns.marshal_with(materia_model_response, code=201)
@@ -5,18 +5,20 @@ from app import db
 from flask_jwt_extended import jwt_required
 from flask_restx import Namespace, Resource
 from ..api_model.NotaEstimada import ns, nota_estimada_model_request, nota_estimada_model_response
+from ..api_model.parsers import listado_parser, listar_paginado, exportacion_parser
+from ..Services.ExportacionService import ExportacionService
 
 nota_estimada_schema = NotaEstimadaSchema()
 notas_estimadas_schema = NotaEstimadaSchema(many=True)
 
 @ns.route('/')
 class NotaEstimadaList(Resource):
-    @ns.marshal_list_with(nota_estimada_model_response)
+    @ns.expect(listado_parser)
+    @ns.response(200, 'Success', [nota_estimada_model_response])
     @jwt_required()
     def get(self):
         """Lista todas las notas estimadas"""
-        notas = NotaEstimada.query.all()
-        return notas_estimadas_schema.dump(notas)
+        return listar_paginado(NotaEstimada, nota_estimada_model_response)
 
     @ns.expect(nota_estimada_model_request)
     @ns.marshal_with(nota_estimada_model_response, code=201)
@@ -34,6 +36,24 @@ class NotaEstimadaList(Resource):
             ns.abort(500, f"Error al crear la nota estimada: {str(e)}")
 
 
+@ns.route('/export')
+class NotaEstimadaExport(Resource):
+    @ns.expect(exportacion_parser)
+    @ns.produces(['application/x-ndjson', 'text/csv'])
+    @jwt_required()
+    def get(self):
+        """Exporta las notas estimadas por streaming (NDJSON o CSV), filtrables por gestión, curso y materia"""
+        args = exportacion_parser.parse_args()
+        consulta = ExportacionService.consulta(
+            NotaEstimada,
+            gestion_id=args['gestion_id'],
+            curso_id=args['curso_id'],
+            materia_id=args['materia_id'],
+            estudiante_ci=args['estudiante_ci']
+        )
+        return ExportacionService.respuesta(consulta, args['formato'], 'notas_estimadas')
+
+
 @ns.route('/<int:id>')
 @ns.param('id', 'ID de la nota estimada')
 class NotaEstimadaResource(Resource):
@@ -6,6 +6,9 @@ from app import db
 from flask_jwt_extended import jwt_required
 from flask_restx import Namespace, Resource
 from ..api_model.NotaFinal import ns, nota_final_model_request, nota_final_model_response
+from ..api_model.parsers import listado_parser, listar_paginado, exportacion_parser
+from ..Services.ExportacionService import ExportacionService
+from ..Services.AnaliticaService import AnaliticaService
 from ..ml.notas_prediction_service import notas_prediction_service
 import logging
 
@@ -16,12 +19,12 @@ notas_finales_schema = NotaFinalSchema(many=True)
 
 @ns.route('/')
 class NotaFinalList(Resource):
-    @ns.marshal_list_with(nota_final_model_response)
+    @ns.expect(listado_parser)
+    @ns.response(200, 'Success', [nota_final_model_response])
     @jwt_required()
     def get(self):
         """Lista todas las notas finales"""
-        notas = NotaFinal.query.all()
-        return notas_finales_schema.dump(notas)
+        return listar_paginado(NotaFinal, nota_final_model_response)
     
     @ns.expect(nota_final_model_request)
     @ns.marshal_with(nota_final_model_response, code=201)
@@ -33,6 +36,7 @@ class NotaFinalList(Resource):
         try:
             # Guardar la nota final
             db.session.add(nueva_nota)
+            AnaliticaService.marcar([(nueva_nota.gestion_id, nueva_nota.materia_id)])
             db.session.commit()
             
             # Predecir y actualizar nota estimada usando ML
@@ -47,6 +51,24 @@ class NotaFinalList(Resource):
             ns.abort(500, f"Error al crear la nota final: {str(e)}")
 
 
+@ns.route('/export')
+class NotaFinalExport(Resource):
+    @ns.expect(exportacion_parser)
+    @ns.produces(['application/x-ndjson', 'text/csv'])
+    @jwt_required()
+    def get(self):
+        """Exporta las notas finales por streaming (NDJSON o CSV), filtrables por gestión, curso y materia"""
+        args = exportacion_parser.parse_args()
+        consulta = ExportacionService.consulta(
+            NotaFinal,
+            gestion_id=args['gestion_id'],
+            curso_id=args['curso_id'],
+            materia_id=args['materia_id'],
+            estudiante_ci=args['estudiante_ci']
+        )
+        return ExportacionService.respuesta(consulta, args['formato'], 'notas_finales')
+
+
 @ns.route('/<int:id>')
 @ns.param('id', 'ID de la nota final')
 class NotaFinalResource(Resource):
@@ -63,12 +85,14 @@ class NotaFinalResource(Resource):
         """Actualiza una nota final por ID"""
         nota = NotaFinal.query.get_or_404(id)
         data = request.json
+        clave_anterior = (nota.gestion_id, nota.materia_id)
 
         for key, value in data.items():
             if hasattr(nota, key):
                 setattr(nota, key, value)
 
         try:
+            AnaliticaService.marcar([clave_anterior, (nota.gestion_id, nota.materia_id)])
             db.session.commit()
             return nota_final_schema.dump(nota)
         except Exception as e:
@@ -81,6 +105,7 @@ class NotaFinalResource(Resource):
         nota = NotaFinal.query.get_or_404(id)
         try:
             db.session.delete(nota)
+            AnaliticaService.marcar([(nota.gestion_id, nota.materia_id)])
             db.session.commit()
             return {"message": "Nota final eliminada correctamente"}, 200
         except Exception as e:
@@ -1,22 +1,24 @@
 from ..models.TipoEvaluacion_Model import TipoEvaluacion
 from ..schemas.TipoEvaluacion_schema import TipoEvaluacionSchema
+from ..Services.CatalogoEvaluacionService import CatalogoEvaluacionService
 from flask import request
 from app import db
 from flask_jwt_extended import jwt_required
 from flask_restx import Namespace, Resource
 from ..api_model.TipoEvaluacion import ns, tipo_evaluacion_model_request, tipo_evaluacion_model_response
+from ..api_model.parsers import listado_parser, listar_paginado
 
 tipo_evaluacion_schema = TipoEvaluacionSchema()
 tipo_evaluaciones_schema = TipoEvaluacionSchema(many=True)
 
 @ns.route('/')
 class TipoEvaluacionList(Resource):
-    @ns.marshal_list_with(tipo_evaluacion_model_response)
+    @ns.expect(listado_parser)
+    @ns.response(200, 'Success', [tipo_evaluacion_model_response])
     @jwt_required()
     def get(self):
         """Lista todos los tipos de evaluación"""
-        tipos = TipoEvaluacion.query.all()
-        return tipo_evaluaciones_schema.dump(tipos)
+        return listar_paginado(TipoEvaluacion, tipo_evaluacion_model_response)
 
     @ns.expect(tipo_evaluacion_model_request)
     @ns.marshal_with(tipo_evaluacion_model_response, code=201)
@@ -28,6 +30,7 @@ class TipoEvaluacionList(Resource):
         try:
             db.session.add(nuevo_tipo)
             db.session.commit()
+            CatalogoEvaluacionService.invalidar()
             return tipo_evaluacion_schema.dump(nuevo_tipo), 201
         except Exception as e:
             db.session.rollback()
@@ -56,6 +59,7 @@ class TipoEvaluacionResource(Resource):
 
         try:
             db.session.commit()
+            CatalogoEvaluacionService.invalidar()
             return tipo_evaluacion_schema.dump(tipo)
         except Exception as e:
             db.session.rollback()
@@ -68,6 +72,7 @@ class TipoEvaluacionResource(Resource):
         try:
             db.session.delete(tipo)
             db.session.commit()
+            CatalogoEvaluacionService.invalidar()
             return {"message": "Tipo de evaluación eliminado correctamente"}, 200
         except Exception as e:
             db.session.rollback()
@@ -22,6 +22,7 @@ from app.models.Estudiante_Model import Estudiante
 from app.models.Inscripcion_Model import Inscripcion
 from app.models.MateriaCurso_Model import MateriaCurso
 from app.models.Evaluacion_Model import Evaluacion
+from app.Services.AcumuladoEvaluacionService import AcumuladoEvaluacionService
 from app.models.NotaFinal_Model import NotaFinal
 from app.models.NotaEstimada_Model import NotaEstimada
 from app.models.TipoEvaluacion_Model import TipoEvaluacion
@@ -338,6 +339,7 @@ def generar_evaluaciones_completas(gestion_id, fecha_inicio, fecha_fin):
                     db.session.add(asistencia_final)
                     asistencias_finales += 1
         
+        AcumuladoEvaluacionService.invalidar(gestion_ids=[gestion_id])  # se reconstruyen al próximo cambio
         db.session.commit()
         print(f"      ✅ Evaluaciones: {evaluaciones_creadas:,}")
         print(f"      ✅ Asistencias finales: {asistencias_finales:,}")
@@ -20,6 +20,7 @@ from app.models.Materia_Model import Materia
 from app.models.MateriaCurso_Model import MateriaCurso
 from app.models.Gestion_Model import Gestion
 from app.models.Evaluacion_Model import Evaluacion
+from app.Services.AcumuladoEvaluacionService import AcumuladoEvaluacionService
 from app.models.TipoEvaluacion_Model import TipoEvaluacion
 from app.models.NotaFinal_Model import NotaFinal
 from app.extensions import db
@@ -172,6 +173,7 @@ def generar_evaluaciones_segundo_trimestre():
                     print(f"  👥 Procesados: {estudiantes_procesados}/{len(estudiantes_2024)} estudiantes")
             
             # Commit final
+            AcumuladoEvaluacionService.invalidar(gestion_ids=[gestion_2.id])  # se reconstruyen al próximo cambio
             db.session.commit()
             print(f"\n✅ SEGUNDO TRIMESTRE COMPLETADO:")
             print(f"  📝 Evaluaciones creadas: {evaluaciones_creadas}")
@@ -243,6 +245,7 @@ def calcular_notas_finales_optimizado(gestion_id, tipo_asistencia_final_id):
                     nota_final_obj.valor = nota_final
                     notas_actualizadas += 1
         
+        AcumuladoEvaluacionService.invalidar(gestion_ids=[gestion_id])  # se reconstruyen al próximo cambio
         db.session.commit()
         print(f"  ✅ Notas finales actualizadas: {notas_actualizadas}")
         
@@ -20,6 +20,7 @@ from app.models.Materia_Model import Materia
 from app.models.MateriaCurso_Model import MateriaCurso
 from app.models.Gestion_Model import Gestion
 from app.models.Evaluacion_Model import Evaluacion
+from app.Services.AcumuladoEvaluacionService import AcumuladoEvaluacionService
 from app.models.TipoEvaluacion_Model import TipoEvaluacion
 from app.models.NotaFinal_Model import NotaFinal
 from app.models.NotaEstimada_Model import NotaEstimada
@@ -291,6 +292,7 @@ def crear_estructura_notas_2025(gestion_id):
                     db.session.add(evaluacion)
                     evaluaciones_basicas_creadas += 1
         
+        AcumuladoEvaluacionService.invalidar(gestion_ids=[gestion_id])  # se reconstruyen al próximo cambio
         db.session.commit()
         print(f"  ✅ NotaFinal creadas: {notas_finales_creadas}")
         print(f"  ✅ NotaEstimada creadas: {notas_estimadas_creadas}")
@@ -7,6 +7,7 @@ Se puede ejecutar en paralelo con los otros scripts de trimestres
 from app import create_app, db
 from app.models.Gestion_Model import Gestion
 from app.models.Evaluacion_Model import Evaluacion
+from app.Services.AcumuladoEvaluacionService import AcumuladoEvaluacionService
 from app.models.Inscripcion_Model import Inscripcion
 from app.models.MateriaCurso_Model import MateriaCurso
 from app.models.TipoEvaluacion_Model import TipoEvaluacion
@@ -233,6 +234,7 @@ def crear_evaluaciones_primer_trimestre():
                     print(f"  Procesados {idx + 1}/{len(inscripciones_2023)} estudiantes")
             
             # Commit final
+            AcumuladoEvaluacionService.invalidar(gestion_ids=[gestion_id])  # se reconstruyen al próximo cambio
             db.session.commit()
             
             # Estadísticas finales
@@ -12,7 +12,9 @@ from ..models.DocenteMateria_Model import DocenteMateria
 from ..models.Evaluacion_Model import Evaluacion
 from ..models.NotaFinal_Model import NotaFinal
 from ..models.NotaEstimada_Model import NotaEstimada
+from ..Services.AcumuladoEvaluacionService import AcumuladoEvaluacionService
 from datetime import date, timedelta
+from sqlalchemy.orm import joinedload
 import random
 from werkzeug.security import generate_password_hash
 from app import db
@@ -854,6 +856,7 @@ def generar_evaluaciones_trimestre(gestion_id, fecha_inicio, fecha_fin, trimestr
                 # Actualizar nota final después de completar todas las evaluaciones de esta materia
                 actualizar_nota_final_automatica(estudiante.ci, gestion_id, materia.id)
         
+        AcumuladoEvaluacionService.invalidar(gestion_ids=[gestion_id])  # se reconstruyen al próximo cambio
         db.session.commit()
         print(f"    ✅ Evaluaciones académicas creadas: {evaluaciones_creadas}")
         print(f"    ✅ Notas finales actualizadas automáticamente")
@@ -946,6 +949,7 @@ def generar_asistencias_diarias(gestion_id, fecha_inicio, fecha_fin):
                 # Actualizar nota final automáticamente (simula endpoint POST)
                 actualizar_nota_final_automatica(estudiante.ci, gestion_id, materia.id)
         
+        AcumuladoEvaluacionService.invalidar(gestion_ids=[gestion_id])  # se reconstruyen al próximo cambio
         db.session.commit()
         print(f"    ✅ Asistencias diarias: {asistencias_creadas}")
         print(f"    ✅ Asistencias finales: {asistencias_finales_creadas}")
@@ -1015,7 +1019,10 @@ def crear_gestion_con_notas(anio, periodo):
         
         # Obtener estudiantes inscritos en 2025 (buscar por fecha de inscripción)
         fecha_2025 = date(2025, 2, 1)
-        inscripciones_2025 = Inscripcion.query.filter_by(fecha=fecha_2025).all()
+        inscripciones_2025 = Inscripcion.query.options(
+            joinedload(Inscripcion.estudiante),
+            joinedload(Inscripcion.curso)
+        ).filter_by(fecha=fecha_2025).all()
         
         print(f"  📋 Encontradas {len(inscripciones_2025)} inscripciones para 2025")
         
@@ -1069,6 +1076,7 @@ def crear_gestion_con_notas(anio, periodo):
                 db.session.add(evaluacion)
                 evaluaciones_creadas += 1
 
+        AcumuladoEvaluacionService.invalidar(gestion_ids=[nueva_gestion.id])  # se reconstruyen al próximo cambio
         db.session.commit()
         print(f"  ✓ Notas creadas: {notas_creadas} (NotaFinal + NotaEstimada)")
         print(f"  ✓ Evaluaciones básicas: {evaluaciones_creadas}")
@@ -0,0 +1,99 @@
+"""indices y restricciones unicas de las tablas de notas
+
+Primera revisión versionada. El esquema base sigue creándose con db.create_all()
+en create_app, por lo que esta migración solo agrega lo que falta sobre una base
+existente (y crea acumulado_evaluacion si la base es anterior a esa tabla).
+
+Antes de crear las restricciones únicas de nota_final y nota_estimada se eliminan
+las filas repetidas por (estudiante_ci, materia_id, gestion_id), conservando la de
+menor id, que es la que leen y actualizan los endpoints.
+
+Revision ID: 3f2a9c4d1b7e
+Revises:
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f2a9c4d1b7e'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+INDICES = [
+    ('ix_evaluacion_clave', 'evaluacion', ['estudiante_ci', 'materia_id', 'gestion_id', 'tipo_evaluacion_id']),
+    ('ix_evaluacion_gestion_tipo', 'evaluacion', ['gestion_id', 'tipo_evaluacion_id']),
+    ('ix_inscripcion_curso_id', 'inscripcion', ['curso_id']),
+    ('ix_inscripcion_estudiante_ci', 'inscripcion', ['estudiante_ci']),
+    ('ix_materia_curso_curso_id', 'materia_curso', ['curso_id']),
+    ('ix_docente_materia_docente_ci', 'docente_materia', ['docente_ci']),
+]
+
+RESTRICCIONES_UNICAS = [
+    ('uq_nota_final_clave', 'nota_final'),
+    ('uq_nota_estimada_clave', 'nota_estimada'),
+]
+
+CLAVE = ['estudiante_ci', 'materia_id', 'gestion_id']
+
+
+def _eliminar_repetidas(tabla):
+    op.execute(sa.text(f"""
+        DELETE FROM {tabla}
+        WHERE estudiante_ci IS NOT NULL
+          AND materia_id IS NOT NULL
+          AND gestion_id IS NOT NULL
+          AND id NOT IN (
+              SELECT MIN(id) FROM {tabla}
+              GROUP BY estudiante_ci, materia_id, gestion_id
+          )
+    """))
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+
+    if not inspector.has_table('acumulado_evaluacion'):
+        op.create_table(
+            'acumulado_evaluacion',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('suma', sa.Float(), nullable=False),
+            sa.Column('cantidad', sa.Integer(), nullable=False),
+            sa.Column('estudiante_ci', sa.Integer(), nullable=False),
+            sa.Column('materia_id', sa.Integer(), nullable=False),
+            sa.Column('gestion_id', sa.Integer(), nullable=False),
+            sa.Column('tipo_evaluacion_id', sa.Integer(), nullable=False),
+            sa.ForeignKeyConstraint(['estudiante_ci'], ['estudiante.ci']),
+            sa.ForeignKeyConstraint(['gestion_id'], ['gestion.id']),
+            sa.ForeignKeyConstraint(['materia_id'], ['materia.id']),
+            sa.ForeignKeyConstraint(['tipo_evaluacion_id'], ['tipo_evaluacion.id']),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('estudiante_ci', 'materia_id', 'gestion_id', 'tipo_evaluacion_id',
+                                name='uq_acumulado_evaluacion_clave')
+        )
+
+    for nombre, tabla, columnas in INDICES:
+        op.create_index(nombre, tabla, columnas, unique=False, if_not_exists=True)
+
+    for nombre, tabla in RESTRICCIONES_UNICAS:
+        existentes = {uq['name'] for uq in inspector.get_unique_constraints(tabla)}
+        if nombre in existentes:
+            continue
+        _eliminar_repetidas(tabla)
+        with op.batch_alter_table(tabla) as batch_op:
+            batch_op.create_unique_constraint(nombre, CLAVE)
+
+
+def downgrade():
+    for nombre, tabla in reversed(RESTRICCIONES_UNICAS):
+        with op.batch_alter_table(tabla) as batch_op:
+            batch_op.drop_constraint(nombre, type_='unique')
+
+    for nombre, tabla, _ in reversed(INDICES):
+        op.drop_index(nombre, table_name=tabla, if_exists=True)
+
+    # acumulado_evaluacion se conserva: también la crea db.create_all()
@@ -0,0 +1,43 @@
+"""tabla trabajo para procesos en segundo plano
+
+Registra el estado y avance de procesos largos, como la generación de notas
+de una gestión nueva (POST /Gestion/with-notas).
+
+Revision ID: 8c1d5e7a9f20
+Revises: 3f2a9c4d1b7e
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8c1d5e7a9f20'
+down_revision = '3f2a9c4d1b7e'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+
+    if not inspector.has_table('trabajo'):
+        op.create_table(
+            'trabajo',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('tipo', sa.String(length=50), nullable=False),
+            sa.Column('estado', sa.String(length=20), nullable=False),
+            sa.Column('total', sa.Integer(), nullable=False),
+            sa.Column('procesados', sa.Integer(), nullable=False),
+            sa.Column('mensaje', sa.Text(), nullable=True),
+            sa.Column('creado', sa.DateTime(), nullable=True),
+            sa.Column('actualizado', sa.DateTime(), nullable=True),
+            sa.Column('gestion_id', sa.Integer(), nullable=True),
+            sa.ForeignKeyConstraint(['gestion_id'], ['gestion.id'], ondelete='SET NULL'),
+            sa.PrimaryKeyConstraint('id')
+        )
+
+
+def downgrade():
+    op.drop_table('trabajo', if_exists=True)
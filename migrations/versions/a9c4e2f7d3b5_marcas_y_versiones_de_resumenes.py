@@ -0,0 +1,63 @@
+"""marcas de resumen_pendiente únicas y tabla resumen_version
+
+Cada cambio de notas marcaba su (gestión, materia) con un INSERT nuevo, así que
+resumen_pendiente crecía con cada escritura. Se eliminan las marcas repetidas y se
+agregan las claves únicas sobre las que AnaliticaService.marcar hace el upsert:
+(gestion_id, materia_id) y gestion_id cuando materia_id es nulo (gestión completa).
+
+Agrega resumen_version, la versión por gestión que cambia en cada recálculo y con la
+que las cachés en memoria de cada worker comprueban si siguen vigentes.
+
+Revision ID: a9c4e2f7d3b5
+Revises: e2b6d4f8a1c9
+Create Date: 2026-10-17 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a9c4e2f7d3b5'
+down_revision = 'e2b6d4f8a1c9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+
+    op.execute(sa.text("""
+        DELETE FROM resumen_pendiente
+        WHERE id NOT IN (
+            SELECT MIN(id) FROM resumen_pendiente
+            GROUP BY gestion_id, materia_id
+        )
+    """))
+
+    unicas = {restriccion['name'] for restriccion in inspector.get_unique_constraints('resumen_pendiente')}
+    if 'uq_resumen_pendiente_clave' not in unicas:
+        with op.batch_alter_table('resumen_pendiente') as batch_op:
+            batch_op.create_unique_constraint('uq_resumen_pendiente_clave', ['gestion_id', 'materia_id'])
+
+    indices = {indice['name'] for indice in inspector.get_indexes('resumen_pendiente')}
+    if 'uq_resumen_pendiente_gestion' not in indices:
+        op.create_index(
+            'uq_resumen_pendiente_gestion', 'resumen_pendiente', ['gestion_id'], unique=True,
+            postgresql_where=sa.text('materia_id IS NULL'), sqlite_where=sa.text('materia_id IS NULL')
+        )
+
+    if not inspector.has_table('resumen_version'):
+        op.create_table(
+            'resumen_version',
+            sa.Column('gestion_id', sa.Integer(), autoincrement=False, nullable=False),
+            sa.Column('version', sa.BigInteger(), nullable=False),
+            sa.PrimaryKeyConstraint('gestion_id')
+        )
+
+
+def downgrade():
+    op.drop_table('resumen_version', if_exists=True)
+    op.drop_index('uq_resumen_pendiente_gestion', table_name='resumen_pendiente', if_exists=True)
+    with op.batch_alter_table('resumen_pendiente') as batch_op:
+        batch_op.drop_constraint('uq_resumen_pendiente_clave', type_='unique')
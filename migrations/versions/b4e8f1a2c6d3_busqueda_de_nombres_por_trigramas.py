@@ -0,0 +1,56 @@
+"""busqueda de nombres por trigramas (solo PostgreSQL)
+
+Crea las extensiones pg_trgm y unaccent, la función inmutable f_unaccent (unaccent
+no lo es, y un índice por expresión la necesita) y los índices GIN de trigramas
+sobre f_unaccent(lower(nombreCompleto)) de estudiante y docente, que usa
+BusquedaNombreService para /Estudiantes/buscar y /Docentes/buscar.
+
+En otros motores no hace nada: la búsqueda usa un índice en memoria.
+
+Revision ID: b4e8f1a2c6d3
+Revises: 8c1d5e7a9f20
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b4e8f1a2c6d3'
+down_revision = '8c1d5e7a9f20'
+branch_labels = None
+depends_on = None
+
+
+INDICES = [
+    ('ix_estudiante_nombre_trgm', 'estudiante'),
+    ('ix_docente_nombre_trgm', 'docente'),
+]
+
+
+def upgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute(sa.text('CREATE EXTENSION IF NOT EXISTS pg_trgm'))
+    op.execute(sa.text('CREATE EXTENSION IF NOT EXISTS unaccent'))
+    op.execute(sa.text("""
+        CREATE OR REPLACE FUNCTION f_unaccent(text) RETURNS text
+        LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT
+        AS $$ SELECT public.unaccent('public.unaccent', $1) $$
+    """))
+    for nombre, tabla in INDICES:
+        op.execute(sa.text(
+            f'CREATE INDEX IF NOT EXISTS {nombre} ON {tabla} '
+            f'USING gin (f_unaccent(lower("nombreCompleto")) gin_trgm_ops)'
+        ))
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    for nombre, _ in reversed(INDICES):
+        op.execute(sa.text(f'DROP INDEX IF EXISTS {nombre}'))
+    op.execute(sa.text('DROP FUNCTION IF EXISTS f_unaccent(text)'))
@@ -0,0 +1,65 @@
+"""tabla roster de estudiantes por docente, materia, curso y año
+
+Lista materializada que usan filtrar-estudiantes y los boletines filtrados. Se
+llena con INSERT ... SELECT desde docente_materia, materia_curso e inscripcion;
+después la mantienen las rutas que modifican esas tablas (RosterService).
+
+Revision ID: d7a3c9e5b1f8
+Revises: b4e8f1a2c6d3
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd7a3c9e5b1f8'
+down_revision = 'b4e8f1a2c6d3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+
+    if not inspector.has_table('roster'):
+        op.create_table(
+            'roster',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('docente_ci', sa.Integer(), nullable=False),
+            sa.Column('materia_id', sa.Integer(), nullable=False),
+            sa.Column('curso_id', sa.Integer(), nullable=False),
+            sa.Column('estudiante_ci', sa.Integer(), nullable=False),
+            sa.Column('nombre', sa.String(length=50), nullable=True),
+            sa.Column('anio', sa.Integer(), nullable=True),
+            sa.Column('orden', sa.Integer(), nullable=False),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('docente_ci', 'materia_id', 'curso_id', 'anio', 'estudiante_ci',
+                                name='uq_roster_clave')
+        )
+        op.create_index('ix_roster_lista', 'roster',
+                        ['docente_ci', 'materia_id', 'curso_id', 'anio', 'orden'], unique=False)
+        op.create_index('ix_roster_curso', 'roster', ['curso_id'], unique=False)
+        op.create_index('ix_roster_estudiante', 'roster', ['estudiante_ci'], unique=False)
+
+    anio = 'CAST(EXTRACT(YEAR FROM i.fecha) AS INTEGER)'
+    if op.get_bind().dialect.name == 'sqlite':
+        anio = "CAST(STRFTIME('%Y', i.fecha) AS INTEGER)"
+
+    op.execute(sa.text('DELETE FROM roster'))
+    op.execute(sa.text(f"""
+        INSERT INTO roster (docente_ci, materia_id, curso_id, estudiante_ci, nombre, anio, orden)
+        SELECT dm.docente_ci, dm.materia_id, mc.curso_id, i.estudiante_ci, e."nombreCompleto",
+               {anio}, MIN(i.id)
+        FROM docente_materia dm
+        JOIN materia_curso mc ON mc.materia_id = dm.materia_id
+        JOIN inscripcion i ON i.curso_id = mc.curso_id
+        JOIN estudiante e ON e.ci = i.estudiante_ci
+        WHERE dm.docente_ci IS NOT NULL
+        GROUP BY dm.docente_ci, dm.materia_id, mc.curso_id, i.estudiante_ci, e."nombreCompleto", {anio}
+    """))
+
+
+def downgrade():
+    op.drop_table('roster', if_exists=True)
@@ -0,0 +1,97 @@
+"""resúmenes materializados para los dashboards
+
+Tablas resumen_materia, resumen_nota_final y resumen_asistencia (agregados por
+gestión y materia que leen los dashboards) y resumen_pendiente (pares por
+recalcular). Se llenan desde la aplicación con `flask api refresh-analytics --all`
+o al iniciar si están vacías (AnaliticaService). Agrega el índice por gestión y
+materia de evaluacion que usa el recálculo.
+
+Revision ID: e2b6d4f8a1c9
+Revises: d7a3c9e5b1f8
+Create Date: 2026-10-17 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2b6d4f8a1c9'
+down_revision = 'd7a3c9e5b1f8'
+branch_labels = None
+depends_on = None
+
+
+def _conteos():
+    return [
+        sa.Column(nombre, sa.Integer(), nullable=False)
+        for nombre in ('estudiantes', 'excelente', 'buena', 'regular', 'deficiente')
+    ]
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+
+    if not inspector.has_table('resumen_materia'):
+        op.create_table(
+            'resumen_materia',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('gestion_id', sa.Integer(), nullable=False),
+            sa.Column('materia_id', sa.Integer(), nullable=False),
+            sa.Column('tipo_evaluacion_id', sa.Integer(), nullable=False),
+            sa.Column('cantidad', sa.Integer(), nullable=False),
+            sa.Column('suma', sa.Float(), nullable=False),
+            sa.Column('minimo', sa.Float(), nullable=True),
+            sa.Column('maximo', sa.Float(), nullable=True),
+            *_conteos(),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('gestion_id', 'materia_id', 'tipo_evaluacion_id', name='uq_resumen_materia_clave')
+        )
+
+    if not inspector.has_table('resumen_nota_final'):
+        op.create_table(
+            'resumen_nota_final',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('gestion_id', sa.Integer(), nullable=False),
+            sa.Column('materia_id', sa.Integer(), nullable=False),
+            sa.Column('cantidad', sa.Integer(), nullable=False),
+            sa.Column('suma', sa.Float(), nullable=False),
+            sa.Column('minimo', sa.Float(), nullable=True),
+            sa.Column('maximo', sa.Float(), nullable=True),
+            sa.Column('aprobados', sa.Integer(), nullable=False),
+            sa.Column('reprobados', sa.Integer(), nullable=False),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('gestion_id', 'materia_id', name='uq_resumen_nota_final_clave')
+        )
+
+    if not inspector.has_table('resumen_asistencia'):
+        op.create_table(
+            'resumen_asistencia',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('gestion_id', sa.Integer(), nullable=False),
+            sa.Column('cantidad', sa.Integer(), nullable=False),
+            sa.Column('suma', sa.Float(), nullable=False),
+            *_conteos(),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('gestion_id')
+        )
+
+    if not inspector.has_table('resumen_pendiente'):
+        op.create_table(
+            'resumen_pendiente',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('gestion_id', sa.Integer(), nullable=False),
+            sa.Column('materia_id', sa.Integer(), nullable=True),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index('ix_resumen_pendiente_gestion_id', 'resumen_pendiente', ['gestion_id'], unique=False)
+
+    indices = {indice['name'] for indice in inspector.get_indexes('evaluacion')}
+    if 'ix_evaluacion_gestion_materia' not in indices:
+        op.create_index('ix_evaluacion_gestion_materia', 'evaluacion', ['gestion_id', 'materia_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_evaluacion_gestion_materia', table_name='evaluacion', if_exists=True)
+    for tabla in ('resumen_pendiente', 'resumen_asistencia', 'resumen_nota_final', 'resumen_materia'):
+        op.drop_table(tabla, if_exists=True)
@@ -10,6 +10,7 @@ import pandas as pd
 from pathlib import Path
 from datetime import datetime
 import logging
+from sqlalchemy import func
 
 # Add the project root to the path to import app modules
 sys.path.append(str(Path(__file__).parent.parent.parent))
@@ -40,6 +41,13 @@ class SimpleDataExtractor:
                 # Query students with their enrollments
                 students = db.session.query(Estudiante).all()
                 
+                # Count enrollments for all students in one GROUP BY query
+                enrollment_counts = dict(
+                    db.session.query(Inscripcion.estudiante_ci, func.count(Inscripcion.id))
+                    .group_by(Inscripcion.estudiante_ci)
+                    .all()
+                )
+                
                 # Convert to DataFrame
                 data = []
                 for student in students:
@@ -48,8 +56,7 @@ class SimpleDataExtractor:
                     if student.fechaNacimiento:
                         age = (datetime.now().date() - student.fechaNacimiento).days // 365
                     
-                    # Count enrollments for this student
-                    enrollment_count = Inscripcion.query.filter_by(estudiante_ci=student.ci).count()
+                    enrollment_count = enrollment_counts.get(student.ci, 0)
                     
                     data.append({
                         'estudiante_id': student.ci,
@@ -86,11 +93,17 @@ class SimpleDataExtractor:
                 # Query courses with enrollment counts
                 courses = db.session.query(Curso).all()
                 
+                # Count enrollments for all courses in one GROUP BY query
+                enrollment_counts = dict(
+                    db.session.query(Inscripcion.curso_id, func.count(Inscripcion.id))
+                    .group_by(Inscripcion.curso_id)
+                    .all()
+                )
+                
                 # Convert to DataFrame
                 data = []
                 for course in courses:
-                    # Count enrollments for this course
-                    enrollment_count = Inscripcion.query.filter_by(curso_id=course.id).count()
+                    enrollment_count = enrollment_counts.get(course.id, 0)
                     
                     data.append({
                         'curso_id': course.id,
@@ -0,0 +1,141 @@
+import os
+from datetime import date
+
+import pytest
+from sqlalchemy import event
+
+os.environ.setdefault('SECRET_KEY', 'clave-de-pruebas')
+os.environ.setdefault('JWT_SECRET_KEY', 'clave-jwt-de-pruebas-con-32-bytes!!')
+
+from app import create_app, db
+from app.config import Config
+from app.models import (
+    Curso, Docente, DocenteMateria, Estudiante, Evaluacion, EvaluacionIntegral, Gestion,
+    Inscripcion, Materia, MateriaCurso, NotaEstimada, NotaFinal, TipoEvaluacion
+)
+from app.Services.BusquedaNombreService import BusquedaNombreService
+from app.Services.CatalogoEvaluacionService import CatalogoEvaluacionService
+from app.Services.EstadisticaAsistenciaService import EstadisticaAsistenciaService
+from app.Services.RosterService import RosterService
+
+ANIO = 2025
+DOCENTE_CI = 100
+MATERIA_ID = 1
+CURSO_ID = 1
+GESTION_ID = 1
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    """Aplicación sobre una base SQLite nueva por test, sin el seeder histórico"""
+    monkeypatch.setattr(Config, 'SQLALCHEMY_DATABASE_URI', f"sqlite:///{tmp_path / 'pruebas.db'}")
+    monkeypatch.setattr('app.seeds.run_seeders', lambda: None)
+
+    aplicacion = create_app()
+    aplicacion.config['TESTING'] = True
+    with aplicacion.app_context():
+        yield aplicacion
+        db.session.remove()
+        db.engine.dispose()
+
+    CatalogoEvaluacionService.invalidar()
+    EstadisticaAsistenciaService.invalidar()
+    BusquedaNombreService.invalidar()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def cabeceras(app):
+    """Authorization con el token del docente de `escuela`"""
+    from flask_jwt_extended import create_access_token
+    return {'Authorization': create_access_token(identity='docente@pruebas')}
+
+
+class ContadorConsultas:
+    """Cuenta las sentencias SQL que llegan al cursor (before_cursor_execute)"""
+
+    def __init__(self):
+        self.sentencias = []
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.sentencias.append(statement)
+
+    @property
+    def total(self):
+        return len(self.sentencias)
+
+    def reiniciar(self):
+        self.sentencias = []
+
+    def de_get(self, client, url, cabeceras):
+        """Sentencias de un GET (tras uno previo que llena las cachés); falla si no responde 200"""
+        assert client.get(url, headers=cabeceras).status_code == 200
+        self.reiniciar()
+        respuesta = client.get(url, headers=cabeceras)
+        assert respuesta.status_code == 200, respuesta.get_data(as_text=True)
+        return self.total
+
+
+@pytest.fixture
+def contador_consultas(app):
+    contador = ContadorConsultas()
+    event.listen(db.engine, 'before_cursor_execute', contador)
+    yield contador
+    event.remove(db.engine, 'before_cursor_execute', contador)
+
+
+class Escuela:
+    """
+    Un docente con una materia en un curso y una gestión, al que se le inscriben estudiantes
+    con evaluaciones de cada tipo, nota final y nota estimada.
+    """
+
+    def __init__(self):
+        for id_, nombre, puntos in [(1, 'ser', 15), (2, 'decidir', 15), (3, 'saber', 35), (4, 'hacer', 35)]:
+            db.session.add(EvaluacionIntegral(id=id_, nombre=nombre, maxPuntos=puntos))
+        self.tipos = [
+            TipoEvaluacion(id=1, nombre='Asistencia-Diaria', evaluacion_integral_id=None),
+            TipoEvaluacion(id=2, nombre='Asistencia-Final', evaluacion_integral_id=1),
+            TipoEvaluacion(id=3, nombre='Examenes', evaluacion_integral_id=3),
+            TipoEvaluacion(id=4, nombre='Tareas', evaluacion_integral_id=4),
+            TipoEvaluacion(id=5, nombre='Exposiciones', evaluacion_integral_id=2),
+        ]
+        db.session.add_all(self.tipos)
+        db.session.add(Curso(id=CURSO_ID, nombre='1', Paralelo='A', Turno='M', Nivel='Primaria'))
+        db.session.add(Materia(id=MATERIA_ID, nombre='Matemáticas', codigo='MAT'))
+        db.session.add(MateriaCurso(materia_id=MATERIA_ID, curso_id=CURSO_ID, anio=ANIO))
+        db.session.add(Docente(ci=DOCENTE_CI, nombreCompleto='Docente Pruebas', gmail='docente@pruebas',
+                               contrasena='-', esDocente=True))
+        db.session.add(DocenteMateria(docente_ci=DOCENTE_CI, materia_id=MATERIA_ID))
+        db.session.add(Gestion(id=GESTION_ID, anio=ANIO, periodo='1 trimestre'))
+        db.session.commit()
+        CatalogoEvaluacionService.cargar()
+        self.estudiantes = 0
+
+    def inscribir(self, cantidad):
+        """Agrega `cantidad` estudiantes al curso con sus notas y actualiza el roster"""
+        for _ in range(cantidad):
+            ci = 1000 + self.estudiantes
+            self.estudiantes += 1
+            db.session.add(Estudiante(ci=ci, nombreCompleto=f'Estudiante {ci}', fechaNacimiento=date(2012, 1, 1)))
+            db.session.add(Inscripcion(estudiante_ci=ci, curso_id=CURSO_ID, fecha=date(ANIO, 2, 1)))
+            for tipo in self.tipos:
+                db.session.add(Evaluacion(descripcion=tipo.nombre, fecha=date(ANIO, 3, 1), nota=10.0,
+                                          tipo_evaluacion_id=tipo.id, estudiante_ci=ci,
+                                          materia_id=MATERIA_ID, gestion_id=GESTION_ID))
+            db.session.add(NotaFinal(valor=60.0, estudiante_ci=ci, materia_id=MATERIA_ID, gestion_id=GESTION_ID))
+            db.session.add(NotaEstimada(valor_estimado=58.0, razon_estimacion='prueba', estudiante_ci=ci,
+                                        materia_id=MATERIA_ID, gestion_id=GESTION_ID))
+        db.session.flush()
+        RosterService.refrescar(curso_ids=[CURSO_ID])
+        db.session.commit()
+        return self
+
+
+@pytest.fixture
+def escuela(app):
+    return Escuela()
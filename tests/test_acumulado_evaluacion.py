@@ -0,0 +1,87 @@
+from datetime import date
+
+from app import db
+from app.models import AcumuladoEvaluacion, Evaluacion
+from app.Services.AcumuladoEvaluacionService import AcumuladoEvaluacionService
+from conftest import GESTION_ID, MATERIA_ID
+
+CLAVE = (1000, MATERIA_ID, GESTION_ID)
+
+
+def nueva_evaluacion(nota):
+    evaluacion = Evaluacion(descripcion='Examen', fecha=date(2025, 4, 1), nota=nota, tipo_evaluacion_id=3,
+                            estudiante_ci=CLAVE[0], materia_id=CLAVE[1], gestion_id=CLAVE[2])
+    db.session.add(evaluacion)
+    db.session.flush()
+    return evaluacion
+
+
+def acumulado_examenes():
+    return AcumuladoEvaluacion.query.filter_by(
+        estudiante_ci=CLAVE[0], materia_id=CLAVE[1], gestion_id=CLAVE[2], tipo_evaluacion_id=3
+    ).one()
+
+
+def test_primera_escritura_reconstruye_la_clave(escuela):
+    escuela.inscribir(1)
+
+    AcumuladoEvaluacionService.registrar_alta(nueva_evaluacion(20.0))
+    db.session.commit()
+
+    assert (acumulado_examenes().cantidad, acumulado_examenes().suma) == (2, 30.0)
+
+
+def test_clave_creada_mientras_se_esperaba_el_bloqueo(escuela, monkeypatch):
+    """Si otra transacción reconstruyó la clave antes, se suma sobre sus filas en vez de insertar"""
+    escuela.inscribir(1)
+
+    def otra_transaccion_reconstruye(claves):
+        assert claves == [CLAVE]
+        AcumuladoEvaluacionService.reconstruir(*CLAVE)
+        db.session.flush()
+        db.session.expunge_all()
+        return True
+
+    monkeypatch.setattr(AcumuladoEvaluacionService, '_bloquear_claves', otra_transaccion_reconstruye)
+    evaluacion = Evaluacion(descripcion='Examen', fecha=date(2025, 4, 1), nota=20.0, tipo_evaluacion_id=3,
+                            estudiante_ci=CLAVE[0], materia_id=CLAVE[1], gestion_id=CLAVE[2])
+
+    acumulados, reconstruido = AcumuladoEvaluacionService.cargar(*CLAVE)
+    AcumuladoEvaluacionService.sumar(acumulados, CLAVE, evaluacion.tipo_evaluacion_id, evaluacion.nota, 1)
+    db.session.commit()
+
+    assert not reconstruido
+    assert (acumulado_examenes().cantidad, acumulado_examenes().suma) == (2, 30.0)
+
+
+def test_rebuild_acumulados_corrige_escrituras_por_fuera_del_servicio(app, escuela):
+    """Una evaluación insertada sin el servicio deja la suma mal; el comando la detecta y la corrige"""
+    escuela.inscribir(2)
+    AcumuladoEvaluacionService.registrar_alta(nueva_evaluacion(20.0))
+    db.session.add(Evaluacion(descripcion='SQL manual', fecha=date(2025, 4, 2), nota=30.0, tipo_evaluacion_id=3,
+                              estudiante_ci=CLAVE[0], materia_id=CLAVE[1], gestion_id=CLAVE[2]))
+    db.session.commit()
+    runner = app.test_cli_runner()
+
+    revision = runner.invoke(args=['api', 'rebuild-acumulados', '--check'])
+    assert revision.exit_code == 1
+    assert 'Claves con acumulados distintos de evaluacion: 1' in revision.output
+
+    assert runner.invoke(args=['api', 'rebuild-acumulados', '--gestion', str(GESTION_ID)]).exit_code == 0
+    db.session.expire_all()
+    assert (acumulado_examenes().cantidad, acumulado_examenes().suma) == (3, 60.0)
+    assert runner.invoke(args=['api', 'rebuild-acumulados', '--check']).exit_code == 0
+
+
+def test_invalidar_hace_que_cargar_reconstruya(escuela):
+    escuela.inscribir(1)
+    AcumuladoEvaluacionService.registrar_alta(nueva_evaluacion(20.0))
+    db.session.add(Evaluacion(descripcion='seeder', fecha=date(2025, 4, 2), nota=30.0, tipo_evaluacion_id=3,
+                              estudiante_ci=CLAVE[0], materia_id=CLAVE[1], gestion_id=CLAVE[2]))
+    AcumuladoEvaluacionService.invalidar(gestion_ids=[GESTION_ID])
+    db.session.commit()
+
+    AcumuladoEvaluacionService.registrar_alta(nueva_evaluacion(40.0))
+    db.session.commit()
+
+    assert (acumulado_examenes().cantidad, acumulado_examenes().suma) == (4, 100.0)
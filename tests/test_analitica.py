@@ -0,0 +1,56 @@
+from sqlalchemy import update
+
+from app import db
+from app.models import Evaluacion, ResumenPendiente
+from app.Services.AnaliticaService import AnaliticaService
+from app.Services.EstadisticaAsistenciaService import EstadisticaAsistenciaService
+from conftest import GESTION_ID, MATERIA_ID
+
+
+def test_marcar_deja_una_fila_por_clave(escuela):
+    for _ in range(3):
+        AnaliticaService.marcar([(GESTION_ID, MATERIA_ID)])
+        AnaliticaService.marcar_gestion(GESTION_ID)
+        db.session.commit()
+
+    marcas = {(marca.gestion_id, marca.materia_id) for marca in ResumenPendiente.query}
+    assert ResumenPendiente.query.count() == 2
+    assert marcas == {(GESTION_ID, MATERIA_ID), (GESTION_ID, None)}
+
+
+def test_cache_de_asistencia_ve_el_recalculo_de_otro_worker(escuela, monkeypatch):
+    """El recálculo de otro proceso no invalida esta caché: la versión en la base sí la descarta"""
+    escuela.inscribir(2)
+    AnaliticaService.reconstruir()
+    db.session.commit()
+    assert EstadisticaAsistenciaService.global_gestion(GESTION_ID)['promedio'] == 10.0
+
+    monkeypatch.setattr(EstadisticaAsistenciaService, 'invalidar', classmethod(lambda cls, gestion_ids=None: None))
+    db.session.execute(update(Evaluacion).where(Evaluacion.tipo_evaluacion_id == 2).values(nota=14.0))
+    AnaliticaService.refrescar({(GESTION_ID, MATERIA_ID)})
+    db.session.commit()
+
+    assert EstadisticaAsistenciaService.global_gestion(GESTION_ID)['promedio'] == 14.0
+
+
+def test_sincronizar_no_confirma_la_transaccion_del_request(escuela):
+    escuela.inscribir(1)
+    AnaliticaService.marcar([(GESTION_ID, MATERIA_ID)])
+    db.session.commit()
+    db.session.add(ResumenPendiente(gestion_id=GESTION_ID + 1, materia_id=MATERIA_ID))
+
+    AnaliticaService.sincronizar([GESTION_ID])
+    db.session.rollback()
+
+    assert ResumenPendiente.query.count() == 0
+    assert AnaliticaService.version(GESTION_ID) is not None
+
+
+def test_sincronizar_registra_el_error_y_sigue(escuela, monkeypatch, caplog):
+    def fallar(gestion_ids=None):
+        raise RuntimeError('sin conexión')
+    monkeypatch.setattr(AnaliticaService, 'refrescar_pendientes', staticmethod(fallar))
+
+    AnaliticaService.sincronizar([GESTION_ID])
+
+    assert 'Error al recalcular los resúmenes' in caplog.text
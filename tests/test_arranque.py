@@ -0,0 +1,28 @@
+import subprocess
+import sys
+from pathlib import Path
+
+from sqlalchemy import inspect
+
+from app import db
+
+RAIZ = Path(__file__).resolve().parent.parent
+
+
+def test_modelos_resuelven_sus_claves_foraneas():
+    """Con solo importar app, toda FK apunta a una tabla registrada (lo que necesita create_all)"""
+    codigo = (
+        "from app import db\n"
+        "for tabla in db.metadata.sorted_tables:\n"
+        "    for fk in tabla.foreign_keys:\n"
+        "        fk.column\n"
+    )
+    resultado = subprocess.run([sys.executable, '-c', codigo], cwd=RAIZ, capture_output=True, text=True)
+    assert resultado.returncode == 0, resultado.stderr
+
+
+def test_create_app_crea_todas_las_tablas(app):
+    tablas = set(inspect(db.engine).get_table_names())
+
+    assert set(db.metadata.tables) <= tablas
+    assert {'trabajo', 'acumulado_evaluacion', 'gestion'} <= tablas
@@ -0,0 +1,13 @@
+from conftest import CURSO_ID, GESTION_ID, MATERIA_ID
+
+URL = f'/Evaluacion/boletin/gestion/{GESTION_ID}/materia/{MATERIA_ID}/curso/{CURSO_ID}'
+
+
+def test_boletin_por_materia_no_crece_con_el_curso(client, cabeceras, escuela, contador_consultas):
+    escuela.inscribir(8)
+    consultas_8 = contador_consultas.de_get(client, URL, cabeceras)
+    escuela.inscribir(22)
+    consultas_30 = contador_consultas.de_get(client, URL, cabeceras)
+
+    assert consultas_8 == consultas_30, contador_consultas.sentencias
+    assert len(client.get(URL, headers=cabeceras).get_json()) == 30
@@ -0,0 +1,15 @@
+from app import db
+from app.models import Estudiante
+
+
+def test_sin_limit_devuelve_todas_las_coincidencias(client, cabeceras, escuela):
+    db.session.add_all(
+        Estudiante(ci=5000 + i, nombreCompleto=f'Ana Moreno {i}') for i in range(26)
+    )
+    db.session.commit()
+
+    todos = client.get('/Estudiantes/buscar/moreno', headers=cabeceras).get_json()
+    primeros = client.get('/Estudiantes/buscar/moreno?limit=5', headers=cabeceras).get_json()
+
+    assert len(todos) == 26
+    assert [e['ci'] for e in primeros] == [e['ci'] for e in todos[:5]]
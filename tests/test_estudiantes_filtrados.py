@@ -0,0 +1,42 @@
+import pytest
+
+from app import db
+from app.models import DocenteMateria
+from conftest import ANIO, CURSO_ID, DOCENTE_CI, MATERIA_ID
+
+FILTRO = f'docente_ci={DOCENTE_CI}&materia_id={MATERIA_ID}&curso_id={CURSO_ID}&year={ANIO}'
+
+
+@pytest.mark.parametrize('url', [
+    f'/Estudiantes/filtrar-estudiantes?{FILTRO}',
+    f'/Estudiantes/boletin-estudiantes-filtrados?{FILTRO}',
+    f'/Estudiantes/boletin-completo-estudiantes-filtrados?{FILTRO}',
+])
+def test_consultas_no_crecen_con_el_curso(url, client, cabeceras, escuela, contador_consultas):
+    escuela.inscribir(8)
+    consultas_8 = contador_consultas.de_get(client, url, cabeceras)
+    escuela.inscribir(22)
+    consultas_30 = contador_consultas.de_get(client, url, cabeceras)
+
+    assert consultas_8 == consultas_30, contador_consultas.sentencias
+
+
+def test_asignacion_eliminada_deja_de_valer(app, client, cabeceras, escuela):
+    """Sin caché entre solicitudes: la baja hecha por otro worker (o por SQL) se respeta de inmediato"""
+    escuela.inscribir(2)
+    url = f'/Estudiantes/filtrar-estudiantes?{FILTRO}'
+
+    def pedir():
+        # Contexto propio, como cada solicitud real (el de la fixture compartiría flask.g)
+        with app.app_context():
+            return client.get(url, headers=cabeceras)
+
+    assert pedir().status_code == 200
+
+    DocenteMateria.query.filter_by(docente_ci=DOCENTE_CI, materia_id=MATERIA_ID).delete()
+    db.session.commit()
+
+    # La ruta envuelve el 404 de la validación en su 500 genérico
+    respuesta = pedir()
+    assert respuesta.status_code != 200
+    assert '404' in respuesta.get_data(as_text=True)
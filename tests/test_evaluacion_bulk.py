@@ -0,0 +1,42 @@
+from app import db
+from app.models import NotaEstimada, TipoEvaluacion
+from conftest import GESTION_ID, MATERIA_ID
+
+
+def evaluaciones(estudiantes, tipo_evaluacion_id=3):
+    return [{
+        'descripcion': 'Examen', 'fecha': '2025-04-01', 'nota': 30.0,
+        'tipo_evaluacion_id': tipo_evaluacion_id, 'estudiante_ci': ci,
+        'materia_id': MATERIA_ID, 'gestion_id': GESTION_ID
+    } for ci in estudiantes]
+
+
+def sentencias_de_notas_estimadas(contador_consultas):
+    return [sentencia for sentencia in contador_consultas.sentencias if 'nota_estimada' in sentencia]
+
+
+def test_bulk_guarda_las_notas_estimadas_en_un_lote(client, cabeceras, escuela, contador_consultas):
+    """Las predicciones de las notas finales recalculadas van en un upsert, no una por fila"""
+    escuela.inscribir(30)
+
+    for estudiantes in (range(1000, 1008), range(1000, 1030)):
+        contador_consultas.reiniciar()
+        respuesta = client.post('/Evaluacion/bulk', json=evaluaciones(estudiantes), headers=cabeceras)
+
+        assert respuesta.status_code == 201
+        assert len(sentencias_de_notas_estimadas(contador_consultas)) == 1
+    assert all(nota.razon_estimacion.startswith('Predicción ML') for nota in NotaEstimada.query)
+
+
+def test_bulk_valida_tipos_contra_la_tabla(client, cabeceras, escuela):
+    """Un tipo con nombre repetido es válido aunque el catálogo en memoria no lo tenga"""
+    escuela.inscribir(1)
+    db.session.add(TipoEvaluacion(id=6, nombre='Examenes', evaluacion_integral_id=3))
+    db.session.commit()
+
+    respuesta = client.post(
+        '/Evaluacion/bulk', json=evaluaciones([1000], 6) + evaluaciones([1000], 99), headers=cabeceras
+    ).get_json()
+
+    assert respuesta['creadas'] == 1
+    assert [error['indice'] for error in respuesta['errores']] == [1]
@@ -0,0 +1,54 @@
+from datetime import date, datetime, timedelta
+
+from app import db
+from app.models import Evaluacion, Gestion, NotaEstimada, NotaFinal, Trabajo
+from app.Services.GeneracionGestionService import GeneracionGestionService, TIPO_TRABAJO
+from conftest import ANIO, GESTION_ID, MATERIA_ID
+
+
+def test_trabajo_sin_avance_queda_con_error(escuela):
+    """Un trabajo cuyo hilo murió con el worker no queda 'en_proceso' para siempre"""
+    hace_una_hora = datetime.utcnow() - timedelta(hours=1)
+    abandonado = Trabajo(tipo=TIPO_TRABAJO, estado='en_proceso', gestion_id=GESTION_ID,
+                         creado=hace_una_hora, actualizado=hace_una_hora)
+    activo = Trabajo(tipo=TIPO_TRABAJO, estado='en_proceso', gestion_id=GESTION_ID)
+    db.session.add_all([abandonado, activo])
+    db.session.commit()
+
+    assert GeneracionGestionService.marcar_abandonados() == 1
+    db.session.commit()
+
+    assert db.session.get(Trabajo, abandonado.id).estado == 'error'
+    assert 'interrumpido' in db.session.get(Trabajo, abandonado.id).mensaje
+    assert db.session.get(Trabajo, activo.id).estado == 'en_proceso'
+
+
+def test_fallo_descarta_solo_las_filas_del_trabajo(escuela, monkeypatch):
+    """Si la generación falla a mitad, no quedan filas suyas y se conservan las notas guardadas por otros"""
+    escuela.inscribir(3)
+    nueva = Gestion(anio=ANIO + 1, periodo='1 trimestre')
+    db.session.add(nueva)
+    db.session.flush()
+    propia = Evaluacion(descripcion='examen', fecha=date(ANIO + 1, 3, 1), nota=40.0, tipo_evaluacion_id=3,
+                        estudiante_ci=1000, materia_id=MATERIA_ID, gestion_id=nueva.id)
+    db.session.add(propia)
+    trabajo = GeneracionGestionService.crear_trabajo(nueva.id)
+    db.session.commit()
+
+    def fallar_en_el_segundo_lote(trabajo_id, procesados):
+        if procesados > 1:
+            raise RuntimeError('worker reiniciado')
+    monkeypatch.setattr(GeneracionGestionService, '_guardar_avance', staticmethod(fallar_en_el_segundo_lote))
+
+    trabajo = GeneracionGestionService.ejecutar(trabajo.id, tamano_lote=1)
+
+    assert trabajo.estado == 'error'
+    assert NotaFinal.query.filter_by(gestion_id=nueva.id).count() == 0
+    assert NotaEstimada.query.filter_by(gestion_id=nueva.id).count() == 0
+    assert [e.id for e in Evaluacion.query.filter_by(gestion_id=nueva.id)] == [propia.id]
+
+    monkeypatch.undo()
+    trabajo = GeneracionGestionService.ejecutar(trabajo.id)
+    assert trabajo.estado == 'completado'
+    assert NotaFinal.query.filter_by(gestion_id=nueva.id).count() == 3
+    assert Evaluacion.query.filter_by(gestion_id=nueva.id).count() == 4
@@ -0,0 +1,20 @@
+def test_ignora_parametros_que_no_son_campos(client, cabeceras, escuela):
+    escuela.inscribir(3)
+
+    respuesta = client.get('/NotaFinal/?_=1700000000000', headers=cabeceras)
+
+    assert respuesta.status_code == 200
+    assert len(respuesta.get_json()) == 3
+
+
+def test_filtra_por_campos_del_listado(client, cabeceras, escuela):
+    escuela.inscribir(3)
+
+    respuesta = client.get('/NotaFinal/?estudiante_ci=1001,1002', headers=cabeceras)
+
+    assert sorted(nota['estudiante_ci'] for nota in respuesta.get_json()) == [1001, 1002]
+
+
+def test_limit_fuera_de_rango(client, cabeceras, escuela):
+    for limite in (0, -1, 1001):
+        assert client.get(f'/NotaFinal/?limit={limite}', headers=cabeceras).status_code == 400
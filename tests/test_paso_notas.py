@@ -0,0 +1,26 @@
+from app import db
+from app.models import NotaFinal
+from conftest import CURSO_ID, GESTION_ID
+
+URL = f'/Evaluacion/paso_notas/curso/{CURSO_ID}/gestion/{GESTION_ID}'
+
+
+def test_get_no_modifica_notas(client, cabeceras, escuela):
+    escuela.inscribir(3)
+    NotaFinal.query.delete()
+    db.session.commit()
+
+    respuesta = client.get(URL, headers=cabeceras)
+
+    assert respuesta.status_code == 405
+    assert respuesta.headers['Allow'] == 'POST'
+    assert NotaFinal.query.count() == 0
+
+
+def test_post_pasa_las_notas(client, cabeceras, escuela):
+    escuela.inscribir(3)
+    NotaFinal.query.delete()
+    db.session.commit()
+
+    assert client.post(URL, headers=cabeceras).status_code == 200
+    assert NotaFinal.query.count() == 3
@@ -0,0 +1,40 @@
+from sqlalchemy import text
+
+from app import db
+from app.models import NotaFinal
+from app.Services.UpsertNotasService import UpsertNotasService
+from conftest import GESTION_ID, MATERIA_ID
+
+
+def guardar(valor):
+    UpsertNotasService.upsert_notas_finales([
+        {'estudiante_ci': 1000, 'materia_id': MATERIA_ID, 'gestion_id': GESTION_ID, 'valor': valor}
+    ])
+    db.session.commit()
+
+
+def test_upsert_actualiza_la_nota_existente(escuela):
+    escuela.inscribir(1)
+
+    guardar(75.0)
+
+    assert UpsertNotasService.verificar_claves_unicas() == []
+    assert [n.valor for n in NotaFinal.query.filter_by(estudiante_ci=1000)] == [75.0]
+
+
+def test_sin_restriccion_unica_usa_el_orm(escuela):
+    """Base creada con create_all antes de la migración: sin UNIQUE, ON CONFLICT fallaría"""
+    escuela.inscribir(1)
+    db.session.execute(text('DROP TABLE nota_final'))
+    db.session.execute(text(
+        'CREATE TABLE nota_final (id INTEGER PRIMARY KEY, valor FLOAT, '
+        'estudiante_ci INTEGER, materia_id INTEGER, gestion_id INTEGER)'
+    ))
+    db.session.commit()
+    UpsertNotasService._claves_unicas.clear()
+
+    guardar(40.0)
+    guardar(75.0)
+
+    assert UpsertNotasService.verificar_claves_unicas() == ['nota_final']
+    assert [n.valor for n in NotaFinal.query.filter_by(estudiante_ci=1000)] == [75.0]